@@ -96,6 +96,16 @@ async def lifespan(app: FastAPI):
             logger.info("Scheduler shut down")
         except Exception:
             pass
+        try:
+            from src.infrastructure.services.render_pool import shutdown_render_pool
+            shutdown_render_pool()
+        except Exception:
+            pass
+        try:
+            from src.infrastructure.storage.supabase_storage import close_client
+            await close_client()
+        except Exception:
+            pass
         logger.info("Lifespan cleanup finished")
 
 
@@ -191,6 +201,8 @@ async def dynamic_cors_middleware(request, call_next):
         response.headers["Access-Control-Allow-Credentials"] = "true"
         response.headers.setdefault("Access-Control-Allow-Methods", "GET,POST,PUT,PATCH,DELETE,OPTIONS")
         response.headers.setdefault("Access-Control-Allow-Headers", "Authorization,Content-Type,Accept,Origin")
+        # Cursor de paginación de los listados
+        response.headers.setdefault("Access-Control-Expose-Headers", "X-Next-Cursor")
     return response
 
 # Consolidate exception handlers and ensure CORS
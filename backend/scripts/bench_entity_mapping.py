@@ -0,0 +1,89 @@
+"""
+Micro-benchmark del listado de movimientos: entidades por segundo y pico de
+memoria (RSS) hidratando modelos ORM vs. proyectando filas con RowMapper.
+
+Cada modo corre en un proceso aparte para que el pico de RSS no se mezcle.
+
+Uso: python scripts/bench_entity_mapping.py [--count 50000]
+"""
+import argparse
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Agregar el directorio raíz al path
+root_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(root_dir))
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import joinedload, sessionmaker
+
+from src.domain.entities import get_local_time
+from src.infrastructure.database.models import Base, MovementModel, ProductModel
+from src.infrastructure.repositories.postgres_repository import PostgreSQLProductRepository
+
+PRODUCTS = 100
+
+
+def seed(url: str, count: int) -> None:
+    engine = create_engine(url)
+    Base.metadata.create_all(engine)
+    now = get_local_time().replace(tzinfo=None)
+    product_ids = [f"00000000-0000-0000-0000-{i:012d}" for i in range(PRODUCTS)]
+    with engine.begin() as conn:
+        conn.execute(insert(ProductModel), [
+            {"id": pid, "name": f"Producto {i}", "description": "-", "stock": 10, "sku": f"SKU-{i}"}
+            for i, pid in enumerate(product_ids)
+        ])
+        conn.execute(insert(MovementModel), [
+            {"id": f"10000000-0000-0000-0000-{i:012d}", "product_id": product_ids[i % PRODUCTS],
+             "quantity": 1, "type": "ENTRY", "reference": f"GR-{i}", "date": now}
+            for i in range(count)
+        ])
+
+
+def run(url: str, count: int, mode: str) -> None:
+    session = sessionmaker(bind=create_engine(url))()
+    repo = PostgreSQLProductRepository(session)
+    start = time.perf_counter()
+    if mode == "orm":
+        models = session.query(MovementModel)\
+            .options(joinedload(MovementModel.product))\
+            .order_by(MovementModel.date.desc())\
+            .limit(count).all()
+        movements = [repo._movement_to_entity(m) for m in models]
+    else:
+        movements = repo.find_all_movements(limit=count)
+    elapsed = time.perf_counter() - start
+    # ru_maxrss está en KB en Linux
+    peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(f"{mode:4}: {len(movements) / elapsed:10.0f} movimientos/s  pico RSS {peak_mb:7.1f} MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--count", type=int, default=50000)
+    parser.add_argument("--mode", choices=["orm", "rows"], help=argparse.SUPPRESS)
+    parser.add_argument("--db", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        run(args.db, args.count, args.mode)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        url = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        seed(url, args.count)
+        for mode in ("orm", "rows"):
+            subprocess.run(
+                [sys.executable, __file__, "--mode", mode, "--db", url, "--count", str(args.count)],
+                check=True,
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Micro-benchmark de los listados grandes: respuestas por segundo con la ruta
+actual (model_validate por ítem + validación de response_model + json) vs.
+FAST_JSON_RESPONSES (TypeAdapter + bytes directos).
+
+Uso: python scripts/bench_json_responses.py [--rows 10000] [--count 20]
+"""
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+from uuid import uuid4
+
+# Agregar el directorio raíz al path
+root_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(root_dir))
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+
+from src.domain.entities import Movement
+from src.domain.schemas import MovementResponse
+from src.infrastructure.api.fast_json import json_list_response
+
+
+def current_path(movements) -> bytes:
+    # Lo que hacen hoy la ruta y FastAPI: validar cada entidad, volver a
+    # validar contra response_model y serializar con json
+    items = [MovementResponse.model_validate(m) for m in movements]
+    validated = TypeAdapter(list[MovementResponse]).validate_python(items)
+    return json.dumps(jsonable_encoder(validated)).encode("utf-8")
+
+
+def fast_path(movements) -> bytes:
+    return json_list_response(MovementResponse, movements).body
+
+
+def bench(fn, movements, count: int) -> float:
+    fn(movements)  # Calentamiento
+    start = time.perf_counter()
+    for _ in range(count):
+        fn(movements)
+    return count / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--count", type=int, default=20)
+    args = parser.parse_args()
+
+    movements = [
+        Movement(
+            product_id=uuid4(), quantity=2, type="EXIT", reference=f"GS-{i:06d}",
+            document_path="uploads/docs/acta.pdf", applicant="Ana Torres", applicant_area="TI",
+            is_returnable=True, product_name="Laptop Lenovo ThinkPad T14"
+        )
+        for i in range(args.rows)
+    ]
+    assert json.loads(current_path(movements)) == json.loads(fast_path(movements))
+
+    before = bench(current_path, movements, args.count)
+    after = bench(fast_path, movements, args.count)
+    print(f"Ruta actual:   {before:6.1f} respuestas/s ({args.rows} filas)")
+    print(f"JSON rápido:   {after:6.1f} respuestas/s  ({after / before:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""
+Micro-benchmark del acta de movimiento: actas por segundo con y sin la
+plantilla estática cacheada de PDFService.
+
+Uso: python scripts/bench_pdf_receipts.py [--count 500]
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# Agregar el directorio raíz al path
+root_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(root_dir))
+
+from src.infrastructure.services.pdf_service import PDFService
+
+MOVEMENT_DATA = {
+    "product_name": "Laptop Lenovo ThinkPad T14",
+    "reference": "GR-000123",
+    "quantity": 3,
+    "applicant": "Ana Torres",
+    "applicant_area": "TI",
+    "is_returnable": True,
+    "is_sale": False,
+    "return_deadline": "2026-12-31",
+    "recipient_email": "ana.torres@example.com",
+}
+
+
+def bench(service: PDFService, count: int, use_template: bool) -> float:
+    # Calentamiento (incluye la captura de la plantilla)
+    for _ in range(10):
+        service.generate_movement_receipt(MOVEMENT_DATA, use_template=use_template)
+    start = time.perf_counter()
+    for _ in range(count):
+        service.generate_movement_receipt(MOVEMENT_DATA, use_template=use_template)
+    return count / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--count", type=int, default=500)
+    args = parser.parse_args()
+
+    service = PDFService()
+    before = bench(service, args.count, use_template=False)
+    after = bench(service, args.count, use_template=True)
+    print(f"Sin plantilla: {before:8.1f} actas/s")
+    print(f"Con plantilla: {after:8.1f} actas/s  ({after / before:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Benchmark de la búsqueda de productos: latencia por consulta con el índice
+de texto (FTS5 en SQLite, GIN con --db de PostgreSQL) frente al LIKE que se
+usa sin índice.
+
+Uso: python scripts/bench_product_search.py [--count 100000] [--db URL]
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Agregar el directorio raíz al path
+root_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(root_dir))
+
+from sqlalchemy import create_engine, insert, text
+from sqlalchemy.orm import sessionmaker
+
+from src.infrastructure.database.models import Base, ProductModel
+from src.infrastructure.repositories.postgres_repository import PostgreSQLProductRepository
+
+TYPES = (
+    "polo casaca gorra taza mochila llavero lapicero cuaderno termo chompa buzo short "
+    "bolso agenda tomatodo libreta sticker pin parche bandana medias chaleco poncho"
+).split()
+COLORS = "azul rojo negro blanco verde gris celeste morado naranja amarillo beige marrón".split()
+MATERIALS = "algodón pima cuero acero reciclado bambú lona poliéster cerámica vidrio".split()
+QUERIES = ("polo azul", "gorra", "taz", "mochila cuero negro", "sku-0421", "termo acero")
+REPEAT = 20
+
+
+def seed(url: str, count: int) -> None:
+    engine = create_engine(url)
+    Base.metadata.create_all(engine)
+    rng = random.Random(42)
+    # Vocabulario de las descripciones: palabras inventadas de 4 a 9 letras
+    vocabulary = ["".join(rng.choices("abcdefghijlmnoprstuv", k=rng.randint(4, 9))) for _ in range(5000)]
+    with engine.begin() as conn:
+        for start in range(0, count, 10000):
+            conn.execute(insert(ProductModel), [
+                {
+                    "id": f"00000000-0000-0000-0000-{i:012d}",
+                    "name": f"{rng.choice(TYPES)} {rng.choice(COLORS)} {rng.choice(MATERIALS)} modelo {i % 997}",
+                    "description": " ".join(rng.choices(vocabulary, k=20)),
+                    "stock": rng.randint(0, 50),
+                    "sku": f"SKU-{i:06d}",
+                }
+                for i in range(start, min(start + 10000, count))
+            ])
+
+
+def measure(repo: PostgreSQLProductRepository, label: str) -> None:
+    timings = []
+    for query in QUERIES:
+        for _ in range(REPEAT):
+            start = time.perf_counter()
+            repo.search(query, limit=50)
+            timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    p95 = timings[int(len(timings) * 0.95) - 1]
+    print(f"{label:5}: mediana {statistics.median(timings):7.2f} ms   p95 {p95:7.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--count", type=int, default=100000)
+    parser.add_argument("--db", help="URL de una BD vacía (por defecto SQLite temporal)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        url = args.db or f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        seed(url, args.count)
+        session = sessionmaker(bind=create_engine(url))()
+        repo = PostgreSQLProductRepository(session)
+        measure(repo, "índice")
+        if session.get_bind().dialect.name == "sqlite":
+            session.execute(text("DROP TABLE products_fts"))
+            measure(repo, "LIKE")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+"""
+Migraciones incrementales del esquema.
+
+`init_db` solo crea las tablas que no existen; este script agrega a las
+tablas existentes las columnas e índices nuevos y ejecuta los backfills.
+Cada paso es idempotente, por lo que puede ejecutarse en cada despliegue.
+
+Uso: python scripts/migrate_db.py
+"""
+import re
+import sys
+from pathlib import Path
+
+# Agregar el directorio raíz al path
+root_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(root_dir))
+
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Connection
+
+from src.infrastructure.database.config import Base, engine, init_db
+from src.infrastructure.database import models  # noqa: F401  (registra las tablas)
+from src.infrastructure.database.product_search import create_sqlite_fts, rebuild_sqlite_fts
+
+
+def column_exists(conn: Connection, table: str, column: str) -> bool:
+    return column in {c["name"] for c in inspect(conn).get_columns(table)}
+
+
+def add_column(conn: Connection, table: str, column: str, ddl: str) -> None:
+    """Agrega una columna si no existe (`ddl` es la definición sin el nombre)."""
+    if column_exists(conn, table, column):
+        return
+    conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {ddl}"))
+    print(f"  + {table}.{column}")
+
+
+def create_missing_indexes(conn: Connection) -> None:
+    """Crea los índices declarados en los modelos que aún no existen en la BD."""
+    inspector = inspect(conn)
+    for table in Base.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        existing = {ix["name"] for ix in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name not in existing:
+                index.create(bind=conn)
+                # Los índices de otro dialecto (ddl_if) no se crean
+                if index.name in {ix["name"] for ix in inspect(conn).get_indexes(table.name)}:
+                    print(f"  + índice {index.name}")
+
+
+# --- Pasos de migración ---
+
+_OC_REFERENCE = re.compile(r"OC ([0-9a-fA-F]{8})")
+
+
+def movements_purchase_order_id(conn: Connection) -> None:
+    """
+    Vincula las entradas por compra con su OC (movements.purchase_order_id).
+
+    Las entradas antiguas solo guardan "OC xxxxxxxx" en la referencia; se
+    resuelven por prefijo de ID. Si una OC tiene varias entradas (recepciones
+    duplicadas) solo se vincula la más antigua y el resto se reporta.
+    """
+    add_column(
+        conn, "movements", "purchase_order_id",
+        "VARCHAR(36) REFERENCES purchase_orders(id) ON DELETE SET NULL"
+    )
+
+    orders_by_prefix = {}
+    for (order_id,) in conn.execute(text("SELECT id FROM purchase_orders")):
+        orders_by_prefix.setdefault(str(order_id)[:8].lower(), []).append(str(order_id))
+
+    linked = set(
+        row[0] for row in conn.execute(text(
+            "SELECT purchase_order_id FROM movements WHERE purchase_order_id IS NOT NULL"
+        ))
+    )
+    rows = conn.execute(text(
+        "SELECT id, reference FROM movements "
+        "WHERE purchase_order_id IS NULL AND reference LIKE '%OC %' "
+        "ORDER BY date, id"
+    ))
+    updated, duplicates, unresolved = 0, 0, 0
+    for movement_id, reference in rows.fetchall():
+        match = _OC_REFERENCE.search(reference or "")
+        candidates = orders_by_prefix.get(match.group(1).lower(), []) if match else []
+        if len(candidates) != 1:
+            unresolved += 1
+            continue
+        order_id = candidates[0]
+        if order_id in linked:
+            duplicates += 1
+            print(f"  ! movimiento {movement_id}: entrada duplicada de la OC {order_id}")
+            continue
+        conn.execute(
+            text("UPDATE movements SET purchase_order_id = :order_id WHERE id = :movement_id"),
+            {"order_id": order_id, "movement_id": movement_id}
+        )
+        linked.add(order_id)
+        updated += 1
+    print(f"  movements.purchase_order_id: {updated} vinculados, {duplicates} duplicados, {unresolved} sin resolver")
+
+
+def drop_replaced_indexes(conn: Connection) -> None:
+    """Elimina índices reemplazados por otros compuestos (el nuevo cubre sus consultas)."""
+    for table, index in (
+        ("sales_orders", "idx_sales_customer_email"),  # -> idx_sales_customer_email_created_at
+        ("movements", "idx_movement_product_id"),  # -> idx_movement_product_date
+    ):
+        if index in {ix["name"] for ix in inspect(conn).get_indexes(table)}:
+            conn.execute(text(f"DROP INDEX {index}"))
+            print(f"  - índice {index}")
+
+
+def sqlite_product_search(conn: Connection) -> None:
+    """
+    Crea en SQLite la tabla FTS5 de búsqueda de productos y la indexa con los
+    productos existentes. En PostgreSQL la búsqueda usa el índice GIN
+    `idx_product_search`, que se crea junto con el resto de índices.
+    """
+    if conn.dialect.name != "sqlite":
+        return
+    if not create_sqlite_fts(conn):
+        print("  ! SQLite sin FTS5: la búsqueda de productos usará LIKE")
+        return
+    rebuild_sqlite_fts(conn)
+    print("  products_fts reindexada")
+
+
+MIGRATIONS = [
+    movements_purchase_order_id,
+    drop_replaced_indexes,
+    sqlite_product_search,
+]
+
+
+def main():
+    print("=" * 60)
+    print("Migración de Base de Datos - Sistema de Inventario")
+    print("=" * 60)
+
+    init_db()
+    for migration in MIGRATIONS:
+        print(f"→ {migration.__name__}")
+        with engine.begin() as conn:
+            migration(conn)
+
+    print("→ índices")
+    with engine.begin() as conn:
+        create_missing_indexes(conn)
+
+    print("\n✓ Migración completada")
+
+
+if __name__ == "__main__":
+    main()
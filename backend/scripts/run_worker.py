@@ -0,0 +1,44 @@
+"""
+Inicia el worker local de la cola de trabajos (recibos PDF y correos).
+
+Uso: python scripts/run_worker.py
+"""
+import logging
+import signal
+import sys
+import threading
+from pathlib import Path
+
+# Agregar el directorio raíz al path
+root_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(root_dir))
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from src.infrastructure.services.job_worker import ReceiptJobWorker
+from src.infrastructure.services.render_pool import shutdown_render_pool
+
+
+def main():
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    )
+    stop_event = threading.Event()
+
+    def handle_signal(signum, frame):
+        stop_event.set()
+
+    signal.signal(signal.SIGINT, handle_signal)
+    signal.signal(signal.SIGTERM, handle_signal)
+
+    try:
+        ReceiptJobWorker().run_forever(stop_event=stop_event)
+    finally:
+        shutdown_render_pool()
+
+
+if __name__ == "__main__":
+    main()
@@ -5,14 +5,17 @@ import ast
 import logging
 from decimal import Decimal
 from uuid import UUID, uuid4
-from typing import List, Optional
+from typing import Iterator, List, Optional, Tuple
 from datetime import datetime, timedelta, timezone
 
+from src.domain.catalog_entities import AVAILABILITIES, CATALOG_SORTS, CatalogQuery
+from src.domain.entities import Movement
 from src.domain.sales_entities import SalesOrder
 from src.ports.repository import ProductRepository
 from src.ports.sales_repository import SalesRepository
 from src.application.stripe_service import StripeService
-from src.domain.exceptions import InsufficientStockError
+from src.application.reservation_service import ReservationService
+from src.domain.exceptions import InsufficientStockError, ProductNotFoundError
 
 logger = logging.getLogger(__name__)
 
@@ -26,23 +29,38 @@ class EcommerceService:
         product_repository: ProductRepository,
         sales_repository: SalesRepository,
         stripe_service: StripeService,
+        reservation_service: Optional[ReservationService] = None,
     ):
         self._products = product_repository
         self._sales = sales_repository
         self._stripe = stripe_service
+        self._reservations = reservation_service
 
-    def list_public_products(self) -> list:
-        """Return products that have a retail_price set and (stock > 0 or is_preorder or pending purchase orders)."""
-        all_products = self._products.find_all()
-        result = []
-        for p in all_products:
-            if not p.retail_price or p.retail_price <= 0:
-                continue
-            
-            # Show if has stock OR is explicitly preorder OR has pending purchase orders
-            if p.stock > 0 or p.is_preorder or p.has_pending_purchase_orders:
-                result.append(p)
-        return result
+    def list_public_products(self, catalog: Optional[CatalogQuery] = None, skip: int = 0, limit: int = 100) -> list:
+        """
+        Return one page of the storefront catalogue: products with a retail_price
+        and (stock > 0 or is_preorder or pending purchase orders), filtered and
+        sorted in the database.
+        """
+        catalog = catalog or CatalogQuery()
+        self._validate_catalog(catalog)
+        return self._products.find_public(catalog, skip=skip, limit=limit)
+
+    def public_catalog_facets(self, catalog: Optional[CatalogQuery] = None) -> dict:
+        """Total, availability and price-band counts for the storefront filters."""
+        catalog = catalog or CatalogQuery()
+        self._validate_catalog(catalog)
+        return self._products.public_facets(catalog)
+
+    @staticmethod
+    def _validate_catalog(catalog: CatalogQuery) -> None:
+        for availability in catalog.availability or ():
+            if availability not in AVAILABILITIES:
+                raise ValueError(f"Invalid availability: {availability}")
+        if catalog.sort is not None and catalog.sort not in CATALOG_SORTS:
+            raise ValueError(f"Invalid sort: {catalog.sort}")
+        if catalog.min_price is not None and catalog.max_price is not None and catalog.min_price > catalog.max_price:
+            raise ValueError("min_price cannot be greater than max_price")
 
     def get_public_product(self, product_id: UUID):
         product = self._products.find_by_id(product_id)
@@ -59,9 +77,15 @@ class EcommerceService:
         shipping_type: str = "PICKUP",
         apply_discount: bool = False,
     ) -> dict:
-        """Validate stock and create Stripe checkout session."""
+        """
+        Validate stock, reserve it and create the Stripe checkout session.
+
+        In-stock items are held until the session expires (see ReservationService),
+        so concurrent checkouts cannot sell the same units. Preorder items are not held.
+        """
         logger.info(f"EcommerceService: Creando sesión para {customer_email} ({len(items)} items)")
         checkout_items = []
+        holds = []
         for item in items:
             product = self._products.find_by_id(item.product_id)
             if not product:
@@ -70,6 +94,8 @@ class EcommerceService:
                 raise ValueError(f"Stock insuficiente para {product.name}")
             if product.retail_price is None:
                 raise ValueError(f"Producto {product.name} no tiene precio de venta")
+            if not (product.is_preorder or product.has_pending_purchase_orders):
+                holds.append((product.id, item.quantity))
             now = datetime.now(timezone(timedelta(hours=-5)))
 
             # 1. Promotional pricing strictly by date
@@ -93,14 +119,28 @@ class EcommerceService:
                 "stripe_price_id": product.stripe_price_id,
             })
 
-        return self._stripe.create_checkout_session(
-            items=checkout_items,
-            customer_email=customer_email,
-            customer_name=customer_name,
-            shipping_type=shipping_type,
-            shipping_address=shipping_address or "",
-            apply_discount=apply_discount,
-        )
+        reservation_id, expires_at = None, None
+        if self._reservations and holds:
+            try:
+                reservation_id, expires_at, _ = self._reservations.hold(holds)
+            except (InsufficientStockError, ProductNotFoundError) as e:
+                raise ValueError(str(e))
+
+        try:
+            return self._stripe.create_checkout_session(
+                items=checkout_items,
+                customer_email=customer_email,
+                customer_name=customer_name,
+                shipping_type=shipping_type,
+                shipping_address=shipping_address or "",
+                apply_discount=apply_discount,
+                reservation_id=str(reservation_id) if reservation_id else None,
+                expires_at=expires_at,
+            )
+        except Exception:
+            if reservation_id:
+                self._reservations.release(reservation_id)
+            raise
 
     def create_orders_from_session(self, session_id: str) -> dict:
         """Verify Stripe payment and create SalesOrders (one per item). Idempotent by session_id."""
@@ -165,10 +205,13 @@ class EcommerceService:
         order_ids = []
         order_items = []
         total = Decimal("0.00")
+        orders = []
+        movements = []
+        products = self._products.find_by_ids(UUID(item["product_id"]) for item in items)
 
         for item in items:
             product_id = UUID(item["product_id"])
-            product = self._products.find_by_id(product_id)
+            product = products.get(product_id)
             if not product:
                 continue
 
@@ -203,18 +246,21 @@ class EcommerceService:
                 status="PENDING",
                 stripe_session_id=session_id,
             )
-            self._sales.save(order)
+            orders.append(order)
 
             # Deduct stock (skip for preorder products with no stock)
             if product.stock > 0:
-                try:
-                    product.remove_stock(quantity)
-                    self._products.save(product)
-                except InsufficientStockError:
-                    logger.warning(
-                        f"Race condition: insufficient stock for {product.name} "
-                        f"(available={product.stock}, requested={quantity})"
-                    )
+                movements.append(Movement(
+                    product_id=product_id,
+                    quantity=quantity,
+                    type="VENTA",
+                    reference=f"VENTA WEB: OV-{str(order.id)[:8]}",
+                    applicant=customer_name,
+                    recipient_email=customer_email,
+                    sales_order_id=order.id,
+                    product_name=product.name,
+                    date=now,
+                ))
 
             order_ids.append(str(order.id))
             order_items.append({
@@ -228,6 +274,20 @@ class EcommerceService:
             })
             total += item_total
 
+        # Orders, stock and VENTA movements are written in one transaction
+        recorded = {m.id for m in self._sales.save_with_movements(orders, movements)}
+        for movement in movements:
+            if movement.id not in recorded:
+                logger.warning(
+                    f"Race condition: insufficient stock for {movement.product_name} "
+                    f"(available={products[movement.product_id].stock}, requested={movement.quantity})"
+                )
+
+        # Stock already deducted above: the hold is no longer needed
+        reservation_id = metadata.get("reservation_id")
+        if self._reservations and reservation_id:
+            self._reservations.convert(UUID(reservation_id))
+
         return {
             "order_ids": order_ids,
             "items": order_items,
@@ -235,28 +295,54 @@ class EcommerceService:
             "status": "PENDING",
             "delivery_date": delivery_date.isoformat(),
         }
-    def get_customer_orders(self, email: str) -> List[dict]:
-        """Fetch all orders for a given customer email."""
-        orders = self._sales.find_by_email(email)
-        return [
-            {
-                "id": str(order.id),
-                "customer_name": order.customer_name,
-                "customer_email": order.customer_email,
-                "product_id": str(order.product_id),
-                "product_name": order.product_name,
-                "product_image": order.product_image,
-                "quantity": order.quantity,
-                "unit_price": float(order.unit_price),
-                "subtotal": float(order.subtotal),
-                "tax_amount": float(order.tax_amount),
-                "shipping_cost": float(order.shipping_cost),
-                "shipping_type": order.shipping_type,
-                "shipping_address": order.shipping_address,
-                "total_amount": float(order.total_amount),
-                "status": order.status,
-                "delivery_date": order.delivery_date.isoformat() if order.delivery_date else None,
-                "created_at": order.created_at.isoformat(),
-            }
-            for order in orders
-        ]
+    # Page size used when walking a customer's full order history
+    CUSTOMER_ORDERS_BATCH_SIZE = 200
+
+    def get_customer_orders(
+        self,
+        email: str,
+        limit: int = CUSTOMER_ORDERS_BATCH_SIZE,
+        cursor: Optional[str] = None,
+    ) -> Tuple[List[dict], Optional[str]]:
+        """
+        Fetch one page of a customer's orders, newest first.
+        Returns (orders, cursor of the next page or None).
+
+        Raises:
+            ValueError: If the cursor is invalid.
+        """
+        orders, next_cursor = self._sales.find_page(limit=limit, cursor=cursor, customer_email=email)
+        return [self._customer_order_to_dict(order) for order in orders], next_cursor
+
+    def iter_customer_orders(self, email: str) -> Iterator[dict]:
+        """Yield the full order history page by page, without loading it all in memory."""
+        cursor = None
+        while True:
+            orders, cursor = self.get_customer_orders(
+                email, limit=self.CUSTOMER_ORDERS_BATCH_SIZE, cursor=cursor
+            )
+            yield from orders
+            if not cursor:
+                return
+
+    @staticmethod
+    def _customer_order_to_dict(order: SalesOrder) -> dict:
+        return {
+            "id": str(order.id),
+            "customer_name": order.customer_name,
+            "customer_email": order.customer_email,
+            "product_id": str(order.product_id),
+            "product_name": order.product_name,
+            "product_image": order.product_image,
+            "quantity": order.quantity,
+            "unit_price": float(order.unit_price),
+            "subtotal": float(order.subtotal),
+            "tax_amount": float(order.tax_amount),
+            "shipping_cost": float(order.shipping_cost),
+            "shipping_type": order.shipping_type,
+            "shipping_address": order.shipping_address,
+            "total_amount": float(order.total_amount),
+            "status": order.status,
+            "delivery_date": order.delivery_date.isoformat() if order.delivery_date else None,
+            "created_at": order.created_at.isoformat(),
+        }
@@ -0,0 +1,109 @@
+"""
+Inventario a una fecha (checkpoints diarios y valorización) y conciliación
+del stock con los movimientos.
+"""
+import logging
+import os
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from typing import List, Optional
+from uuid import UUID
+
+from src.domain.entities import get_local_time
+from src.domain.ledger_entities import ReconciliationRun, StockDiscrepancy
+from src.ports.ledger_repository import LedgerRepository
+
+logger = logging.getLogger(__name__)
+
+# La marca de agua de la conciliación va este margen por detrás del reloj
+RECONCILIATION_LAG_SECONDS = int(os.getenv("RECONCILIATION_LAG_SECONDS", "60"))
+# Registrar movimientos de ajuste para las diferencias confirmadas
+RECONCILIATION_AUTO_CORRECT = os.getenv("RECONCILIATION_AUTO_CORRECT", "false").lower() == "true"
+
+
+def end_of_day(day: date) -> datetime:
+    """Corte de cierre de `day`: incluye todos los movimientos de ese día."""
+    return datetime.combine(day + timedelta(days=1), time.min)
+
+
+class LedgerService:
+    def __init__(self, repo: LedgerRepository):
+        self.repo = repo
+
+    def take_daily_snapshot(self, day: Optional[date] = None) -> int:
+        """
+        Guarda el checkpoint de cierre de `day` (por defecto, ayer). Se calcula
+        desde los movimientos, así que puede rehacerse o tomarse con atraso.
+        """
+        day = day or (get_local_time() - timedelta(days=1)).date()
+        count = self.repo.save_snapshots(end_of_day(day))
+        logger.info(f"Checkpoint de stock del {day}: {count} productos")
+        return count
+
+    def valuation(self, as_of: datetime, product_id: Optional[UUID] = None) -> dict:
+        """
+        Stock y valor del inventario en `as_of` (movimientos anteriores a ese
+        instante), al costo de la última compra recibida de cada producto.
+        """
+        positions = self.repo.stock_positions(as_of, product_id)
+        valued = [p.value for p in positions if p.value is not None]
+        return {
+            "as_of": as_of,
+            "total_units": sum(p.stock for p in positions),
+            "total_value": sum(valued, Decimal("0")),
+            "unvalued_products": sum(1 for p in positions if p.unit_cost is None and p.stock),
+            "items": [
+                {
+                    "product_id": p.product_id,
+                    "sku": p.sku,
+                    "name": p.name,
+                    "stock": p.stock,
+                    "unit_cost": p.unit_cost,
+                    "value": p.value,
+                }
+                for p in positions
+            ],
+        }
+
+
+class ReconciliationService:
+    """
+    Conciliación periódica de `products.stock` con el libro de movimientos.
+
+    Cada pasada procesa solo los movimientos nuevos (marca de agua sobre
+    `movements.date`). La marca queda `lag_seconds` por detrás del reloj para
+    no saltarse movimientos cuya transacción aún no terminó.
+    """
+
+    def __init__(
+        self,
+        repo: LedgerRepository,
+        lag_seconds: int = RECONCILIATION_LAG_SECONDS,
+        auto_correct: bool = RECONCILIATION_AUTO_CORRECT,
+    ):
+        self.repo = repo
+        self.lag = timedelta(seconds=lag_seconds)
+        self.auto_correct = auto_correct
+
+    def run(self, correct: Optional[bool] = None) -> ReconciliationRun:
+        """
+        Ejecuta una pasada. Con `correct` (por defecto RECONCILIATION_AUTO_CORRECT)
+        registra movimientos de ajuste para las diferencias confirmadas.
+        """
+        now = get_local_time()
+        run = ReconciliationRun(high_water_mark=(now - self.lag).replace(tzinfo=None), started_at=now)
+        run = self.repo.reconcile(run, correct=self.auto_correct if correct is None else correct)
+        for d in run.discrepancies:
+            logger.warning(
+                f"Stock de {d.sku} descuadrado: {d.stock} en producto, {d.expected_stock} según movimientos"
+                + (" (ajustado)" if d.corrected else "")
+            )
+        return run
+
+    def rebuild(self, correct: Optional[bool] = None) -> ReconciliationRun:
+        """Rehace los saldos desde cero (p. ej. tras cargar movimientos con fecha pasada)."""
+        self.repo.reset_reconciliation()
+        return self.run(correct)
+
+    def pending_discrepancies(self) -> List[StockDiscrepancy]:
+        return self.repo.pending_discrepancies()
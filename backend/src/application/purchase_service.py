@@ -1,4 +1,5 @@
-from typing import List, Optional
+from collections import deque
+from typing import Iterator, List, Optional, Tuple
 from uuid import UUID
 from decimal import Decimal
 from datetime import datetime
@@ -6,11 +7,13 @@ from src.domain.purchase_entities import Supplier, PurchaseOrder, PurchaseKPIs
 from src.ports.purchase_repository import PurchaseRepository
 
 # PDF Generation
-from reportlab.lib import colors
-from reportlab.lib.pagesizes import letter
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import inch
+from src.infrastructure.services.pdf_service import (
+    PDFService,
+    purchase_order_pdf_filename,
+    render_purchase_order_pdf,
+)
+from src.infrastructure.services.render_pool import bounded_map
+from src.infrastructure.services.zip_stream import stream_zip
 import os
 
 class PurchaseService:
@@ -91,8 +94,26 @@ class PurchaseService:
         
         return self.repo.add_purchase_order(order)
 
-    def list_purchase_orders(self, skip: int = 0, limit: int = 100) -> List[PurchaseOrder]:
-        return self.repo.get_purchase_orders(skip=skip, limit=limit)
+    def list_purchase_orders(
+        self,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        status: Optional[str] = None,
+        supplier_id: Optional[UUID] = None,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None
+    ) -> Tuple[List[PurchaseOrder], Optional[str]]:
+        """
+        Lista órdenes de compra paginadas por cursor. Retorna (órdenes, cursor siguiente).
+        """
+        return self.repo.find_purchase_orders_page(
+            limit=limit,
+            cursor=cursor,
+            status=status,
+            supplier_id=supplier_id,
+            start_date=start_date,
+            end_date=end_date
+        )
     
     def get_order_pdf(self, order_id: UUID) -> str:
         """Generates PDF for order and returns file path"""
@@ -103,56 +124,49 @@ class PurchaseService:
         # Ensure uploads/orders directory exists
         pdf_dir = "uploads/orders"
         os.makedirs(pdf_dir, exist_ok=True)
-        filename = f"OC-{str(order.id)[:8]}.pdf"
-        filepath = os.path.join(pdf_dir, filename)
-        
-        # Create PDF
-        doc = SimpleDocTemplate(filepath, pagesize=letter)
-        elements = []
-        styles = getSampleStyleSheet()
-        
-        # Header
-        elements.append(Paragraph(f"ORDEN DE COMPRA: #{str(order.id)[:8].upper()}", styles['Title']))
-        elements.append(Paragraph(f"Fecha: {order.created_at.strftime('%Y-%m-%d')}", styles['Normal']))
-        elements.append(Spacer(1, 12))
-        
-        # Supplier Info
-        elements.append(Paragraph(f"PROVEEDOR: {order.supplier_name}", styles['Heading2']))
-        elements.append(Paragraph(f"RUC: (Consultar Sistema)", styles['Normal'])) # In a real scenario fetch supplier details
-        elements.append(Spacer(1, 12))
-        
-        # Order Details Table
-        # Data
-        data = [
-            ["Producto", "Cantidad", "Unidad", "Precio Unit.", "Subtotal"],
-            [order.product_name, str(order.quantity), "UND", f"{order.currency} {order.unit_price}", f"{order.currency} {order.quantity * order.unit_price}"],
-            ["", "", "", "IGV (18%)", f"{order.currency} {order.tax_amount}"],
-            ["", "", "", "Transporte/Flete", f"{order.currency} {order.freight_amount}"],
-            ["", "", "", f"Otros: {order.other_expenses_description or 'N/A'}", f"{order.currency} {order.other_expenses_amount}"],
-            ["", "", "", "Descuentos", f"-{order.currency} {order.savings_amount}"],
-            ["", "", "", "TOTAL", f"{order.currency} {order.total_amount}"]
-        ]
-        
-        t = Table(data)
-        t.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black),
-        ]))
-        elements.append(t)
-        elements.append(Spacer(1, 48))
-        
-        # Signatures
-        elements.append(Paragraph("_" * 40, styles['Normal']))
-        elements.append(Paragraph("Jefe de Comercio - GUSMI", styles['Normal']))
-        
-        doc.build(elements)
+        filepath = os.path.join(pdf_dir, purchase_order_pdf_filename(order))
+
+        with open(filepath, "wb") as f:
+            f.write(PDFService().generate_purchase_order_pdf(order))
         return filepath
 
+    def export_orders_pdf_zip(
+        self,
+        order_ids: Optional[List[UUID]] = None,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+    ) -> Iterator[bytes]:
+        """
+        Genera un ZIP con los PDFs de las órdenes seleccionadas, como stream de bytes.
+
+        Las órdenes se leen por lotes, se renderizan en el process pool compartido
+        con una ventana acotada y cada PDF se escribe al ZIP en cuanto está listo,
+        de modo que la memoria no crece con el número de órdenes.
+        """
+        orders = self.repo.iter_purchase_orders(
+            order_ids=order_ids, start_date=start_date, end_date=end_date
+        )
+
+        def entries():
+            names = deque()
+            seen = set()
+
+            def named_orders():
+                for order in orders:
+                    name = purchase_order_pdf_filename(order)
+                    if name in seen:
+                        # Colisión del prefijo de 8 caracteres: usar el ID completo
+                        name = f"OC-{order.id}.pdf"
+                    seen.add(name)
+                    names.append(name)
+                    yield order
+
+            # bounded_map preserva el orden, así que los nombres quedan alineados
+            for pdf_bytes in bounded_map(render_purchase_order_pdf, named_orders()):
+                yield names.popleft(), pdf_bytes
+
+        return stream_zip(entries())
+
     def update_order_status(
         self, 
         order_id: UUID, 
@@ -197,13 +211,11 @@ class PurchaseService:
         if status == "RECEIVED" and self.inventory_service:
             logger.info(f"✅ Entering RECEIVED block for order {order_id}")
             
-            # Verificar si ya existe un movimiento para esta OC
-            # Usamos el prefijo de la OC en la referencia para identificarlo
+            # Verificar si ya existe un movimiento para esta OC (consulta indexada por purchase_order_id)
             oc_ref = f"OC {str(order_id)[:8]}"
-            movements = self.inventory_service.get_movements()
-            already_processed = any(oc_ref in (m.reference or "") for m in movements)
+            already_processed = self.inventory_service.has_purchase_order_receipt(order_id)
             
-            logger.info(f"🔍 Movements check: found {len(movements)} total movements, already_processed={already_processed}")
+            logger.info(f"🔍 Movements check: already_processed={already_processed}")
             
             if not already_processed:
                 logger.info(f"Processing stock for order {order_id}. Product: {order.product_id}")
@@ -215,7 +227,8 @@ class PurchaseService:
                         product_id=order.product_id,
                         quantity=order.quantity,
                         reference=reference,
-                        document_path=doc_path
+                        document_path=doc_path,
+                        purchase_order_id=order_id
                     )
                     logger.info(f"Stock updated successfully for order {order_id}")
                 except Exception as e:
@@ -258,36 +271,13 @@ class PurchaseService:
     def delete_purchase_order(self, order_id: UUID) -> bool:
         return self.repo.delete_purchase_order(order_id)
 
-    def calculate_kpis(self) -> PurchaseKPIs:
-        orders = self.repo.get_purchase_orders()
-        total_orders = len(orders)
-        if total_orders == 0:
-            return PurchaseKPIs(0.0, Decimal("0.00"), Decimal("0.00"), 0.0, 0, 0)
-
-        # Quality: % rejected orders
-        rejected_orders = [o for o in orders if o.is_rejected or o.status == "REJECTED"]
-        quality_rate = (len(rejected_orders) / total_orders) * 100
-
-        # Costs: CTA and Savings
-        total_cta = sum((o.total_amount for o in orders), Decimal("0.00"))
-        total_savings = sum((o.savings_amount for o in orders), Decimal("0.00"))
-
-        # Plazos: Compliance (on-time / total finished)
-        finished_orders = [o for o in orders if o.actual_delivery_date is not None]
-        if not finished_orders:
-            on_time_rate = 0.0
-        else:
-            on_time_orders = [
-                o for o in finished_orders 
-                if o.expected_delivery_date and o.actual_delivery_date <= o.expected_delivery_date
-            ]
-            on_time_rate = (len(on_time_orders) / len(finished_orders)) * 100
-
-        return PurchaseKPIs(
-            quality_rate=quality_rate,
-            total_cta=total_cta,
-            total_savings=total_savings,
-            on_time_delivery_rate=on_time_rate,
-            total_orders=total_orders,
-            rejected_orders=len(rejected_orders)
-        )
+    def calculate_kpis(
+        self,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        supplier_id: Optional[UUID] = None
+    ) -> PurchaseKPIs:
+        """
+        KPIs de Calidad, Costes y Plazos sobre todas las órdenes (agregados en la BD).
+        """
+        return self.repo.get_purchase_kpis(start_date=start_date, end_date=end_date, supplier_id=supplier_id)
@@ -0,0 +1,67 @@
+"""
+Reservas de stock para el checkout: se aparta el stock al crear la sesión de
+pago y se libera si la sesión vence sin completarse.
+"""
+import logging
+import os
+from datetime import datetime, timedelta
+from typing import List, Optional, Tuple
+from uuid import UUID, uuid4
+
+from src.domain.entities import get_local_time
+from src.domain.reservation_entities import StockReservation
+from src.ports.reservation_repository import ReservationRepository
+
+logger = logging.getLogger(__name__)
+
+# Vigencia de la reserva = vencimiento de la sesión de Stripe. Stripe exige entre
+# 30 min y 24 h contados al recibir la sesión; el mínimo deja 1 min de margen
+# para lo que tarda la reserva en llegar a Stripe.
+MIN_CHECKOUT_SESSION_TTL_MINUTES = 31
+MAX_CHECKOUT_SESSION_TTL_MINUTES = 24 * 60
+
+
+def _checkout_session_ttl_minutes() -> int:
+    ttl = int(os.getenv("CHECKOUT_SESSION_TTL_MINUTES", str(MIN_CHECKOUT_SESSION_TTL_MINUTES)))
+    if not MIN_CHECKOUT_SESSION_TTL_MINUTES <= ttl <= MAX_CHECKOUT_SESSION_TTL_MINUTES:
+        raise ValueError(
+            f"CHECKOUT_SESSION_TTL_MINUTES debe estar entre {MIN_CHECKOUT_SESSION_TTL_MINUTES} "
+            f"y {MAX_CHECKOUT_SESSION_TTL_MINUTES} (límites de Stripe), no {ttl}"
+        )
+    return ttl
+
+
+CHECKOUT_SESSION_TTL_MINUTES = _checkout_session_ttl_minutes()
+
+
+class ReservationService:
+    def __init__(self, repo: ReservationRepository, ttl_minutes: int = CHECKOUT_SESSION_TTL_MINUTES):
+        self.repo = repo
+        self.ttl = timedelta(minutes=ttl_minutes)
+
+    def hold(self, items: List[Tuple[UUID, int]]) -> Tuple[UUID, datetime, List[StockReservation]]:
+        """
+        Reserva las líneas (producto, cantidad) de un checkout.
+        Retorna (reservation_id, vencimiento, reservas).
+
+        Raises:
+            ProductNotFoundError, InsufficientStockError: Ver ReservationRepository.hold.
+        """
+        reservation_id = uuid4()
+        # En segundos enteros: Stripe recibe exactamente este vencimiento
+        expires_at = (get_local_time() + self.ttl).replace(microsecond=0)
+        reservations = self.repo.hold(reservation_id, items, expires_at)
+        return reservation_id, expires_at, reservations
+
+    def convert(self, reservation_id: UUID) -> int:
+        return self.repo.convert(reservation_id)
+
+    def release(self, reservation_id: UUID) -> int:
+        return self.repo.release(reservation_id)
+
+    def expire_stale(self, now: Optional[datetime] = None) -> int:
+        """Marca como vencidas las reservas cuyo checkout no se completó a tiempo."""
+        count = self.repo.expire(now or get_local_time())
+        if count:
+            logger.info(f"{count} reservas de stock vencidas")
+        return count
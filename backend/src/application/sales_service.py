@@ -1,4 +1,4 @@
-from typing import List, Optional
+from typing import List, Optional, Tuple
 from uuid import UUID
 from decimal import Decimal
 from datetime import datetime
@@ -47,8 +47,28 @@ class SalesService:
         self.repo.save(order)
         return order
 
-    def list_sales_orders(self) -> List[SalesOrder]:
-        return self.repo.find_all()
+    def list_sales_orders(
+        self,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        status: Optional[str] = None,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        customer_email: Optional[str] = None,
+        product_id: Optional[UUID] = None
+    ) -> Tuple[List[SalesOrder], Optional[str]]:
+        """
+        Lista órdenes paginadas por cursor. Retorna (órdenes, cursor siguiente).
+        """
+        return self.repo.find_page(
+            limit=limit,
+            cursor=cursor,
+            status=status,
+            start_date=start_date,
+            end_date=end_date,
+            customer_email=customer_email,
+            product_id=product_id
+        )
 
     def get_sales_order(self, order_id: UUID) -> Optional[SalesOrder]:
         return self.repo.find_by_id(order_id)
@@ -100,5 +120,7 @@ class SalesService:
     def delete_sales_order(self, order_id: UUID) -> None:
         self.repo.delete(order_id)
 
-    def get_kpis(self) -> dict:
-        return self.repo.get_kpis()
+    def get_kpis(self, window_days: Optional[int] = None, use_cache: bool = True) -> dict:
+        if use_cache:
+            return self.repo.get_cached_kpis(window_days)
+        return self.repo.get_kpis(window_days)
@@ -1,15 +1,30 @@
 """
 Application services for inventory management.
 """
+import logging
+import os
+from collections import defaultdict
 from decimal import Decimal
+from itertools import islice
 from uuid import UUID
-from typing import Optional
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 from datetime import datetime
 
-from src.domain.entities import Product
-from src.domain.exceptions import ProductNotFoundError
+from pydantic import ValidationError
+
+from src.domain.entities import Movement, Product
+from src.domain.exceptions import BulkStockError, InsufficientStockError, ProductNotFoundError
+from src.domain.schemas import ProductCreateRequest
 from src.ports.repository import ProductRepository
 
+logger = logging.getLogger(__name__)
+
+# Filas por lote (un upsert por lote) al importar catálogos
+PRODUCT_IMPORT_BATCH_SIZE = int(os.getenv("PRODUCT_IMPORT_BATCH_SIZE", "500"))
+# Campos del catálogo que se pueden importar (el SKU es la clave; el stock
+# solo cambia con movimientos)
+IMPORT_FIELDS = frozenset(ProductCreateRequest.model_fields) - {"sku"}
+
 
 class InventoryService:
     """
@@ -75,10 +90,12 @@ class InventoryService:
         reference: str = "N/A", 
         document_path: Optional[str] = None,
         is_return: bool = False,
-        parent_id: Optional[UUID] = None
+        parent_id: Optional[UUID] = None,
+        purchase_order_id: Optional[UUID] = None
     ) -> Product:
         """
         Añade stock al producto y registra el movimiento (Entra por compra o Retorno).
+        Con `purchase_order_id` la entrada queda vinculada a la OC (una sola por OC).
         """
         if quantity <= 0:
             raise ValueError("La cantidad debe ser positiva")
@@ -94,14 +111,23 @@ class InventoryService:
             reference=reference,
             document_path=document_path,
             parent_id=parent_id,
-            product_name=product.name
+            product_name=product.name,
+            purchase_order_id=purchase_order_id
         )
         
-        self._repository.save(product)
+        # El movimiento va primero: si la OC ya fue recibida, el índice único
+        # lo rechaza antes de tocar el stock
         if hasattr(self._repository, 'save_movement'):
             self._repository.save_movement(movement)
+        self._repository.save(product)
             
         return product
+
+    def has_purchase_order_receipt(self, purchase_order_id: UUID) -> bool:
+        """
+        Indica si la entrada de stock de una orden de compra ya fue registrada.
+        """
+        return self._repository.exists_movement_for_purchase_order(purchase_order_id)
     
     def sell_product(
         self, 
@@ -154,6 +180,131 @@ class InventoryService:
             
         return product
 
+    def receive_stock_bulk(self, lines: List[Tuple[UUID, int, str]]) -> List[Tuple[Movement, int]]:
+        """
+        Entrada de stock de varias líneas (producto, cantidad, referencia) en
+        una sola operación. Retorna (movimiento, stock resultante) por línea.
+        """
+        return self._apply_bulk(lines, movement_type="INGRESO", sign=1)
+
+    def sell_stock_bulk(
+        self,
+        lines: List[Tuple[UUID, int, str]],
+        applicant: Optional[str] = None,
+        applicant_area: Optional[str] = None
+    ) -> List[Tuple[Movement, int]]:
+        """
+        Salida (consumo interno) de varias líneas en una sola operación.
+        Retorna (movimiento, stock resultante) por línea.
+        """
+        return self._apply_bulk(
+            lines, movement_type="CONSUMO INTERNO", sign=-1,
+            applicant=applicant, applicant_area=applicant_area
+        )
+
+    def _apply_bulk(self, lines, movement_type: str, sign: int, **movement_fields) -> List[Tuple[Movement, int]]:
+        """
+        Valida todas las líneas antes de tocar el stock (si alguna falla no se
+        aplica ninguna) y aplica el lote con apply_stock_movements.
+
+        Raises:
+            BulkStockError: Con el detalle de cada línea inválida
+        """
+        products = self._repository.find_by_ids(pid for pid, _, _ in lines)
+        errors = []
+        totals = defaultdict(int)
+        for i, (product_id, quantity, _) in enumerate(lines):
+            if quantity <= 0:
+                errors.append({"line": i, "product_id": str(product_id), "error": "La cantidad debe ser positiva"})
+            elif product_id not in products:
+                errors.append({"line": i, "product_id": str(product_id), "error": str(ProductNotFoundError(str(product_id)))})
+            else:
+                totals[product_id] += quantity
+
+        if sign < 0:
+            # La suma de todas las líneas de un producto debe caber en su stock
+            for i, (product_id, _, _) in enumerate(lines):
+                if product_id in totals and totals[product_id] > products[product_id].stock:
+                    error = InsufficientStockError(available=products[product_id].stock, requested=totals[product_id])
+                    errors.append({"line": i, "product_id": str(product_id), "error": str(error)})
+        if errors:
+            raise BulkStockError(sorted(errors, key=lambda e: e["line"]))
+
+        movements = [
+            Movement(
+                product_id=product_id,
+                quantity=quantity,
+                type=movement_type,
+                reference=reference,
+                product_name=products[product_id].name,
+                **movement_fields
+            )
+            for product_id, quantity, reference in lines
+        ]
+        stocks = self._repository.apply_stock_movements(
+            {pid: sign * total for pid, total in totals.items()}, movements
+        )
+        return [(m, stocks[m.product_id]) for m in movements]
+
+    def import_products(
+        self,
+        rows: Iterable[Tuple[int, Dict[str, object]]],
+        batch_size: int = PRODUCT_IMPORT_BATCH_SIZE
+    ) -> Iterator[dict]:
+        """
+        Importa un catálogo fila por fila: valida cada fila y hace upsert por
+        SKU en lotes de `batch_size`. Los productos nuevos entran con stock 0;
+        en los existentes solo se sobrescriben las celdas con valor (una celda
+        vacía conserva el valor actual).
+
+        Args:
+            rows: (número de fila, {columna: valor}) en orden de lectura
+
+        Yields:
+            Un evento de progreso por lote con los errores de sus filas y, al
+            final, el resumen `{"done": True, ...}`.
+        """
+        rows = iter(rows)
+        processed = upserted = failed = 0
+
+        while True:
+            batch = list(islice(rows, batch_size))
+            if not batch:
+                break
+
+            errors = []
+            by_sku: Dict[str, Tuple[int, Product, frozenset]] = {}
+            for row_number, row in batch:
+                try:
+                    data = ProductCreateRequest.model_validate(
+                        {k: v for k, v in row.items() if v is not None}
+                    )
+                except ValidationError as e:
+                    detail = "; ".join(f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in e.errors())
+                    errors.append({"row": row_number, "error": detail})
+                    continue
+                fields = frozenset(IMPORT_FIELDS & data.model_fields_set)
+                # Un SKU repetido en el lote: gana la última fila
+                by_sku[data.sku] = (row_number, Product(stock=0, **data.model_dump()), fields)
+
+            # Un upsert por cada combinación de columnas con valor (normalmente una)
+            groups: Dict[frozenset, List[Tuple[int, Product]]] = defaultdict(list)
+            for row_number, product, fields in by_sku.values():
+                groups[fields].append((row_number, product))
+            for fields, group in groups.items():
+                try:
+                    self._repository.upsert_by_sku([p for _, p in group], sorted(fields))
+                    upserted += len(group)
+                except Exception as e:
+                    logger.error(f"Error importando lote de productos: {e}")
+                    errors.extend({"row": row_number, "error": str(e)} for row_number, _ in group)
+
+            processed += len(batch)
+            failed += len(errors)
+            yield {"processed": processed, "upserted": upserted, "failed": failed, "errors": errors}
+
+        yield {"done": True, "processed": processed, "upserted": upserted, "failed": failed}
+
     def get_movements(self, skip: int = 0, limit: int = 100) -> list:
         """
         Retorna todos los movimientos registrados con paginación.
@@ -162,6 +313,20 @@ class InventoryService:
             return self._repository.find_all_movements(skip=skip, limit=limit)
         return []
 
+    def iter_movements(
+        self,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        movement_type: Optional[str] = None,
+        product_id: Optional[UUID] = None,
+    ) -> Iterator[Movement]:
+        """
+        Recorre todos los movimientos filtrados en orden cronológico (exportación).
+        """
+        return self._repository.iter_movements(
+            start_date=start_date, end_date=end_date, movement_type=movement_type, product_id=product_id
+        )
+
     def get_pending_returns(self, product_id: Optional[UUID] = None) -> list:
         """
         Calcula qué salidas 'devolutivas' aún no han sido retornadas completamente.
@@ -204,6 +369,10 @@ class InventoryService:
         """Lists all products in the inventory with pagination."""
         return self._repository.find_all(skip=skip, limit=limit)
 
+    def search_products(self, query: str, skip: int = 0, limit: int = 100) -> list[Product]:
+        """Busca productos por nombre, descripción o SKU, los más relevantes primero."""
+        return self._repository.search(query, skip=skip, limit=limit)
+
     def update_product(
         self,
         product_id: UUID,
@@ -2,8 +2,9 @@
 Stripe Checkout integration service.
 """
 import os
+from datetime import datetime
 from decimal import Decimal
-from typing import List
+from typing import List, Optional
 from uuid import uuid4
 
 import stripe
@@ -27,10 +28,14 @@ class StripeService:
         shipping_type: str = "PICKUP",
         shipping_address: str = "",
         apply_discount: bool = False,
+        reservation_id: Optional[str] = None,
+        expires_at: Optional[datetime] = None,
     ) -> dict:
         """
         Create a Stripe Checkout Session.
         Each item: {product_name, unit_price (Decimal), quantity (int), product_id (str)}
+        `reservation_id` (stock hold) is stored in the metadata and `expires_at`
+        sets the session expiry so both end at the same time.
         """
         api_key = os.getenv("STRIPE_API_KEY", "")
 
@@ -60,6 +65,7 @@ class StripeService:
                 "items_json": items_json,
                 "shipping_type": shipping_type,
                 "shipping_address": shipping_address,
+                "reservation_id": reservation_id or "",
                 "is_mock": "True"
             }
 
@@ -120,6 +126,20 @@ class StripeService:
             if len(items_json) > 500:
                 items_json = items_json[:497] + "..."
 
+            metadata = {
+                "customer_email": customer_email,
+                "customer_name": customer_name[:40], # limit name length
+                "apply_discount": str(apply_discount),
+                "shipping_type": shipping_type,
+                "shipping_address": shipping_address[:400], # limit address length
+                "items_json": items_json,
+            }
+            extra = {}
+            if reservation_id:
+                metadata["reservation_id"] = reservation_id
+            if expires_at:
+                extra["expires_at"] = int(expires_at.timestamp())
+
             session = stripe.checkout.Session.create(
                 payment_method_types=["card"],
                 line_items=line_items,
@@ -127,14 +147,8 @@ class StripeService:
                 customer_email=customer_email,
                 success_url=f"{ECOMMERCE_FRONTEND_URL}/order-confirmation?session_id={{CHECKOUT_SESSION_ID}}",
                 cancel_url=f"{ECOMMERCE_FRONTEND_URL}/cart",
-                metadata={
-                    "customer_email": customer_email,
-                    "customer_name": customer_name[:40], # limit name length
-                    "apply_discount": str(apply_discount),
-                    "shipping_type": shipping_type,
-                    "shipping_address": shipping_address[:400], # limit address length
-                    "items_json": items_json,
-                },
+                metadata=metadata,
+                **extra,
             )
         except stripe.error.StripeError as e:
             logger.error(f"Stripe API error: {e}")
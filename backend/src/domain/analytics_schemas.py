@@ -1,7 +1,8 @@
 from decimal import Decimal
 from typing import List, Optional
-from datetime import date
-from pydantic import BaseModel
+from datetime import date, datetime
+from uuid import UUID
+from pydantic import BaseModel, ConfigDict
 
 class MonthlyDataPoint(BaseModel):
     month: str              # "Ene 2025", "Feb 2025"...
@@ -42,3 +43,37 @@ class AnalyticsSummary(BaseModel):
     monthly_data: List[MonthlyDataPoint]
     top_products: List[TopProductMetric]
     unit_costs: List[UnitCostMetric]
+
+class StockPositionResponse(BaseModel):
+    product_id: UUID
+    sku: str
+    name: str
+    stock: int
+    unit_cost: Optional[Decimal] = None   # Costo de la última compra recibida
+    value: Optional[Decimal] = None       # stock * unit_cost
+
+class InventoryValuationResponse(BaseModel):
+    as_of: datetime                       # Corte (movimientos anteriores a este instante)
+    total_units: int
+    total_value: Decimal
+    unvalued_products: int                # Productos con stock sin compras para valorizar
+    items: List[StockPositionResponse]
+
+class StockDiscrepancyResponse(BaseModel):
+    product_id: UUID
+    sku: str
+    stock: int                            # products.stock
+    expected_stock: int                   # Según los movimientos
+    difference: int                       # stock - expected_stock
+    corrected: bool = False               # Se registró un movimiento de ajuste
+
+    model_config = ConfigDict(from_attributes=True)
+
+class ReconciliationRunResponse(BaseModel):
+    id: UUID
+    high_water_mark: datetime             # Movimientos procesados hasta este instante
+    movements_applied: int
+    corrections: int
+    discrepancies: List[StockDiscrepancyResponse]
+
+    model_config = ConfigDict(from_attributes=True)
@@ -0,0 +1,113 @@
+"""
+Catálogo público de la tienda: disponibilidad, filtros y facetas.
+"""
+from dataclasses import dataclass
+from datetime import datetime
+from decimal import Decimal
+from typing import Dict, List, Optional, Tuple
+
+from src.domain.entities import Product, get_local_time
+
+IN_STOCK = "in_stock"
+PREORDER = "preorder"
+COMING_SOON = "coming_soon"
+AVAILABILITIES = (IN_STOCK, PREORDER, COMING_SOON)
+
+SORT_NAME = "name"
+SORT_PRICE_ASC = "price_asc"
+SORT_PRICE_DESC = "price_desc"
+SORT_RELEVANCE = "relevance"  # solo con búsqueda de texto
+CATALOG_SORTS = (SORT_NAME, SORT_PRICE_ASC, SORT_PRICE_DESC, SORT_RELEVANCE)
+
+# Límites inferiores de los rangos de precio de las facetas (el último es abierto)
+PRICE_FACET_BANDS = (Decimal("0"), Decimal("50"), Decimal("100"), Decimal("200"))
+
+
+@dataclass(slots=True)
+class CatalogQuery:
+    """Filtros y orden del catálogo público. El precio es el que se muestra (el de preventa si aplica)."""
+    q: Optional[str] = None
+    min_price: Optional[Decimal] = None
+    max_price: Optional[Decimal] = None
+    availability: Optional[Tuple[str, ...]] = None  # cualquiera de estas
+    sort: Optional[str] = None
+
+    @property
+    def effective_sort(self) -> str:
+        if self.sort:
+            return self.sort
+        return SORT_RELEVANCE if self.q and self.q.strip() else SORT_NAME
+
+
+def _local(moment: datetime) -> datetime:
+    # Hora local sin zona horaria, como se guarda en la BD
+    if moment.tzinfo is None:
+        return moment
+    return moment.astimezone(get_local_time().tzinfo).replace(tzinfo=None)
+
+
+def preorder_status(product: Product, now: datetime) -> str:
+    """
+    Estado que la tienda muestra para el producto:
+
+    - Preventa: marcado como preventa y con fecha estimada aún no cumplida
+      (o sin fecha). Es cuando el checkout cobra el precio de preventa.
+    - Próximo arribo: sin stock, fuera de preventa, pero marcado o con una
+      compra pendiente (se vende a precio normal cuando llegue).
+    - En stock: el resto.
+
+    `now` y `estimated_delivery_date` se comparan en hora local; las fechas
+    sin zona horaria se asumen locales.
+    """
+    marked = bool(product.is_preorder)
+    date_passed = product.estimated_delivery_date is not None and _local(product.estimated_delivery_date) <= _local(now)
+    if marked and not date_passed:
+        return PREORDER
+    if product.stock <= 0 and (marked or product.has_pending_purchase_orders):
+        return COMING_SOON
+    return IN_STOCK
+
+
+def public_availability(product: Product, now: datetime) -> Optional[str]:
+    """
+    Estado del producto en el catálogo de la tienda, o None si no se lista:
+    se listan los que tienen precio y tienen stock, están marcados como
+    preventa o tienen una compra pendiente.
+    """
+    if not product.retail_price or product.retail_price <= 0:
+        return None
+    if not (product.stock > 0 or product.is_preorder or product.has_pending_purchase_orders):
+        return None
+    return preorder_status(product, now)
+
+
+def display_price(product: Product, availability: Optional[str]) -> Optional[Decimal]:
+    """Precio que ve el cliente: el de preventa si está activa y definido."""
+    if availability == PREORDER and product.preorder_price is not None:
+        return product.preorder_price
+    return product.retail_price
+
+
+def price_bands() -> List[Tuple[Decimal, Optional[Decimal]]]:
+    """Rangos [desde, hasta) de las facetas de precio; el último no tiene tope."""
+    return list(zip(PRICE_FACET_BANDS, PRICE_FACET_BANDS[1:] + (None,)))
+
+
+def catalog_facets(
+    total: int,
+    availability: Dict[str, int],
+    min_price: Optional[Decimal],
+    max_price: Optional[Decimal],
+    band_counts: List[int],
+) -> dict:
+    """Facetas del catálogo con todas las disponibilidades y rangos de precio (en cero si no hay conteo)."""
+    counts = list(band_counts) + [0] * (len(PRICE_FACET_BANDS) - len(band_counts))
+    return {
+        "total": total,
+        "availability": {a: availability.get(a, 0) for a in AVAILABILITIES},
+        "price": {
+            "min": min_price,
+            "max": max_price,
+            "bands": [{"min": low, "max": high, "count": count} for (low, high), count in zip(price_bands(), counts)],
+        },
+    }
@@ -16,7 +16,7 @@ def get_local_time():
     return datetime.now(tz)
 
 
-@dataclass
+@dataclass(slots=True)
 class Product:
     """
     Entidad Product que representa un producto en el inventario.
@@ -102,7 +102,7 @@ class User:
 
 
 
-@dataclass
+@dataclass(slots=True)
 class Movement:
     """
     Entidad Movement que representa cualquier entrada o salida de stock.
@@ -120,6 +120,7 @@ class Movement:
     sales_order_id: Optional[UUID] = None
     parent_id: Optional[UUID] = None
     product_name: Optional[str] = None
+    purchase_order_id: Optional[UUID] = None  # OC que originó la entrada (una entrada por OC)
     id: UUID = field(default_factory=uuid4)
     date: datetime = field(default_factory=get_local_time)
 
@@ -33,3 +33,12 @@ class ProductNotFoundError(DomainException):
     def __init__(self, product_id: str):
         self.product_id = product_id
         super().__init__(f"Producto con ID {product_id} no encontrado")
+
+
+class BulkStockError(DomainException):
+    """Se lanza cuando alguna línea de una operación masiva de stock no es válida."""
+
+    def __init__(self, errors: list):
+        # Cada error: {"line": índice, "product_id": ..., "error": mensaje}
+        self.errors = errors
+        super().__init__(f"{len(errors)} líneas con errores; no se aplicó ningún cambio")
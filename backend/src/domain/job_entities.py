@@ -0,0 +1,31 @@
+"""
+Entidades de dominio para la cola de trabajos en segundo plano.
+"""
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Optional
+from uuid import UUID, uuid4
+
+from .entities import get_local_time
+
+# Tipos de trabajo
+MOVEMENT_RECEIPT_JOB = "movement_receipt"
+
+
+@dataclass
+class Job:
+    """
+    Trabajo persistente procesado fuera del ciclo de la petición HTTP.
+
+    Estados: PENDING (en cola o esperando reintento), RUNNING (tomado por un
+    worker), DONE y FAILED (agotó sus reintentos).
+    """
+    kind: str
+    payload: dict
+    status: str = "PENDING"
+    attempts: int = 0
+    max_attempts: int = 5
+    run_after: datetime = field(default_factory=get_local_time)
+    last_error: Optional[str] = None
+    id: UUID = field(default_factory=uuid4)
+    created_at: datetime = field(default_factory=get_local_time)
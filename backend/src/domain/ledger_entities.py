@@ -0,0 +1,80 @@
+"""
+Entidades de dominio del libro de stock: checkpoints diarios, posiciones de
+inventario a una fecha y conciliación del stock con los movimientos.
+"""
+from dataclasses import dataclass, field
+from datetime import datetime
+from decimal import Decimal
+from typing import List, Optional
+from uuid import UUID, uuid4
+
+from .entities import get_local_time
+
+# Movimientos de corrección que registra la conciliación
+ADJUSTMENT_IN = "AJUSTE ENTRADA"
+ADJUSTMENT_OUT = "AJUSTE SALIDA"
+
+# Tipos de movimiento que suman o restan stock
+INBOUND_MOVEMENT_TYPES = ("ENTRY", "INGRESO", "RETURN", ADJUSTMENT_IN)
+OUTBOUND_MOVEMENT_TYPES = ("EXIT", "CONSUMO INTERNO", "VENTA", ADJUSTMENT_OUT)
+
+
+def movement_delta(movement_type: str, quantity: int) -> int:
+    """Variación de stock que produce un movimiento."""
+    if movement_type in INBOUND_MOVEMENT_TYPES:
+        return quantity
+    if movement_type in OUTBOUND_MOVEMENT_TYPES:
+        return -quantity
+    return 0
+
+
+@dataclass
+class StockPosition:
+    """
+    Stock de un producto en un instante `as_of` (movimientos con fecha
+    anterior a `as_of`), valorizado al costo de la última compra recibida
+    hasta ese momento (None si no hay compras).
+    """
+    product_id: UUID
+    sku: str
+    name: str
+    stock: int
+    unit_cost: Optional[Decimal] = None
+
+    @property
+    def value(self) -> Optional[Decimal]:
+        return self.stock * self.unit_cost if self.unit_cost is not None else None
+
+
+@dataclass
+class StockDiscrepancy:
+    """
+    Diferencia entre `products.stock` y el stock que resulta de los
+    movimientos. `corrected` indica que se registró un movimiento de ajuste.
+    """
+    product_id: UUID
+    sku: str
+    stock: int
+    expected_stock: int
+    corrected: bool = False
+
+    @property
+    def difference(self) -> int:
+        return self.stock - self.expected_stock
+
+
+@dataclass
+class ReconciliationRun:
+    """
+    Una pasada de conciliación: incorpora los movimientos con fecha anterior a
+    `high_water_mark` que no procesó la pasada anterior.
+    """
+    high_water_mark: datetime
+    movements_applied: int = 0
+    discrepancies: List[StockDiscrepancy] = field(default_factory=list)
+    id: UUID = field(default_factory=uuid4)
+    started_at: datetime = field(default_factory=get_local_time)
+
+    @property
+    def corrections(self) -> int:
+        return sum(1 for d in self.discrepancies if d.corrected)
@@ -3,7 +3,7 @@ Schemas for the public ecommerce API (no API key required).
 """
 from decimal import Decimal
 from uuid import UUID
-from typing import Optional, List
+from typing import Dict, Optional, List
 from datetime import datetime
 from pydantic import BaseModel, Field, ConfigDict, EmailStr, field_validator
 
@@ -39,6 +39,24 @@ class PublicProductResponse(BaseModel):
         return "/" + v
 
 
+class PriceBand(BaseModel):
+    min: Decimal
+    max: Optional[Decimal] = None  # None: open-ended top band
+    count: int
+
+
+class PriceFacet(BaseModel):
+    min: Optional[Decimal] = None
+    max: Optional[Decimal] = None
+    bands: List[PriceBand]
+
+
+class CatalogFacetsResponse(BaseModel):
+    total: int
+    availability: Dict[str, int]
+    price: PriceFacet
+
+
 # --- Customer Auth Schemas ---
 
 class CustomerRegister(BaseModel):
@@ -21,7 +21,7 @@ class Supplier:
     product_ids: List[UUID] = field(default_factory=list)
     id: UUID = field(default_factory=uuid4)
 
-@dataclass
+@dataclass(slots=True)
 class PurchaseOrder:
     supplier_id: UUID
     product_id: UUID
@@ -2,7 +2,7 @@ from decimal import Decimal
 from uuid import UUID
 from typing import Optional, List
 from datetime import datetime
-from pydantic import BaseModel, Field, ConfigDict
+from pydantic import BaseModel, Field, ConfigDict, model_validator
 
 class SupplierCreate(BaseModel):
     name: str = Field(..., min_length=1, max_length=200)
@@ -101,6 +101,20 @@ class PurchaseOrderResponse(BaseModel):
     
     model_config = ConfigDict(from_attributes=True)
 
+class PurchaseOrderExportRequest(BaseModel):
+    """Selección de órdenes para la exportación masiva de PDFs (lista de IDs o rango de fechas)."""
+    order_ids: Optional[List[UUID]] = Field(None, max_length=5000)
+    start_date: Optional[datetime] = None
+    end_date: Optional[datetime] = None
+
+    @model_validator(mode="after")
+    def check_selection(self):
+        if not self.order_ids and not (self.start_date and self.end_date):
+            raise ValueError("Debe indicar order_ids o un rango start_date/end_date")
+        if self.start_date and self.end_date and self.start_date > self.end_date:
+            raise ValueError("start_date debe ser anterior a end_date")
+        return self
+
 class PurchaseKPIsResponse(BaseModel):
     quality_rate: float
     total_cta: Decimal
@@ -0,0 +1,37 @@
+"""
+Entidades de dominio para las reservas de stock del checkout.
+"""
+from dataclasses import dataclass, field
+from datetime import datetime
+from uuid import UUID, uuid4
+
+from .entities import get_local_time
+
+# Estados de una reserva
+RESERVATION_ACTIVE = "ACTIVE"
+RESERVATION_CONVERTED = "CONVERTED"
+RESERVATION_RELEASED = "RELEASED"
+RESERVATION_EXPIRED = "EXPIRED"
+
+
+@dataclass
+class StockReservation:
+    """
+    Unidades de un producto apartadas para un checkout en curso.
+
+    Todas las líneas de un mismo checkout comparten `reservation_id`, que viaja
+    en la metadata de la sesión de Stripe. Mientras está ACTIVE y no vence,
+    la cantidad se descuenta del stock disponible para otros checkouts.
+    Pasa a CONVERTED al crearse la orden, RELEASED si el checkout falla y
+    EXPIRED cuando el planificador la limpia tras vencer.
+    """
+    reservation_id: UUID
+    product_id: UUID
+    quantity: int
+    expires_at: datetime
+    status: str = RESERVATION_ACTIVE
+    id: UUID = field(default_factory=uuid4)
+    created_at: datetime = field(default_factory=get_local_time)
+
+    def is_active(self, now: datetime) -> bool:
+        return self.status == RESERVATION_ACTIVE and self.expires_at > now
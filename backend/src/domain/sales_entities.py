@@ -8,7 +8,7 @@ def get_local_time():
     tz = timezone(timedelta(hours=-5))
     return datetime.now(tz)
 
-@dataclass
+@dataclass(slots=True)
 class SalesOrder:
     customer_name: str
     customer_email: str
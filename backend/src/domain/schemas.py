@@ -106,6 +106,7 @@ class MovementResponse(BaseModel):
     parent_id: Optional[UUID] = None
     product_name: Optional[str] = None
     sales_order_id: Optional[UUID] = None
+    purchase_order_id: Optional[UUID] = None
     date: datetime
     
     model_config = ConfigDict(from_attributes=True)
@@ -157,6 +158,43 @@ class PendingReturnResponse(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
 
+# Líneas máximas por operación masiva de stock
+MAX_BULK_LINES = 1000
+
+
+class BulkStockLine(BaseModel):
+    """One line of a bulk stock operation."""
+
+    product_id: UUID
+    quantity: int = Field(..., gt=0, description="Quantity (must be positive)")
+    reference: str = Field("S/N", max_length=100, description="Purchase Order, Invoice, or Reference number")
+
+
+class BulkReceiveRequest(BaseModel):
+    """Schema for bulk stock receipt."""
+
+    lines: list[BulkStockLine] = Field(..., min_length=1, max_length=MAX_BULK_LINES)
+
+
+class BulkSellRequest(BaseModel):
+    """Schema for bulk stock dispatch (internal consumption)."""
+
+    lines: list[BulkStockLine] = Field(..., min_length=1, max_length=MAX_BULK_LINES)
+    applicant: Optional[str] = None
+    applicant_area: Optional[str] = None
+
+
+class BulkStockLineResult(BaseModel):
+    """Result of one line of a bulk stock operation."""
+
+    line: int
+    product_id: UUID
+    movement_id: UUID
+    quantity: int
+    reference: str
+    stock: int = Field(..., description="Product stock after the whole operation")
+
+
 class ErrorResponse(BaseModel):
     """Schema for error responses."""
     
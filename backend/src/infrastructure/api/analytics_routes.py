@@ -1,10 +1,21 @@
 from fastapi import APIRouter, Depends, Query
 from typing import Annotated, Optional
+from uuid import UUID
 from datetime import datetime, timedelta
 from src.application.analytics_service import AnalyticsService
+from src.application.ledger_service import LedgerService, ReconciliationService
+from src.domain.entities import get_local_time
 from src.infrastructure.repositories.postgres_analytics_repository import PostgresAnalyticsRepository
+from src.infrastructure.repositories.postgres_ledger_repository import PostgresLedgerRepository
 from src.infrastructure.api.dependencies import get_db
-from src.domain.analytics_schemas import AnalyticsSummary, PriceVariationResponse
+from src.infrastructure.api.date_params import end_of_day_param
+from src.domain.analytics_schemas import (
+    AnalyticsSummary,
+    PriceVariationResponse,
+    InventoryValuationResponse,
+    ReconciliationRunResponse,
+    StockDiscrepancyResponse,
+)
 from sqlalchemy.orm import Session
 from src.infrastructure.api.security import get_api_key
 
@@ -17,6 +28,12 @@ def get_analytics_service(db: Session = Depends(get_db)) -> AnalyticsService:
     repo = PostgresAnalyticsRepository(db)
     return AnalyticsService(repo)
 
+def get_ledger_service(db: Session = Depends(get_db)) -> LedgerService:
+    return LedgerService(PostgresLedgerRepository(db))
+
+def get_reconciliation_service(db: Session = Depends(get_db)) -> ReconciliationService:
+    return ReconciliationService(PostgresLedgerRepository(db))
+
 @router.get("/dashboard", response_model=AnalyticsSummary)
 def get_dashboard_metrics(
     start_date: Optional[datetime] = None,
@@ -49,3 +66,39 @@ def get_price_variation(
         month = now.month
 
     return service.get_price_variation(year, month, product_id=product_id)
+
+@router.get("/inventory-valuation", response_model=InventoryValuationResponse)
+def get_inventory_valuation(
+    as_of: Optional[datetime] = None,
+    product_id: Optional[UUID] = None,
+    service: Annotated[LedgerService, Depends(get_ledger_service)] = None
+):
+    """
+    Stock y valorización del inventario a una fecha. Con solo la fecha
+    (ej. `as_of=2026-03-31`) se toma el cierre de ese día.
+    """
+    # Con solo la fecha, el corte es el inicio del día siguiente
+    as_of = end_of_day_param(as_of, exclusive=True) or get_local_time()
+    # Las fechas de los movimientos se guardan en hora local sin zona
+    as_of = as_of.replace(tzinfo=None)
+
+    return service.valuation(as_of, product_id=product_id)
+
+@router.post("/reconciliation", response_model=ReconciliationRunResponse)
+def run_reconciliation(
+    correct: Optional[bool] = None,
+    rebuild: bool = False,
+    service: Annotated[ReconciliationService, Depends(get_reconciliation_service)] = None
+):
+    """
+    Ejecuta una pasada de conciliación de stock vs. movimientos (la misma que
+    el job programado). `rebuild=true` recalcula los saldos desde cero.
+    """
+    return service.rebuild(correct) if rebuild else service.run(correct)
+
+@router.get("/reconciliation/discrepancies", response_model=list[StockDiscrepancyResponse])
+def get_stock_discrepancies(
+    service: Annotated[ReconciliationService, Depends(get_reconciliation_service)] = None
+):
+    """Productos cuyo stock no cuadraba con sus movimientos en la última conciliación."""
+    return service.pending_discrepancies()
@@ -0,0 +1,19 @@
+"""
+Parámetros de fecha de los listados y reportes.
+"""
+from datetime import datetime, timedelta
+from typing import Optional
+
+
+def end_of_day_param(value: Optional[datetime], exclusive: bool = False) -> Optional[datetime]:
+    """
+    Fin de un rango recibido por query. Si solo se envió la fecha
+    (`2026-03-31`, hora 00:00:00) cubre el día completo: hasta las 23:59:59
+    o, con `exclusive`, hasta las 00:00 del día siguiente (cortes que se
+    comparan con `<`).
+    """
+    if value is None or (value.hour, value.minute, value.second) != (0, 0, 0):
+        return value
+    if exclusive:
+        return value + timedelta(days=1)
+    return value.replace(hour=23, minute=59, second=59)
@@ -2,7 +2,8 @@
 Dependency Injection para FastAPI.
 """
 import os
-from typing import Generator, Any
+from contextlib import contextmanager
+from typing import Generator, Any, Iterator, Optional
 from fastapi import Depends, HTTPException
 from sqlalchemy.orm import Session
 from src.infrastructure.database.models import CustomerModel
@@ -13,12 +14,18 @@ from src.infrastructure.repositories.postgres_repository import PostgreSQLProduc
 from src.infrastructure.repositories.postgres_user_repository import PostgreSQLUserRepository
 from src.infrastructure.repositories.in_memory_repository import InMemoryProductRepository
 from src.infrastructure.repositories.postgres_sales_repository import PostgresSalesRepository
+from src.infrastructure.repositories.postgres_job_queue import PostgresJobQueue
+from src.infrastructure.repositories.postgres_reservation_repository import PostgresReservationRepository
+from src.infrastructure.repositories.in_memory_reservation_repository import InMemoryReservationRepository
 from src.ports.repository import ProductRepository, UserRepository
 from src.ports.sales_repository import SalesRepository
+from src.ports.job_queue import JobQueue
+from src.ports.reservation_repository import ReservationRepository
 
 
 # Singleton para la versión en memoria
 _in_memory_repo = InMemoryProductRepository()
+_in_memory_reservations = InMemoryReservationRepository(_in_memory_repo)
 
 
 def get_db() -> Generator[Any, None, None]:
@@ -38,6 +45,16 @@ def get_db() -> Generator[Any, None, None]:
         db.close()
 
 
+@contextmanager
+def db_session_scope() -> Iterator[Optional[Session]]:
+    """
+    Sesión propia, con la misma configuración que `get_db`, para respuestas en
+    streaming: el stream se consume después de que el handler retorna y de que
+    se cierre la sesión inyectada.
+    """
+    yield from get_db()
+
+
 def get_repository(db: Session = Depends(get_db)) -> ProductRepository:
     """
     Proporciona la implementación del repositorio según la configuración.
@@ -67,6 +84,25 @@ def get_inventory_service(
     return InventoryService(repository, sales_repository)
 
 
+@contextmanager
+def inventory_service_scope() -> Iterator[InventoryService]:
+    """
+    Servicio de inventario sobre `db_session_scope`.
+    """
+    with db_session_scope() as db:
+        yield get_inventory_service(get_repository(db), get_sales_repository(db))
+
+
+def get_job_queue(db: Session = Depends(get_db)) -> Optional[JobQueue]:
+    """
+    Proporciona la cola persistente de trabajos, o None en la versión en memoria
+    (sin base de datos no hay worker que la consuma).
+    """
+    if db is None:
+        return None
+    return PostgresJobQueue(db)
+
+
 # --- Auth Dependencies ---
 from src.infrastructure.security.encryption import BCryptPasswordHasher
 from src.infrastructure.security.tokens import JWTTokenProvider
@@ -90,6 +126,7 @@ from src.infrastructure.repositories.postgres_customer_repository import Postgre
 from src.application.customer_auth_service import CustomerAuthService
 from src.application.stripe_service import StripeService
 from src.application.ecommerce_service import EcommerceService
+from src.application.reservation_service import ReservationService
 
 
 def get_customer_auth_service(
@@ -99,15 +136,36 @@ def get_customer_auth_service(
     return CustomerAuthService(customer_repository=repo)
 
 
+def get_reservation_repository(db: Session = Depends(get_db)) -> ReservationRepository:
+    """
+    Reservas de stock: en memoria junto al repositorio de productos en memoria.
+    """
+    if db is None:
+        return _in_memory_reservations
+    return PostgresReservationRepository(db)
+
+
 def get_ecommerce_service(
     repository: ProductRepository = Depends(get_repository),
     sales_repository: SalesRepository = Depends(get_sales_repository),
+    reservation_repository: ReservationRepository = Depends(get_reservation_repository),
 ) -> EcommerceService:
     return EcommerceService(
         product_repository=repository,
         sales_repository=sales_repository,
         stripe_service=StripeService(),
+        reservation_service=ReservationService(reservation_repository),
     )
+
+
+@contextmanager
+def ecommerce_service_scope() -> Iterator[EcommerceService]:
+    """
+    Servicio de ecommerce sobre `db_session_scope`.
+    """
+    with db_session_scope() as db:
+        yield get_ecommerce_service(get_repository(db), get_sales_repository(db), get_reservation_repository(db))
+
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from fastapi import Header
 
@@ -0,0 +1,34 @@
+"""
+Serialización rápida para los listados grandes (opcional, `FAST_JSON_RESPONSES=true`).
+
+Por defecto las rutas validan cada entidad con `Model.model_validate` y FastAPI
+vuelve a validar contra `response_model` antes de serializar con `json`. Con
+el flag activo la lista se valida una sola vez con un `TypeAdapter` y se
+escribe directamente en bytes con el serializador de pydantic-core; la
+respuesta JSON es la misma (los validadores de los schemas se siguen aplicando).
+"""
+import os
+from functools import lru_cache
+from typing import Iterable, Type
+
+from fastapi import Response
+from pydantic import BaseModel, TypeAdapter
+
+
+def fast_json_enabled() -> bool:
+    return os.getenv("FAST_JSON_RESPONSES", "false").lower() == "true"
+
+
+@lru_cache(maxsize=None)
+def _list_adapter(model: Type[BaseModel]) -> TypeAdapter:
+    return TypeAdapter(list[model])
+
+
+def json_list_response(model: Type[BaseModel], items: Iterable) -> Response:
+    """
+    Valida `items` (entidades o dicts) contra `list[model]` y retorna el JSON
+    ya serializado, sin la segunda validación de `response_model`.
+    """
+    adapter = _list_adapter(model)
+    validated = adapter.validate_python(list(items), from_attributes=True)
+    return Response(content=adapter.dump_json(validated), media_type="application/json")
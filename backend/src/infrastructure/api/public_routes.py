@@ -2,14 +2,25 @@
 Public API routes for the ecommerce storefront.
 No API key required — open to the internet.
 """
+import json
 import logging
-from typing import Optional
+from decimal import Decimal
+from typing import Iterable, List, Literal, Optional
 from uuid import UUID
-from datetime import datetime, timezone, timedelta
 
-from fastapi import APIRouter, Depends, HTTPException, Header, Request
+from fastapi import APIRouter, Depends, HTTPException, Header, Query, Request, Response
+from fastapi.responses import StreamingResponse
 
+from src.domain.catalog_entities import (
+    COMING_SOON,
+    PREORDER,
+    CatalogQuery,
+    preorder_status,
+    public_availability,
+)
+from src.domain.entities import get_local_time
 from src.domain.public_schemas import (
+    CatalogFacetsResponse,
     PublicProductResponse,
     CustomerRegister,
     CustomerLogin,
@@ -21,6 +32,7 @@ from src.domain.public_schemas import (
     EcommerceOrderResponse,
 )
 from .dependencies import (
+    ecommerce_service_scope,
     get_customer_auth_service,
     get_ecommerce_service,
     get_current_customer,
@@ -28,6 +40,7 @@ from .dependencies import (
 from src.application.customer_auth_service import CustomerAuthService
 from src.application.ecommerce_service import EcommerceService
 from src.infrastructure.database.models import CustomerModel
+from src.infrastructure.repositories.pagination import MAX_PAGE_SIZE
 
 logger = logging.getLogger(__name__)
 
@@ -36,60 +49,64 @@ router = APIRouter(tags=["Public Ecommerce"])
 
 # ─── Products ────────────────────────────────────────────────────
 
+def catalog_params(
+    q: Optional[str] = Query(None, max_length=100, description="Search by name, description or SKU"),
+    min_price: Optional[Decimal] = Query(None, ge=0, description="Minimum displayed price (preorder price when active)"),
+    max_price: Optional[Decimal] = Query(None, ge=0, description="Maximum displayed price (preorder price when active)"),
+    availability: Optional[List[Literal["in_stock", "preorder", "coming_soon"]]] = Query(
+        None, description="Repeat to accept several values"
+    ),
+    sort: Optional[Literal["name", "price_asc", "price_desc", "relevance"]] = Query(
+        None, description="Defaults to relevance when searching, name otherwise"
+    ),
+) -> CatalogQuery:
+    return CatalogQuery(
+        q=q, min_price=min_price, max_price=max_price, availability=tuple(availability) if availability else None, sort=sort
+    )
+
+
+def _public_product_response(p, status: Optional[str]) -> PublicProductResponse:
+    # PRE-VENTA shows the promo price and delivery date; PRÓXIMO ARRIBO keeps the retail price
+    is_preorder = status == PREORDER
+    return PublicProductResponse(
+        id=p.id,
+        name=p.name,
+        description=p.description,
+        stock=p.stock,
+        retail_price=p.retail_price,
+        image_path=p.image_path,
+        is_preorder=is_preorder,
+        preorder_price=p.preorder_price if is_preorder else None,
+        estimated_delivery_date=p.estimated_delivery_date if is_preorder else None,
+        preorder_description=p.preorder_description if is_preorder else ("Próximo arribo" if status == COMING_SOON else None),
+    )
+
+
 @router.get("/products", response_model=list[PublicProductResponse])
 def public_list_products(
     ecommerce: EcommerceService = Depends(get_ecommerce_service),
+    catalog: CatalogQuery = Depends(catalog_params),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
 ):
-    products = ecommerce.list_public_products()
-    now = datetime.now(timezone(timedelta(hours=-5)))
-    result = []
-    for p in products:
-        # Preorder is active if:
-        # 1. Manually marked as preorder and has no stock (even if date passed, until arrived)
-        # 2. Has pending purchase orders and has no stock (automatic preorder/coming soon)
-        # OR 3. Manually marked, date hasn't passed (standard logic)
-        
-        is_preorder_marked = p.is_preorder
-        
-        # Ensure estimated_delivery_date is aware before comparison
-        est_date = p.estimated_delivery_date
-        if est_date and est_date.tzinfo is None:
-            est_date = est_date.replace(tzinfo=timezone(timedelta(hours=-5)))
-            
-        date_passed = est_date is not None and est_date <= now
-        
-        preorder_active = (is_preorder_marked or p.has_pending_purchase_orders) and p.stock <= 0
-        if is_preorder_marked and not date_passed:
-            preorder_active = True
-        
-        # General Visibility: Show if has stock OR (stock is 0 BUT has pending PO or is marked preorder)
-        # This keeps the product visible even if the PROMO price expired but stock hasn't arrived.
-        visibility_active = p.stock > 0 or is_preorder_marked or p.has_pending_purchase_orders
-        
-        if not visibility_active:
-            continue
-
-        # UI Status:
-        # - If preorder_active: show as "PRE-VENTA" with promo price
-        # - If stock is 0 but has pending PO / marked preorder (and date passed): show as "PRÓXIMO ARRIBO" (retail price)
-        # - Else: Standard product
-        
-        final_is_preorder = preorder_active
-        is_coming_soon = p.stock <= 0 and not preorder_active and (is_preorder_marked or p.has_pending_purchase_orders)
-        
-        result.append(PublicProductResponse(
-            id=p.id,
-            name=p.name,
-            description=p.description,
-            stock=p.stock,
-            retail_price=p.retail_price,
-            image_path=p.image_path,
-            is_preorder=final_is_preorder,
-            preorder_price=p.preorder_price if final_is_preorder else None,
-            estimated_delivery_date=p.estimated_delivery_date if final_is_preorder else None,
-            preorder_description=p.preorder_description if final_is_preorder else ("Próximo arribo" if is_coming_soon else None),
-        ))
-    return result
+    try:
+        products = ecommerce.list_public_products(catalog, skip=skip, limit=limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    now = get_local_time()
+    return [_public_product_response(p, public_availability(p, now)) for p in products]
+
+
+@router.get("/products/facets", response_model=CatalogFacetsResponse)
+def public_catalog_facets(
+    ecommerce: EcommerceService = Depends(get_ecommerce_service),
+    catalog: CatalogQuery = Depends(catalog_params),
+):
+    """Counts for the storefront filters; each facet ignores its own filter."""
+    try:
+        return ecommerce.public_catalog_facets(catalog)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 
 @router.get("/products/{product_id}", response_model=PublicProductResponse)
@@ -100,37 +117,7 @@ def public_get_product(
     product = ecommerce.get_public_product(product_id)
     if not product:
         raise HTTPException(status_code=404, detail="Producto no encontrado")
-    now = datetime.now(timezone(timedelta(hours=-5)))
-    
-    is_preorder_marked = product.is_preorder
-    
-    # Ensure estimated_delivery_date is aware before comparison
-    est_date = product.estimated_delivery_date
-    if est_date and est_date.tzinfo is None:
-        est_date = est_date.replace(tzinfo=timezone(timedelta(hours=-5)))
-        
-    date_passed = est_date is not None and est_date <= now
-    
-    preorder_active = (is_preorder_marked or product.has_pending_purchase_orders) and product.stock <= 0
-    if is_preorder_marked and not date_passed:
-        preorder_active = True
-    
-    # UI Status and Visibility
-    final_is_preorder = preorder_active
-    is_coming_soon = product.stock <= 0 and not preorder_active and (is_preorder_marked or product.has_pending_purchase_orders)
-
-    return PublicProductResponse(
-        id=product.id,
-        name=product.name,
-        description=product.description,
-        stock=product.stock,
-        retail_price=product.retail_price,
-        image_path=product.image_path,
-        is_preorder=final_is_preorder,
-        preorder_price=product.preorder_price if final_is_preorder else None,
-        estimated_delivery_date=product.estimated_delivery_date if final_is_preorder else None,
-        preorder_description=product.preorder_description if final_is_preorder else ("Próximo arribo" if is_coming_soon else None),
-    )
+    return _public_product_response(product, preorder_status(product, get_local_time()))
 
 
 # ─── Customer Auth ────────────────────────────────────────────────
@@ -254,10 +241,43 @@ def create_order_from_session(
         raise HTTPException(status_code=400, detail=str(e))
 
 
+def _stream_json_array(items: Iterable[dict]):
+    yield b"["
+    for i, item in enumerate(items):
+        yield (b"," if i else b"") + json.dumps(item).encode()
+    yield b"]"
+
+
 @router.get("/orders/my-orders")
 def get_my_orders(
+    response: Response,
     customer: CustomerModel = Depends(get_current_customer),
     ecommerce: EcommerceService = Depends(get_ecommerce_service),
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
 ):
-    orders = ecommerce.get_customer_orders(customer.email)
-    return orders
+    """
+    Customer order history, newest first.
+
+    With `limit` returns one page and sends the next page cursor in the
+    `X-Next-Cursor` header. Without it the full history is streamed as a
+    JSON array, fetched page by page.
+    """
+    if limit is not None or cursor:
+        try:
+            orders, next_cursor = ecommerce.get_customer_orders(
+                customer.email, limit=limit or MAX_PAGE_SIZE, cursor=cursor
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        if next_cursor:
+            response.headers["X-Next-Cursor"] = next_cursor
+        return orders
+
+    email = customer.email
+
+    def stream():
+        with ecommerce_service_scope() as service:
+            yield from _stream_json_array(service.iter_customer_orders(email))
+
+    return StreamingResponse(stream(), media_type="application/json")
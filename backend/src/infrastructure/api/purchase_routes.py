@@ -1,21 +1,23 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from typing import List, Annotated, Optional
 from uuid import UUID
 from datetime import datetime
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, StreamingResponse
 
 from src.application.purchase_service import PurchaseService
 from src.domain.purchase_schemas import (
     SupplierCreate, SupplierResponse, SupplierUpdate,
     PurchaseOrderCreate, PurchaseOrderResponse, 
     PurchaseOrderUpdate, PurchaseKPIsResponse,
-    PurchaseOrderDetailUpdate
+    PurchaseOrderDetailUpdate, PurchaseOrderExportRequest
 )
-from src.infrastructure.api.dependencies import get_db, get_inventory_service
+from src.infrastructure.api.date_params import end_of_day_param
+from src.infrastructure.api.dependencies import db_session_scope, get_db, get_inventory_service
 from src.application.services import InventoryService
 from src.infrastructure.repositories.postgres_purchase_repository import PostgresPurchaseRepository
+from src.infrastructure.repositories.pagination import MAX_PAGE_SIZE
 from src.infrastructure.api.security import get_api_key
-import uuid
+from src.infrastructure.api.uploads import save_upload
 import os
 import logging
 from fastapi import File, UploadFile, Form
@@ -104,11 +106,33 @@ def create_order(
 
 @router.get("/orders", response_model=List[PurchaseOrderResponse])
 def list_orders(
+    response: Response,
     service: Annotated[PurchaseService, Depends(get_purchase_service)],
-    skip: int = 0,
-    limit: int = 100
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    status: Optional[str] = None,
+    supplier_id: Optional[UUID] = None,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None
 ):
-    orders = service.list_purchase_orders(skip=skip, limit=limit)
+    """
+    Lista órdenes de compra (más recientes primero) con paginación por cursor.
+    El cursor de la siguiente página se envía en el header `X-Next-Cursor`.
+    """
+    end_date = end_of_day_param(end_date)
+    try:
+        orders, next_cursor = service.list_purchase_orders(
+            limit=limit,
+            cursor=cursor,
+            status=status,
+            supplier_id=supplier_id,
+            start_date=start_date,
+            end_date=end_date
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
     return [PurchaseOrderResponse.model_validate(o) for o in orders]
 
 @router.get("/orders/{order_id}/pdf")
@@ -132,6 +156,30 @@ def get_order_pdf(
         logger.error(f"Error generating PDF: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Error generating PDF: {str(e)}")
 
+@router.post("/orders/export")
+def export_orders_pdf(request: PurchaseOrderExportRequest):
+    """
+    Exporta los PDFs de varias órdenes de compra en un único ZIP (streaming).
+    Acepta una lista de IDs o un rango de fechas de creación.
+    """
+    end_date = end_of_day_param(request.end_date)
+
+    def stream():
+        with db_session_scope() as db:
+            service = PurchaseService(PostgresPurchaseRepository(db))
+            yield from service.export_orders_pdf_zip(
+                order_ids=request.order_ids,
+                start_date=request.start_date,
+                end_date=end_date
+            )
+
+    filename = f"ordenes-compra-{datetime.now().strftime('%Y%m%d-%H%M%S')}.zip"
+    return StreamingResponse(
+        stream(),
+        media_type="application/zip",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
 @router.patch("/orders/{order_id}", response_model=PurchaseOrderResponse)
 async def update_order(
     order_id: UUID,
@@ -150,22 +198,10 @@ async def update_order(
         invoice_path = None
         referral_guide_path = None
         
-        # Use /tmp for writable directory on Vercel
-        is_vercel = os.getenv("VERCEL") == "1"
-        upload_dir = "/tmp/uploads/documents" if is_vercel else "uploads/documents"
-        os.makedirs(upload_dir, exist_ok=True)
-
         if invoice_file:
-            invoice_path = f"{upload_dir}/{uuid.uuid4()}_{invoice_file.filename}"
-            with open(invoice_path, "wb") as buffer:
-                content = await invoice_file.read()
-                buffer.write(content)
-        
+            invoice_path = await save_upload(invoice_file, "documents")
         if referral_guide_file:
-            referral_guide_path = f"{upload_dir}/{uuid.uuid4()}_{referral_guide_file.filename}"
-            with open(referral_guide_path, "wb") as buffer:
-                content = await referral_guide_file.read()
-                buffer.write(content)
+            referral_guide_path = await save_upload(referral_guide_file, "documents")
 
         # Convertir fecha si viene
         delivery_date = None
@@ -187,6 +223,8 @@ async def update_order(
             referral_guide_path=referral_guide_path
         )
         return PurchaseOrderResponse.model_validate(order)
+    except HTTPException:
+        raise
     except ValueError as e:
         logger.error(f"ValueError in update_order {order_id}: {str(e)}")
         raise HTTPException(status_code=400, detail=str(e))
@@ -216,5 +254,11 @@ def update_order_detail(
     return PurchaseOrderResponse.model_validate(order)
 
 @router.get("/kpis", response_model=PurchaseKPIsResponse)
-def get_kpis(service: Annotated[PurchaseService, Depends(get_purchase_service)]):
-    return service.calculate_kpis()
+def get_kpis(
+    service: Annotated[PurchaseService, Depends(get_purchase_service)],
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    supplier_id: Optional[UUID] = None
+):
+    end_date = end_of_day_param(end_date)
+    return service.calculate_kpis(start_date=start_date, end_date=end_date, supplier_id=supplier_id)
@@ -1,11 +1,21 @@
-from typing import Annotated, Optional
+import asyncio
+import csv
+import io
+import json
+import os
+from itertools import islice
+from typing import Annotated, Iterable, Iterator, Literal, Optional
 from uuid import UUID
-import uuid
 from datetime import datetime
-from fastapi import APIRouter, Depends, HTTPException, status, File, UploadFile, Form, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException, Query, status, File, UploadFile, Form, BackgroundTasks
+from fastapi.responses import StreamingResponse
 
-from src.application.services import InventoryService
+from src.application.services import InventoryService, PRODUCT_IMPORT_BATCH_SIZE
+from src.domain.job_entities import MOVEMENT_RECEIPT_JOB
+from src.ports.job_queue import JobQueue
+from src.infrastructure.services.catalog_reader import catalog_format, iter_catalog_rows
 from src.domain.exceptions import (
+    BulkStockError,
     InsufficientStockError,
     InvalidStockError,
     ProductNotFoundError
@@ -16,43 +26,20 @@ from src.domain.schemas import (
     StockOperationRequest,
     ProductUpdateRequest,
     MovementResponse,
-    PendingReturnResponse
+    PendingReturnResponse,
+    BulkReceiveRequest,
+    BulkSellRequest,
+    BulkStockLineResult
 )
-from .dependencies import get_inventory_service
+from .date_params import end_of_day_param
+from .dependencies import get_inventory_service, get_job_queue, inventory_service_scope
+from .fast_json import fast_json_enabled, json_list_response
 from .security import get_api_key
+from .uploads import save_upload, spool_upload
 
 
-# File upload validation
-MAX_FILE_SIZE = 10 * 1024 * 1024  # 10MB
-ALLOWED_EXTENSIONS = {'.pdf', '.jpg', '.jpeg', '.png'}
-
-async def validate_upload_file(file: UploadFile) -> bytes:
-    """
-    Validates file size and type.
-    Returns file content if valid, raises HTTPException otherwise.
-    """
-    if not file:
-        return None
-    
-    # Validate extension
-    import os
-    ext = os.path.splitext(file.filename)[1].lower()
-    if ext not in ALLOWED_EXTENSIONS:
-        raise HTTPException(
-            status_code=400,
-            detail=f"File type '{ext}' not allowed. Allowed types: {', '.join(ALLOWED_EXTENSIONS)}"
-        )
-    
-    # Read and validate size
-    content = await file.read()
-    if len(content) > MAX_FILE_SIZE:
-        raise HTTPException(
-            status_code=413,
-            detail=f"File too large ({len(content) / 1024 / 1024:.1f}MB). Maximum size: {MAX_FILE_SIZE / 1024 / 1024}MB"
-        )
-    
-    await file.seek(0)  # Reset for later use
-    return content
+async def _none() -> None:
+    return None
 
 
 router = APIRouter(
@@ -73,16 +60,180 @@ def get_movements(
     limit: int = 100
 ) -> list[MovementResponse]:
     movements = inv_service.get_movements(skip=skip, limit=limit)
+    if fast_json_enabled():
+        return json_list_response(MovementResponse, movements)
     return [MovementResponse.model_validate(m) for m in movements]
 
 
+# Filas por bloque enviado al cliente en la exportación de movimientos
+EXPORT_CHUNK_ROWS = 500
+EXPORT_MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+
+def _export_chunks(movements: Iterable, fmt: str) -> Iterator[bytes]:
+    """Serializa los movimientos en bloques de EXPORT_CHUNK_ROWS filas (NDJSON o CSV)."""
+    movements = iter(movements)
+    columns = list(MovementResponse.model_fields)
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if fmt == "csv":
+        writer.writerow(columns)
+
+    while True:
+        rows = [
+            MovementResponse.model_validate(m).model_dump(mode="json")
+            for m in islice(movements, EXPORT_CHUNK_ROWS)
+        ]
+        if not rows:
+            break
+        if fmt == "csv":
+            writer.writerows([row[c] for c in columns] for row in rows)
+        else:
+            buffer.writelines(json.dumps(row) + "\n" for row in rows)
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+
+@router.get(
+    "/movements/export",
+    summary="Exportar movimientos",
+    description="Descarga el historial completo de movimientos en NDJSON o CSV, en streaming"
+)
+def export_movements(
+    format: Literal["ndjson", "csv"] = "ndjson",
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    type: Optional[str] = None,
+    product_id: Optional[UUID] = None
+) -> StreamingResponse:
+    end_date = end_of_day_param(end_date)
+
+    def stream():
+        with inventory_service_scope() as service:
+            yield from _export_chunks(
+                service.iter_movements(
+                    start_date=start_date, end_date=end_date, movement_type=type, product_id=product_id
+                ),
+                format
+            )
+
+    return StreamingResponse(
+        stream(),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="movimientos.{format}"'}
+    )
+
+
+@router.post(
+    "/import",
+    summary="Importar catálogo",
+    description=(
+        "Importa productos desde un CSV o XLSX (cabecera con los campos del producto; `sku` identifica "
+        "al producto). Hace upsert por SKU en lotes y responde en streaming (NDJSON) un evento de "
+        "progreso por lote con los errores de cada fila y un resumen final."
+    )
+)
+async def import_products(
+    file: UploadFile = File(...),
+    batch_size: int = Query(PRODUCT_IMPORT_BATCH_SIZE, ge=1, le=5000)
+) -> StreamingResponse:
+    try:
+        suffix = catalog_format(file.filename)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    # El archivo se procesa mientras se envía la respuesta: se copia a disco
+    path = await spool_upload(file, suffix)
+
+    def stream():
+        try:
+            with open(path, "rb") as source, inventory_service_scope() as service:
+                try:
+                    for event in service.import_products(iter_catalog_rows(source, file.filename), batch_size):
+                        yield (json.dumps(event) + "\n").encode()
+                except ValueError as e:
+                    yield (json.dumps({"error": str(e)}) + "\n").encode()
+        finally:
+            os.remove(path)
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+
+def _bulk_results(results) -> list[BulkStockLineResult]:
+    return [
+        BulkStockLineResult(
+            line=i, product_id=movement.product_id, movement_id=movement.id,
+            quantity=movement.quantity, reference=movement.reference, stock=stock
+        )
+        for i, (movement, stock) in enumerate(results)
+    ]
+
+
+def _bulk_error(e: Exception) -> HTTPException:
+    if isinstance(e, BulkStockError):
+        return HTTPException(status_code=400, detail={"message": str(e), "errors": e.errors})
+    if isinstance(e, ProductNotFoundError):
+        return HTTPException(status_code=404, detail=str(e))
+    return HTTPException(status_code=409, detail=str(e))
+
+
+# Declaradas antes de /{product_id}/... para que "bulk" no se tome como ID
+@router.post(
+    "/bulk/receive-stock",
+    response_model=list[BulkStockLineResult],
+    summary="Entrada masiva de stock",
+    description="Registra la entrada de varias líneas (producto, cantidad, referencia) en una sola transacción. Si alguna línea no es válida no se aplica ninguna."
+)
+def receive_stock_bulk(
+    request: BulkReceiveRequest,
+    inv_service: Annotated[InventoryService, Depends(get_inventory_service)]
+) -> list[BulkStockLineResult]:
+    try:
+        results = inv_service.receive_stock_bulk(
+            [(line.product_id, line.quantity, line.reference) for line in request.lines]
+        )
+    except (BulkStockError, ProductNotFoundError, InsufficientStockError) as e:
+        raise _bulk_error(e)
+    return _bulk_results(results)
+
+
+@router.post(
+    "/bulk/sell",
+    response_model=list[BulkStockLineResult],
+    summary="Salida masiva de stock",
+    description="Registra la salida (consumo interno) de varias líneas en una sola transacción. Si alguna línea no es válida no se aplica ninguna."
+)
+def sell_stock_bulk(
+    request: BulkSellRequest,
+    inv_service: Annotated[InventoryService, Depends(get_inventory_service)]
+) -> list[BulkStockLineResult]:
+    try:
+        results = inv_service.sell_stock_bulk(
+            [(line.product_id, line.quantity, line.reference) for line in request.lines],
+            applicant=request.applicant,
+            applicant_area=request.applicant_area
+        )
+    except (BulkStockError, ProductNotFoundError, InsufficientStockError) as e:
+        raise _bulk_error(e)
+    return _bulk_results(results)
+
+
 @router.get("", response_model=list[ProductResponse])
 async def list_products(
     inv_service: Annotated[InventoryService, Depends(get_inventory_service)],
     skip: int = 0,
-    limit: int = 100
+    limit: int = 100,
+    q: Annotated[Optional[str], Query(max_length=100, description="Buscar por nombre, descripción o SKU")] = None
 ) -> list[ProductResponse]:
-    products = inv_service.list_products(skip=skip, limit=limit)
+    if q and q.strip():
+        products = inv_service.search_products(q, skip=skip, limit=limit)
+    else:
+        products = inv_service.list_products(skip=skip, limit=limit)
+    if fast_json_enabled():
+        return json_list_response(ProductResponse, products)
     return [ProductResponse.model_validate(p) for p in products]
 
 
@@ -97,6 +248,8 @@ def get_all_pending_returns(
     product_id: Optional[UUID] = None
 ) -> list[PendingReturnResponse]:
     pending = inv_service.get_pending_returns(product_id)
+    if fast_json_enabled():
+        return json_list_response(PendingReturnResponse, pending)
     return [PendingReturnResponse.model_validate(p) for p in pending]
 
 
@@ -121,52 +274,13 @@ async def create_product(
     image_file: Optional[UploadFile] = File(None),
     tech_sheet_file: Optional[UploadFile] = File(None)
 ) -> ProductResponse:
-    # Validate uploaded files
-    if image_file:
-        await validate_upload_file(image_file)
-    if tech_sheet_file:
-        await validate_upload_file(tech_sheet_file)
-    
-    image_path = None
-    tech_sheet_path = None
+    # Imagen y ficha técnica se suben en paralelo
+    image_path, tech_sheet_path = await asyncio.gather(
+        save_upload(image_file, "products/images", remote_prefix="images") if image_file else _none(),
+        save_upload(tech_sheet_file, "products/specs", remote_prefix="specs") if tech_sheet_file else _none()
+    )
 
-    import os
     from decimal import Decimal
-    from src.infrastructure.storage import supabase_storage
-
-    use_supabase = supabase_storage.is_configured()
-
-    if image_file:
-        safe_name = image_file.filename.replace(" ", "_")
-        file_key = f"images/{uuid.uuid4()}_{safe_name}"
-        content = await image_file.read()
-
-        if use_supabase:
-            image_path = supabase_storage.upload_file(file_key, content, image_file.content_type or "image/jpeg")
-        else:
-            is_vercel = os.getenv("VERCEL") == "1"
-            base_upload_dir = "/tmp/uploads" if is_vercel else "uploads"
-            os.makedirs(f"{base_upload_dir}/products/images", exist_ok=True)
-            local_path = f"{base_upload_dir}/products/{file_key}"
-            with open(local_path, "wb") as buffer:
-                buffer.write(content)
-            image_path = local_path
-
-    if tech_sheet_file:
-        safe_tech_name = tech_sheet_file.filename.replace(" ", "_")
-        file_key = f"specs/{uuid.uuid4()}_{safe_tech_name}"
-        content = await tech_sheet_file.read()
-
-        if use_supabase:
-            tech_sheet_path = supabase_storage.upload_file(file_key, content, tech_sheet_file.content_type or "application/pdf")
-        else:
-            is_vercel = os.getenv("VERCEL") == "1"
-            base_upload_dir = "/tmp/uploads" if is_vercel else "uploads"
-            os.makedirs(f"{base_upload_dir}/products/specs", exist_ok=True)
-            local_path = f"{base_upload_dir}/products/{file_key}"
-            with open(local_path, "wb") as buffer:
-                buffer.write(content)
-            tech_sheet_path = local_path
 
     try:
         from src.domain.entities import get_local_time
@@ -262,51 +376,10 @@ async def patch_product(
     image_file: Optional[UploadFile] = File(None),
     tech_sheet_file: Optional[UploadFile] = File(None)
 ) -> ProductResponse:
-    # Validate uploaded file
-    if image_file:
-        await validate_upload_file(image_file)
-    if tech_sheet_file:
-        await validate_upload_file(tech_sheet_file)
-    
-    document_path = None
-    image_path = None
-
-    import os
-    from src.infrastructure.storage import supabase_storage
-
-    use_supabase = supabase_storage.is_configured()
-
-    if image_file:
-        safe_name = image_file.filename.replace(" ", "_")
-        file_key = f"images/{uuid.uuid4()}_{safe_name}"
-        content = await image_file.read()
-
-        if use_supabase:
-            image_path = supabase_storage.upload_file(file_key, content, image_file.content_type or "image/jpeg")
-        else:
-            is_vercel = os.getenv("VERCEL") == "1"
-            base_upload_dir = "/tmp/uploads" if is_vercel else "uploads"
-            os.makedirs(f"{base_upload_dir}/products/images", exist_ok=True)
-            local_path = f"{base_upload_dir}/products/{file_key}"
-            with open(local_path, "wb") as buffer:
-                buffer.write(content)
-            image_path = local_path
-
-    if tech_sheet_file:
-        safe_tech_name = tech_sheet_file.filename.replace(" ", "_")
-        file_key = f"docs/{uuid.uuid4()}_{safe_tech_name}"
-        content = await tech_sheet_file.read()
-
-        if use_supabase:
-            document_path = supabase_storage.upload_file(file_key, content, tech_sheet_file.content_type or "application/pdf")
-        else:
-            is_vercel = os.getenv("VERCEL") == "1"
-            base_upload_dir = "/tmp/uploads" if is_vercel else "uploads"
-            upload_dir = f"{base_upload_dir}/documents"
-            os.makedirs(upload_dir, exist_ok=True)
-            document_path = f"{upload_dir}/{uuid.uuid4()}_{tech_sheet_file.filename}"
-            with open(document_path, "wb") as buffer:
-                buffer.write(content)
+    image_path, document_path = await asyncio.gather(
+        save_upload(image_file, "products/images", remote_prefix="images") if image_file else _none(),
+        save_upload(tech_sheet_file, "documents", remote_prefix="docs") if tech_sheet_file else _none()
+    )
 
     try:
         from decimal import Decimal
@@ -373,23 +446,10 @@ async def receive_stock(
     parent_id: Optional[UUID] = Form(None),
     file: Optional[UploadFile] = File(None)
 ) -> ProductResponse:
-    # Validate uploaded file
-    if file:
-        await validate_upload_file(file)
-    
     document_path = None
     if file:
-        import os
-        is_vercel = os.getenv("VERCEL") == "1"
-        base_upload_dir = "/tmp/uploads" if is_vercel else "uploads"
-        
-        upload_dir = f"{base_upload_dir}/documents"
-        os.makedirs(upload_dir, exist_ok=True)
-        document_path = f"{upload_dir}/{uuid.uuid4()}_{file.filename}"
-        with open(document_path, "wb") as buffer:
-            content = await file.read()
-            buffer.write(content)
-    
+        document_path = await save_upload(file, "documents")
+
     try:
         product = inv_service.receive_stock(
             product_id=product_id, 
@@ -425,6 +485,7 @@ async def sell_product(
     background_tasks: BackgroundTasks,
     product_id: UUID,
     inv_service: Annotated[InventoryService, Depends(get_inventory_service)],
+    job_queue: Annotated[Optional[JobQueue], Depends(get_job_queue)],
     quantity: int = Form(...),
     reference: str = Form("S/N"),
     applicant: str = Form(...),
@@ -435,22 +496,9 @@ async def sell_product(
     sales_order_id: Optional[UUID] = Form(None),
     file: Optional[UploadFile] = File(None)
 ) -> ProductResponse:
-    # Validate uploaded file
-    if file:
-        await validate_upload_file(file)
-    
     document_path = None
     if file:
-        import os
-        is_vercel = os.getenv("VERCEL") == "1"
-        base_upload_dir = "/tmp/uploads" if is_vercel else "uploads"
-        
-        upload_dir = f"{base_upload_dir}/documents"
-        os.makedirs(upload_dir, exist_ok=True)
-        document_path = f"{upload_dir}/{uuid.uuid4()}_{file.filename}"
-        with open(document_path, "wb") as buffer:
-            content = await file.read()
-            buffer.write(content)
+        document_path = await save_upload(file, "documents")
 
     try:
         product = inv_service.sell_product(
@@ -466,7 +514,8 @@ async def sell_product(
             sales_order_id=sales_order_id
         )
         
-        # Enviar correo en segundo plano si es devolutivo o es una venta y tiene email
+        # Encolar el acta + correo si es devolutivo o es una venta y tiene email;
+        # el worker (scripts/run_worker.py) la procesa fuera del proceso de la API
         if (is_returnable or sales_order_id) and recipient_email:
             movement_data = {
                 "product_name": product.name,
@@ -480,7 +529,10 @@ async def sell_product(
                 "return_deadline": str(return_deadline) if return_deadline else "N/A",
                 "recipient_email": recipient_email
             }
-            background_tasks.add_task(send_movement_email, recipient_email, movement_data)
+            if job_queue is not None:
+                job_queue.enqueue(MOVEMENT_RECEIPT_JOB, {"email": recipient_email, "movement_data": movement_data})
+            else:
+                background_tasks.add_task(send_movement_email, recipient_email, movement_data)
 
         return ProductResponse.model_validate(product)
     except ProductNotFoundError as e:
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from typing import List, Annotated, Optional
 from uuid import UUID
 from datetime import datetime
@@ -8,9 +8,11 @@ from src.domain.sales_schemas import (
     SalesOrderCreate, SalesOrderResponse, 
     SalesOrderUpdate, SalesKPIsResponse
 )
+from src.infrastructure.api.date_params import end_of_day_param
 from src.infrastructure.api.dependencies import get_db, get_inventory_service
 from src.application.services import InventoryService
 from src.infrastructure.repositories.postgres_sales_repository import PostgresSalesRepository
+from src.infrastructure.repositories.pagination import MAX_PAGE_SIZE
 from src.infrastructure.api.security import get_api_key
 import logging
 
@@ -50,8 +52,36 @@ def create_order(
         raise HTTPException(status_code=400, detail=str(e))
 
 @router.get("/orders", response_model=List[SalesOrderResponse])
-def list_orders(service: Annotated[SalesService, Depends(get_sales_service)]):
-    orders = service.list_sales_orders()
+def list_orders(
+    response: Response,
+    service: Annotated[SalesService, Depends(get_sales_service)],
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    status: Optional[str] = None,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    customer_email: Optional[str] = None,
+    product_id: Optional[UUID] = None
+):
+    """
+    Lista órdenes de venta (más recientes primero) con paginación por cursor.
+    El cursor de la siguiente página se envía en el header `X-Next-Cursor`.
+    """
+    end_date = end_of_day_param(end_date)
+    try:
+        orders, next_cursor = service.list_sales_orders(
+            limit=limit,
+            cursor=cursor,
+            status=status,
+            start_date=start_date,
+            end_date=end_date,
+            customer_email=customer_email,
+            product_id=product_id
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
     return [SalesOrderResponse.model_validate(o) for o in orders]
 
 @router.get("/orders/{order_id}", response_model=SalesOrderResponse)
@@ -98,5 +128,8 @@ def delete_order(
     return None
 
 @router.get("/kpis", response_model=SalesKPIsResponse)
-def get_kpis(service: Annotated[SalesService, Depends(get_sales_service)]):
-    return service.get_kpis()
+def get_kpis(
+    service: Annotated[SalesService, Depends(get_sales_service)],
+    window_days: Optional[int] = Query(None, ge=1, description="Solo considera las ventas de los últimos N días")
+):
+    return service.get_kpis(window_days=window_days)
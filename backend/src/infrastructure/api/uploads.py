@@ -0,0 +1,158 @@
+"""
+Pipeline de carga de archivos en streaming.
+
+Los archivos se leen por chunks: el tamaño máximo se valida mientras se lee,
+el tipo real se detecta con los magic bytes del primer chunk (no se confía en
+la extensión) y cada chunk se escribe directamente en disco o se envía a
+Supabase Storage, sin mantener el archivo completo en memoria.
+"""
+import os
+import tempfile
+import uuid
+from typing import AsyncIterator, Optional
+
+from fastapi import HTTPException, UploadFile
+
+from src.infrastructure.storage import supabase_storage
+
+MAX_FILE_SIZE = 10 * 1024 * 1024  # 10MB
+MAX_IMPORT_FILE_SIZE = 50 * 1024 * 1024  # 50MB (catálogos CSV/XLSX)
+UPLOAD_CHUNK_SIZE = 64 * 1024
+ALLOWED_EXTENSIONS = {'.pdf', '.jpg', '.jpeg', '.png'}
+
+_MAGIC_BYTES = (
+    (b"%PDF-", "application/pdf"),
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+    (b"\xff\xd8\xff", "image/jpeg"),
+)
+_EXTENSIONS_BY_TYPE = {
+    "application/pdf": {".pdf"},
+    "image/png": {".png"},
+    "image/jpeg": {".jpg", ".jpeg"},
+}
+
+
+def get_upload_base_dir() -> str:
+    # Vercel solo permite escribir en /tmp
+    return "/tmp/uploads" if os.getenv("VERCEL") == "1" else "uploads"
+
+
+def sniff_content_type(head: bytes) -> Optional[str]:
+    """Detecta el tipo del archivo a partir de sus primeros bytes."""
+    for signature, content_type in _MAGIC_BYTES:
+        if head.startswith(signature):
+            return content_type
+    return None
+
+
+def _too_large() -> HTTPException:
+    return HTTPException(
+        status_code=413,
+        detail=f"File too large. Maximum size: {MAX_FILE_SIZE / 1024 / 1024}MB"
+    )
+
+
+class _UploadReader:
+    """Lee un UploadFile por chunks validando extensión, tipo y tamaño."""
+
+    def __init__(self, file: UploadFile):
+        self.file = file
+        self.ext = os.path.splitext(file.filename or "")[1].lower()
+        self.content_type: Optional[str] = None
+
+    async def open(self) -> None:
+        if self.ext not in ALLOWED_EXTENSIONS:
+            raise HTTPException(
+                status_code=400,
+                detail=f"File type '{self.ext}' not allowed. Allowed types: {', '.join(ALLOWED_EXTENSIONS)}"
+            )
+        # Starlette ya conoce el tamaño del multipart: rechazar sin leer nada
+        if self.file.size is not None and self.file.size > MAX_FILE_SIZE:
+            raise _too_large()
+
+        head = await self.file.read(UPLOAD_CHUNK_SIZE)
+        self.content_type = sniff_content_type(head)
+        if self.content_type is None or self.ext not in _EXTENSIONS_BY_TYPE[self.content_type]:
+            raise HTTPException(
+                status_code=400,
+                detail=f"File content does not match its '{self.ext}' extension"
+            )
+
+    async def chunks(self) -> AsyncIterator[bytes]:
+        """Recorre el archivo desde el inicio; puede llamarse de nuevo para reintentar."""
+        await self.file.seek(0)
+        total = 0
+        while chunk := await self.file.read(UPLOAD_CHUNK_SIZE):
+            total += len(chunk)
+            if total > MAX_FILE_SIZE:
+                raise _too_large()
+            yield chunk
+
+
+async def save_upload(file: UploadFile, local_dir: str, remote_prefix: Optional[str] = None) -> str:
+    """
+    Valida y guarda un archivo subido, retornando su ruta local o URL pública.
+
+    Args:
+        file: Archivo recibido en el formulario
+        local_dir: Carpeta relativa al directorio de uploads (ej. "documents")
+        remote_prefix: Prefijo dentro del bucket; si se indica y Supabase está
+            configurado, el archivo se envía a Supabase Storage
+
+    Raises:
+        HTTPException: 400 si el tipo no es válido, 413 si excede MAX_FILE_SIZE.
+    """
+    reader = _UploadReader(file)
+    await reader.open()
+    safe_name = os.path.basename(file.filename).replace(" ", "_")
+    name = f"{uuid.uuid4()}_{safe_name}"
+
+    if remote_prefix and supabase_storage.is_configured():
+        return await supabase_storage.upload_stream(
+            f"{remote_prefix}/{name}",
+            reader.chunks,
+            reader.content_type,
+            content_length=file.size,
+        )
+
+    upload_dir = f"{get_upload_base_dir()}/{local_dir}"
+    os.makedirs(upload_dir, exist_ok=True)
+    path = f"{upload_dir}/{name}"
+    partial_path = f"{path}.part"
+    try:
+        with open(partial_path, "wb") as buffer:
+            async for chunk in reader.chunks():
+                buffer.write(chunk)
+        os.replace(partial_path, path)
+    except BaseException:
+        if os.path.exists(partial_path):
+            os.remove(partial_path)
+        raise
+    return path
+
+
+async def spool_upload(file: UploadFile, suffix: str) -> str:
+    """
+    Copia un archivo subido a un temporal en disco por chunks y retorna su
+    ruta (quien lo llama debe borrarlo). Para archivos que se procesan
+    después de que el handler retorna, p. ej. en una respuesta en streaming.
+
+    Raises:
+        HTTPException: 413 si excede MAX_IMPORT_FILE_SIZE.
+    """
+    if file.size is not None and file.size > MAX_IMPORT_FILE_SIZE:
+        raise HTTPException(status_code=413, detail=f"File too large. Maximum size: {MAX_IMPORT_FILE_SIZE / 1024 / 1024}MB")
+
+    fd, path = tempfile.mkstemp(suffix=suffix)
+    try:
+        with os.fdopen(fd, "wb") as buffer:
+            total = 0
+            while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+                total += len(chunk)
+                if total > MAX_IMPORT_FILE_SIZE:
+                    raise HTTPException(status_code=413, detail=f"File too large. Maximum size: {MAX_IMPORT_FILE_SIZE / 1024 / 1024}MB")
+                buffer.write(chunk)
+    except BaseException:
+        os.remove(path)
+        raise
+    return path
@@ -102,5 +102,5 @@ def init_db():
         print("Running on Vercel: Skipping automatic table creation (ensure DB is initialized)")
         return
 
-    from .models import ProductModel, UserModel, MovementModel, SupplierModel, PurchaseOrderModel, SalesOrderModel  # Import aquí para evitar circular imports
+    from .models import ProductModel, UserModel, MovementModel, SupplierModel, PurchaseOrderModel, SalesOrderModel, JobModel, StockReservationModel, StockSnapshotModel, StockBalanceModel, ReconciliationRunModel  # Import aquí para evitar circular imports
     Base.metadata.create_all(bind=engine)
@@ -1,12 +1,13 @@
 """
 Modelos de SQLAlchemy para la base de datos.
 """
-from sqlalchemy import Column, String, Integer, Numeric, Index, Boolean, ForeignKey, DateTime, Table
+from sqlalchemy import Column, String, Integer, Numeric, Index, Boolean, ForeignKey, DateTime, Table, Text, event, text
 from sqlalchemy.orm import relationship
 import uuid
 
 
 from .config import Base
+from .product_search import create_sqlite_fts, search_document
 from datetime import datetime, timedelta, timezone
 
 # Association table for many-to-many relationship
@@ -58,12 +59,30 @@ class ProductModel(Base):
     __table_args__ = (
         Index('idx_product_sku', 'sku'),
         Index('idx_product_name', 'name'),
+        # Catálogo de la tienda (solo productos con precio), ordenado por nombre o precio
+        Index('idx_product_public_name', 'name', postgresql_where=text('retail_price > 0'), sqlite_where=text('retail_price > 0')),
+        Index(
+            'idx_product_public_price', 'retail_price',
+            postgresql_where=text('retail_price > 0'), sqlite_where=text('retail_price > 0'),
+        ),
+        # Productos con stock modificado desde la última conciliación
+        Index('idx_product_updated_at', 'updated_at'),
+        # Búsqueda de texto; en SQLite la cubre la tabla FTS5 products_fts
+        Index(
+            'idx_product_search', search_document(name, description, sku), postgresql_using='gin'
+        ).ddl_if(dialect='postgresql'),
     )
     
     def __repr__(self) -> str:
         return f"<ProductModel(id={self.id}, sku={self.sku}, name={self.name})>"
 
 
+@event.listens_for(ProductModel.__table__, "after_create")
+def _create_product_fts(target, connection, **kw):
+    if connection.dialect.name == "sqlite":
+        create_sqlite_fts(connection)
+
+
 class UserModel(Base):
     """
     Modelo SQLAlchemy para la tabla users.
@@ -103,6 +122,7 @@ class MovementModel(Base):
     sales_order_id = Column(String(36), ForeignKey("sales_orders.id"), nullable=True)
     parent_id = Column(String(36), ForeignKey("movements.id"), nullable=True)
     product_name = Column(String(200), nullable=True)
+    purchase_order_id = Column(String(36), ForeignKey("purchase_orders.id", ondelete="SET NULL"), nullable=True)
     date = Column(DateTime, default=get_local_time)
     
     # Relación
@@ -111,9 +131,14 @@ class MovementModel(Base):
     # Índices para mejorar performance
     __table_args__ = (
         Index('idx_movement_reference', 'reference'),
-        Index('idx_movement_product_id', 'product_id'),
         Index('idx_movement_type', 'type'),
         Index('idx_movement_date', 'date'),
+        # Movimientos de un producto y reposición del stock desde su último checkpoint
+        Index('idx_movement_product_date', 'product_id', 'date'),
+        # Movimientos de venta de una orden (tienda o salida manual)
+        Index('idx_movement_sales_order_id', 'sales_order_id'),
+        # Garantiza una sola entrada de stock por orden de compra
+        Index('uq_movement_purchase_order_id', 'purchase_order_id', unique=True),
     )
     
     def __repr__(self) -> str:
@@ -170,6 +195,18 @@ class PurchaseOrderModel(Base):
     supplier = relationship("SupplierModel", back_populates="purchase_orders")
     product = relationship("ProductModel", back_populates="purchase_orders")
 
+    # Índices para KPIs y listados filtrados por fecha/proveedor
+    __table_args__ = (
+        Index('idx_po_created_at', 'created_at'),
+        Index('idx_po_supplier_created_at', 'supplier_id', 'created_at'),
+        Index('idx_po_status_created_at', 'status', 'created_at'),
+        # "¿Tiene compras pendientes?" del catálogo de la tienda
+        Index(
+            'idx_po_pending_product', 'product_id',
+            postgresql_where=text("status = 'PENDING'"), sqlite_where=text("status = 'PENDING'"),
+        ),
+    )
+
     def __repr__(self):
         return f"<PurchaseOrderModel(id={self.id}, status={self.status})>"
 
@@ -218,12 +255,127 @@ class SalesOrderModel(Base):
 
     # Índices para mejorar performance
     __table_args__ = (
-        Index('idx_sales_customer_email', 'customer_email'),
+        # Historial por cliente en el orden de la paginación (created_at DESC, id DESC)
+        Index('idx_sales_customer_email_created_at', 'customer_email', text('created_at DESC'), text('id DESC')),
         Index('idx_sales_status', 'status'),
         Index('idx_sales_created_at', 'created_at'),
         Index('idx_sales_stripe_session', 'stripe_session_id'),
+        Index('idx_sales_product_created_at', 'product_id', 'created_at'),
     )
 
     def __repr__(self):
         return f"<SalesOrderModel(id={self.id}, customer={self.customer_name})>"
 
+
+
+class JobModel(Base):
+    """Cola persistente de trabajos en segundo plano (recibos PDF, correos)."""
+    __tablename__ = "jobs"
+
+    id = Column(String(36), primary_key=True)
+    kind = Column(String(50), nullable=False)
+    payload = Column(Text, nullable=False)  # JSON
+    status = Column(String(20), nullable=False, default="PENDING")  # PENDING, RUNNING, DONE, FAILED
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False, default=5)
+    run_after = Column(DateTime, nullable=False, default=get_local_time)
+    locked_at = Column(DateTime, nullable=True)
+    last_error = Column(String(1000), nullable=True)
+    created_at = Column(DateTime, default=get_local_time)
+    updated_at = Column(DateTime, default=get_local_time, onupdate=get_local_time)
+
+    __table_args__ = (
+        Index('idx_jobs_claim', 'kind', 'status', 'run_after'),
+    )
+
+    def __repr__(self):
+        return f"<JobModel(id={self.id}, kind={self.kind}, status={self.status})>"
+
+
+class StockReservationModel(Base):
+    """Reservas de stock de los checkouts en curso (ver StockReservation)."""
+    __tablename__ = "stock_reservations"
+
+    id = Column(String(36), primary_key=True)
+    reservation_id = Column(String(36), nullable=False)
+    product_id = Column(String(36), ForeignKey("products.id", ondelete="CASCADE"), nullable=False)
+    quantity = Column(Integer, nullable=False)
+    status = Column(String(20), nullable=False, default="ACTIVE")  # ACTIVE, CONVERTED, RELEASED, EXPIRED
+    expires_at = Column(DateTime, nullable=False)
+    created_at = Column(DateTime, default=get_local_time)
+
+    __table_args__ = (
+        Index('idx_reservation_group', 'reservation_id'),
+        # Suma de reservas activas por producto y limpieza de vencidas
+        Index('idx_reservation_product_active', 'product_id', 'status', 'expires_at'),
+        Index('idx_reservation_expiry', 'status', 'expires_at'),
+    )
+
+    def __repr__(self):
+        return f"<StockReservationModel(id={self.id}, product_id={self.product_id}, status={self.status})>"
+
+
+class StockSnapshotModel(Base):
+    """
+    Checkpoint del stock de un producto: el stock resultante de todos los
+    movimientos con fecha anterior a `as_of` (el cierre de un día).
+    """
+    __tablename__ = "stock_snapshots"
+
+    id = Column(String(36), primary_key=True)
+    product_id = Column(String(36), ForeignKey("products.id", ondelete="CASCADE"), nullable=False)
+    as_of = Column(DateTime, nullable=False)
+    stock = Column(Integer, nullable=False)
+    created_at = Column(DateTime, default=get_local_time)
+
+    __table_args__ = (
+        # Checkpoint más cercano de cada producto; un checkpoint por producto y corte
+        Index('uq_stock_snapshot_product_as_of', 'product_id', 'as_of', unique=True),
+    )
+
+    def __repr__(self):
+        return f"<StockSnapshotModel(product_id={self.product_id}, as_of={self.as_of}, stock={self.stock})>"
+
+
+class StockBalanceModel(Base):
+    """
+    Stock esperado de cada producto según los movimientos conciliados y la
+    última diferencia encontrada con `products.stock`.
+    """
+    __tablename__ = "stock_balances"
+
+    product_id = Column(String(36), ForeignKey("products.id", ondelete="CASCADE"), primary_key=True)
+    expected_stock = Column(Integer, nullable=False, default=0)
+    discrepancy = Column(Integer, nullable=False, default=0)  # products.stock - expected_stock
+    updated_at = Column(DateTime, default=get_local_time, onupdate=get_local_time)
+
+    __table_args__ = (
+        # Productos con diferencias pendientes (pocos): índice parcial
+        Index(
+            'idx_stock_balance_discrepancy', 'product_id',
+            postgresql_where=text('discrepancy <> 0'),
+            sqlite_where=text('discrepancy <> 0'),
+        ),
+    )
+
+    def __repr__(self):
+        return f"<StockBalanceModel(product_id={self.product_id}, expected_stock={self.expected_stock})>"
+
+
+class ReconciliationRunModel(Base):
+    """Pasadas de conciliación; la última marca hasta dónde se procesaron los movimientos."""
+    __tablename__ = "reconciliation_runs"
+
+    id = Column(String(36), primary_key=True)
+    high_water_mark = Column(DateTime, nullable=False)
+    started_at = Column(DateTime, nullable=False)
+    movements_applied = Column(Integer, nullable=False, default=0)
+    discrepancies = Column(Integer, nullable=False, default=0)
+    corrections = Column(Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        Index('idx_reconciliation_run_hwm', 'high_water_mark'),
+    )
+
+    def __repr__(self):
+        return f"<ReconciliationRunModel(id={self.id}, high_water_mark={self.high_water_mark})>"
@@ -0,0 +1,96 @@
+"""
+Índices de búsqueda de texto de productos (nombre, descripción y SKU).
+
+PostgreSQL indexa `to_tsvector` con un índice GIN por expresión
+(`idx_product_search`). SQLite usa la tabla virtual FTS5 `products_fts`,
+de contenido externo: guarda solo el índice y se sincroniza con `products`
+mediante triggers. Si el SQLite no trae FTS5 la búsqueda cae a LIKE.
+"""
+import re
+from typing import List
+
+from sqlalchemy import func, literal_column, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.exc import OperationalError
+
+# Sin stemming ni stopwords: sirve igual para nombres en español y para SKUs
+SEARCH_CONFIG = literal_column("'simple'::regconfig")
+
+# Términos considerados por búsqueda (el resto se ignora)
+MAX_SEARCH_TERMS = 8
+
+SQLITE_FTS_TABLE = "products_fts"
+# Pesos de bm25 por columna de products_fts (name, description, sku), en el
+# mismo orden de importancia que los pesos A/C/B de PostgreSQL
+SQLITE_FTS_WEIGHTS = (10.0, 1.0, 5.0)
+
+_SQLITE_FTS_DDL = (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {SQLITE_FTS_TABLE} USING fts5("
+    "name, description, sku, content='products', content_rowid='rowid', "
+    "tokenize='unicode61 remove_diacritics 2')",
+    f"CREATE TRIGGER IF NOT EXISTS products_fts_insert AFTER INSERT ON products BEGIN "
+    f"INSERT INTO {SQLITE_FTS_TABLE}(rowid, name, description, sku) "
+    "VALUES (new.rowid, new.name, new.description, new.sku); END",
+    f"CREATE TRIGGER IF NOT EXISTS products_fts_delete AFTER DELETE ON products BEGIN "
+    f"INSERT INTO {SQLITE_FTS_TABLE}({SQLITE_FTS_TABLE}, rowid, name, description, sku) "
+    "VALUES ('delete', old.rowid, old.name, old.description, old.sku); END",
+    f"CREATE TRIGGER IF NOT EXISTS products_fts_update AFTER UPDATE OF name, description, sku ON products BEGIN "
+    f"INSERT INTO {SQLITE_FTS_TABLE}({SQLITE_FTS_TABLE}, rowid, name, description, sku) "
+    "VALUES ('delete', old.rowid, old.name, old.description, old.sku); "
+    f"INSERT INTO {SQLITE_FTS_TABLE}(rowid, name, description, sku) "
+    "VALUES (new.rowid, new.name, new.description, new.sku); END",
+)
+
+
+def search_document(name, description, sku):
+    """
+    Documento indexado en PostgreSQL, con el nombre como el campo de más peso
+    y la descripción como el de menos. Las consultas deben usar exactamente
+    esta expresión para que el planificador use el índice GIN.
+    """
+    empty = literal_column("''")
+
+    def weighted(column, weight):
+        return func.setweight(func.to_tsvector(SEARCH_CONFIG, func.coalesce(column, empty)), literal_column(f"'{weight}'"))
+
+    return weighted(name, "A").op("||")(weighted(sku, "B")).op("||")(weighted(description, "C"))
+
+
+def search_terms(query: str) -> List[str]:
+    """Palabras de la búsqueda, sin los operadores de tsquery/FTS5."""
+    return re.findall(r"\w+", (query or "").lower())[:MAX_SEARCH_TERMS]
+
+
+def tsquery_text(terms: List[str]) -> str:
+    """Todas las palabras, cada una como prefijo: `polo:* & azu:*`."""
+    return " & ".join(f"{term}:*" for term in terms)
+
+
+def fts5_query_text(terms: List[str]) -> str:
+    """Todas las palabras, cada una como prefijo: `"polo"* "azu"*`."""
+    return " ".join(f'"{term}"*' for term in terms)
+
+
+def create_sqlite_fts(conn: Connection) -> bool:
+    """
+    Crea `products_fts` y sus triggers si no existen. Retorna False si el
+    SQLite no soporta FTS5.
+    """
+    try:
+        for statement in _SQLITE_FTS_DDL:
+            conn.execute(text(statement))
+    except OperationalError:
+        return False
+    return True
+
+
+def rebuild_sqlite_fts(conn: Connection) -> None:
+    """Reindexa `products_fts` desde `products` (filas previas a la tabla o rowids cambiados por VACUUM)."""
+    conn.execute(text(f"INSERT INTO {SQLITE_FTS_TABLE}({SQLITE_FTS_TABLE}) VALUES ('rebuild')"))
+
+
+def sqlite_fts_available(conn) -> bool:
+    return conn.execute(
+        text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+        {"name": SQLITE_FTS_TABLE}
+    ).first() is not None
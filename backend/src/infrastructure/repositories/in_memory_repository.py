@@ -1,152 +1,386 @@
 """
 Implementación en memoria del repositorio de productos.
 """
-from copy import deepcopy
-from typing import Dict, Optional
+import heapq
+import re
+import threading
+from collections import Counter
+from dataclasses import fields
+from datetime import datetime
+from decimal import Decimal
+from operator import attrgetter
+from contextlib import ExitStack
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
 from uuid import UUID
 
+from src.domain.catalog_entities import (
+    SORT_PRICE_ASC, SORT_PRICE_DESC, SORT_RELEVANCE, CatalogQuery, catalog_facets, display_price, price_bands,
+    public_availability,
+)
 from src.domain.entities import Product, Movement, get_local_time
-from src.domain.exceptions import ProductNotFoundError
+from src.domain.exceptions import InsufficientStockError, ProductNotFoundError
+from src.infrastructure.database.product_search import search_terms
+
+# Los registros se guardan como tuplas inmutables con los campos de la entidad
+# (en orden de declaración); leer es reconstruir la entidad, sin deepcopy.
+_PRODUCT_FIELDS = tuple(f.name for f in fields(Product))
+_MOVEMENT_FIELDS = tuple(f.name for f in fields(Movement))
+_product_snapshot = attrgetter(*_PRODUCT_FIELDS)
+_movement_snapshot = attrgetter(*_MOVEMENT_FIELDS)
+_MOVEMENT_DATE = _MOVEMENT_FIELDS.index("date")
+_MOVEMENT_TYPE = _MOVEMENT_FIELDS.index("type")
+
+def _catalog_match(row, catalog: CatalogQuery, availability: bool = True, price: bool = True) -> bool:
+    _, status, shown = row
+    if availability and catalog.availability and status not in catalog.availability:
+        return False
+    if price and catalog.min_price is not None and shown < catalog.min_price:
+        return False
+    if price and catalog.max_price is not None and shown > catalog.max_price:
+        return False
+    return True
+
+
+# Número de locks entre los que se reparten los productos
+LOCK_STRIPES = 16
 
 
 class InMemoryProductRepository:
     """
     Implementación en memoria del repositorio de productos.
-    
-    Esta implementación mantiene los productos en un diccionario
-    Python en memoria. Es útil para desarrollo y testing.
-    
+
+    Pensada para desarrollo, tests y pruebas de carga (`REPOSITORY_TYPE=memory`):
+    - Cada producto/movimiento se guarda como una tupla inmutable; las
+      entidades devueltas son objetos nuevos, así que mutarlas no altera
+      el repositorio.
+    - Las escrituras de un producto toman uno de `LOCK_STRIPES` locks según
+      su ID, de modo que productos distintos no compiten entre sí. Las
+      lecturas no toman locks (reemplazar una entrada de un dict es atómico).
+    - Índices secundarios por SKU y de movimientos por producto.
+
     Nota: Los datos se pierden al reiniciar la aplicación.
     """
-    
+
     def __init__(self) -> None:
-        """Inicializa el repositorio con un diccionario vacío."""
-        self._products: Dict[UUID, Product] = {}
-    
+        """Inicializa el repositorio vacío."""
+        self._products: Dict[UUID, tuple] = {}
+        self._ids_by_sku: Dict[str, UUID] = {}
+        self._movements: Dict[UUID, tuple] = {}
+        self._movements_by_product: Dict[UUID, List[UUID]] = {}
+        self._purchase_order_movements: Set[UUID] = set()
+        self._stripes = [threading.Lock() for _ in range(LOCK_STRIPES)]
+        # Protege los índices compartidos (SKU) y la colección de movimientos
+        self._index_lock = threading.Lock()
+        self._movements_lock = threading.Lock()
+
+    def _lock_for(self, product_id: UUID) -> threading.Lock:
+        return self._stripes[hash(product_id) % LOCK_STRIPES]
+
     def save(self, product: Product) -> Product:
         """
         Guarda o actualiza un producto.
-        
+
         Args:
             product: Producto a guardar
-            
+
         Returns:
-            Una copia del producto guardado
+            El producto guardado (un objeto nuevo)
+
+        Raises:
+            ValueError: Si el SKU ya pertenece a otro producto
         """
-        # Guardamos una copia para evitar mutaciones externas
-        # Ensure updated_at is preserved or updated
         if not product.updated_at:
-             product.updated_at = get_local_time()
-        self._products[product.id] = deepcopy(product)
-        return deepcopy(product)
-    
+            product.updated_at = get_local_time()
+        snapshot = _product_snapshot(product)
+
+        with self._lock_for(product.id):
+            previous = self._products.get(product.id)
+            with self._index_lock:
+                owner = self._ids_by_sku.get(product.sku)
+                if owner is not None and owner != product.id:
+                    raise ValueError(f"El SKU {product.sku} ya está registrado")
+                if previous is not None:
+                    self._ids_by_sku.pop(Product(*previous).sku, None)
+                self._ids_by_sku[product.sku] = product.id
+            self._products[product.id] = snapshot
+        return Product(*snapshot)
+
     def find_by_id(self, product_id: UUID) -> Optional[Product]:
         """
         Busca un producto por ID.
-        
+
         Args:
             product_id: UUID del producto
-            
+
         Returns:
-            Una copia del producto si existe, None en caso contrario
+            El producto si existe, None en caso contrario
         """
-        product = self._products.get(product_id)
-        return deepcopy(product) if product else None
-    
+        snapshot = self._products.get(product_id)
+        return Product(*snapshot) if snapshot else None
+
+    def find_by_sku(self, sku: str) -> Optional[Product]:
+        """
+        Busca un producto por SKU usando el índice secundario.
+        """
+        product_id = self._ids_by_sku.get(sku)
+        return self.find_by_id(product_id) if product_id else None
+
     def update_stock(self, product_id: UUID, quantity: int) -> Product:
         """
         Actualiza el stock de un producto.
-        
+
         Args:
             product_id: UUID del producto
             quantity: Nueva cantidad de stock
-            
+
         Returns:
             El producto actualizado
-            
+
         Raises:
             ProductNotFoundError: Si el producto no existe
         """
-        product = self._products.get(product_id)
-        
-        if product is None:
-            raise ProductNotFoundError(str(product_id))
-        
-        product.stock = quantity
+        with self._lock_for(product_id):
+            snapshot = self._products.get(product_id)
+            if snapshot is None:
+                raise ProductNotFoundError(str(product_id))
+            product = Product(*snapshot)
+            product.stock = quantity
+            product.updated_at = get_local_time()
+            self._products[product_id] = _product_snapshot(product)
+        return product
 
-        product.updated_at = get_local_time()
-        return deepcopy(product)
+    def find_by_ids(self, product_ids: Iterable[UUID]) -> Dict[UUID, Product]:
+        """
+        Busca varios productos, indexados por ID.
+        """
+        found = {pid: self._products.get(pid) for pid in set(product_ids)}
+        return {pid: Product(*s) for pid, s in found.items() if s is not None}
 
-    def find_all(self) -> list[Product]:
+    def apply_stock_movements(self, deltas: Dict[UUID, int], movements: List['Movement']) -> Dict[UUID, int]:
         """
-        Busca todos los productos.
-            
-        Returns:
-            Lista de copias de los productos
+        Aplica las variaciones de stock y registra los movimientos: o se
+        aplica todo o nada.
         """
-        return [deepcopy(p) for p in self._products.values()]
+        # Locks en orden fijo para no bloquearse con otra operación masiva
+        stripes = sorted({hash(pid) % LOCK_STRIPES for pid in deltas})
+        with ExitStack() as stack:
+            for stripe in stripes:
+                stack.enter_context(self._stripes[stripe])
+
+            products = {}
+            for product_id, delta in deltas.items():
+                snapshot = self._products.get(product_id)
+                if snapshot is None:
+                    raise ProductNotFoundError(str(product_id))
+                product = Product(*snapshot)
+                if product.stock + delta < 0:
+                    raise InsufficientStockError(available=product.stock, requested=-delta)
+                products[product_id] = product
+
+            now = get_local_time()
+            for product_id, product in products.items():
+                product.stock += deltas[product_id]
+                product.updated_at = now
+                self._products[product_id] = _product_snapshot(product)
+
+        for movement in movements:
+            self.save_movement(movement)
+        return {pid: p.stock for pid, p in products.items()}
+
+    def upsert_by_sku(self, products: List[Product], update_fields: Iterable[str]) -> None:
+        """
+        Inserta los productos o, si el SKU ya existe, sobrescribe solo
+        `update_fields` (el ID y el stock del existente se conservan).
+        """
+        update_fields = list(update_fields)
+        for product in products:
+            existing = self.find_by_sku(product.sku)
+            if existing is None:
+                self.save(product)
+                continue
+            for field in update_fields:
+                setattr(existing, field, getattr(product, field))
+            existing.updated_at = get_local_time()
+            self.save(existing)
+
+    def find_all(self, skip: int = 0, limit: int = 100) -> list[Product]:
+        """
+        Retorna los productos (en orden de alta) con paginación.
+        """
+        snapshots = list(self._products.values())[skip:skip + limit]
+        return [Product(*s) for s in snapshots]
+
+    def search(self, query: str, skip: int = 0, limit: int = 100, public_only: bool = False) -> list[Product]:
+        """
+        Busca por nombre, descripción y SKU (cada palabra como prefijo).
+        Primero los productos con más palabras en el nombre, luego por nombre.
+        """
+        terms = search_terms(query)
+        if not terms:
+            return []
+
+        ranked = []
+        now = get_local_time()
+        for snapshot in list(self._products.values()):
+            product = Product(*snapshot)
+            if public_only and public_availability(product, now) is None:
+                continue
+            name_words = re.findall(r"\w+", product.name.lower())
+            words = name_words + re.findall(r"\w+", f"{product.description} {product.sku}".lower())
+            if all(any(word.startswith(term) for word in words) for term in terms):
+                in_name = sum(any(word.startswith(term) for word in name_words) for term in terms)
+                ranked.append((-in_name, product.name, str(product.id), product))
+        ranked.sort(key=lambda entry: entry[:3])
+        return [product for *_, product in ranked[skip:skip + limit]]
+
+    def find_public(self, catalog: CatalogQuery, skip: int = 0, limit: int = 100) -> list[Product]:
+        """
+        Página del catálogo de la tienda con los filtros y el orden de `catalog`.
+        """
+        rows = [row for row in self._catalog_rows(catalog.q) if _catalog_match(row, catalog)]
+        sort = catalog.effective_sort
+        if sort == SORT_PRICE_ASC:
+            rows.sort(key=lambda row: (row[2], row[0].name, str(row[0].id)))
+        elif sort == SORT_PRICE_DESC:
+            rows.sort(key=lambda row: (-row[2], row[0].name, str(row[0].id)))
+        elif sort != SORT_RELEVANCE or not (catalog.q and catalog.q.strip()):
+            rows.sort(key=lambda row: (row[0].name, str(row[0].id)))
+        return [product for product, _, _ in rows[skip:skip + limit]]
+
+    def public_facets(self, catalog: CatalogQuery) -> dict:
+        """
+        Conteos del catálogo de la tienda; cada faceta ignora su propio filtro.
+        """
+        rows = self._catalog_rows(catalog.q)
+        by_availability = [row for row in rows if _catalog_match(row, catalog, price=False)]
+        availability = Counter(row[1] for row in rows if _catalog_match(row, catalog, availability=False))
+        prices = [row[2] for row in by_availability]
+        bands = [
+            sum(1 for price in prices if price >= low and (high is None or price < high))
+            for low, high in price_bands()
+        ]
+        return catalog_facets(
+            sum(1 for row in rows if _catalog_match(row, catalog)), availability,
+            min(prices, default=None), max(prices, default=None), bands
+        )
+
+    def _catalog_rows(self, q: Optional[str]) -> List[Tuple[Product, str, Decimal]]:
+        # (producto, disponibilidad, precio mostrado) de los visibles, en orden de relevancia si hay búsqueda
+        if q is not None and q.strip():
+            products = self.search(q, limit=len(self._products))
+        else:
+            products = [Product(*s) for s in list(self._products.values())]
+        now = get_local_time()
+        rows = []
+        for product in products:
+            availability = public_availability(product, now)
+            if availability is not None:
+                rows.append((product, availability, display_price(product, availability)))
+        return rows
 
     def delete(self, product_id: UUID) -> bool:
         """
         Elimina un producto y sus movimientos asociados en memoria.
         """
-        if product_id in self._products:
-            del self._products[product_id]
-            # Limpiar movimientos asociados si existen
-            if hasattr(self, '_movements'):
-                self._movements = [m for m in self._movements if m.product_id != product_id]
-            return True
-        return False
+        with self._lock_for(product_id):
+            snapshot = self._products.pop(product_id, None)
+            if snapshot is None:
+                return False
+            with self._index_lock:
+                self._ids_by_sku.pop(Product(*snapshot).sku, None)
+
+        # Misma cascada que la FK de movements en la BD
+        with self._movements_lock:
+            for movement_id in self._movements_by_product.pop(product_id, []):
+                movement = Movement(*self._movements.pop(movement_id))
+                self._purchase_order_movements.discard(movement.purchase_order_id)
+        return True
 
     def find_initial_movement(self, product_id: UUID) -> Optional['Movement']:
         """
         Busca el primer movimiento de entrada de un producto en memoria.
         """
-        if not hasattr(self, '_movements'):
-            return None
-        
-        movements = [m for m in self._movements if m.product_id == product_id and m.type == 'ENTRY']
-        if not movements:
+        with self._movements_lock:
+            entries = [
+                self._movements[movement_id]
+                for movement_id in self._movements_by_product.get(product_id, [])
+                if self._movements[movement_id][_MOVEMENT_TYPE] == 'ENTRY'
+            ]
+        if not entries:
             return None
-            
-        # El más antiguo (primero en la lista pues se guardan por orden de llegada)
-        return deepcopy(sorted(movements, key=lambda x: x.date)[0])
+        return Movement(*min(entries, key=lambda s: s[_MOVEMENT_DATE]))
 
     def update_movement(self, movement: 'Movement') -> 'Movement':
         """
         Actualiza un movimiento existente en memoria.
         """
-        if not hasattr(self, '_movements'):
-            return movement
-            
-        for i, m in enumerate(self._movements):
-            if m.id == movement.id:
-                self._movements[i].reference = movement.reference
-                self._movements[i].document_path = movement.document_path
-                self._movements[i].recipient_email = movement.recipient_email
-                break
+        with self._movements_lock:
+            snapshot = self._movements.get(movement.id)
+            if snapshot is not None:
+                stored = Movement(*snapshot)
+                stored.reference = movement.reference
+                stored.document_path = movement.document_path
+                stored.recipient_email = movement.recipient_email
+                self._movements[movement.id] = _movement_snapshot(stored)
         return movement
 
+    def exists_movement_for_purchase_order(self, purchase_order_id: UUID) -> bool:
+        """
+        Verifica si la OC ya tiene su movimiento de entrada en memoria.
+        """
+        return purchase_order_id in self._purchase_order_movements
+
     def save_movement(self, movement: 'Movement') -> 'Movement':
         """
         Registra un movimiento en memoria con hora local.
         """
-        if not hasattr(self, '_movements'):
-            self._movements = []
-        
         # Asegurar que tenga fecha local si no se provee
         if not movement.date:
-            from datetime import datetime, timedelta, timezone
-            tz = timezone(timedelta(hours=-5))
-            movement.date = datetime.now(tz)
-            
-        self._movements.append(deepcopy(movement))
+            movement.date = get_local_time()
+
+        with self._movements_lock:
+            # Misma restricción que el índice único de la BD
+            if movement.purchase_order_id:
+                if movement.purchase_order_id in self._purchase_order_movements:
+                    raise ValueError(f"La orden de compra {movement.purchase_order_id} ya tiene una entrada registrada")
+                self._purchase_order_movements.add(movement.purchase_order_id)
+
+            self._movements[movement.id] = _movement_snapshot(movement)
+            self._movements_by_product.setdefault(movement.product_id, []).append(movement.id)
         return movement
 
-    def find_all_movements(self) -> list['Movement']:
+    def find_all_movements(self, skip: int = 0, limit: int = 100) -> list['Movement']:
         """
-        Retorna todos los movimientos registrados en memoria.
+        Retorna los movimientos (más recientes primero) con paginación.
         """
-        if not hasattr(self, '_movements'):
-            return []
-        return sorted(deepcopy(self._movements), key=lambda x: x.date, reverse=True)
+        snapshots = list(self._movements.values())
+        # Solo se ordenan los skip + limit más recientes
+        page: List[Tuple] = heapq.nlargest(skip + limit, snapshots, key=lambda s: s[_MOVEMENT_DATE])[skip:]
+        return [Movement(*s) for s in page]
+
+    def iter_movements(
+        self,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        movement_type: Optional[str] = None,
+        product_id: Optional[UUID] = None,
+    ) -> Iterator['Movement']:
+        """
+        Recorre los movimientos filtrados (más antiguos primero).
+        """
+        # Como en la BD, las fechas se comparan en hora local sin zona
+        start_date = start_date.replace(tzinfo=None) if start_date else None
+        end_date = end_date.replace(tzinfo=None) if end_date else None
+        snapshots = sorted(self._movements.values(), key=lambda s: s[_MOVEMENT_DATE])
+        for snapshot in snapshots:
+            movement = Movement(*snapshot)
+            date = movement.date.replace(tzinfo=None)
+            if start_date and date < start_date:
+                continue
+            if end_date and date > end_date:
+                continue
+            if movement_type and movement.type != movement_type:
+                continue
+            if product_id and movement.product_id != product_id:
+                continue
+            yield movement
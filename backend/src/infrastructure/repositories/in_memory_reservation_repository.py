@@ -0,0 +1,108 @@
+"""
+Implementación en memoria del repositorio de reservas de stock.
+"""
+import threading
+from collections import defaultdict
+from copy import deepcopy
+from datetime import datetime
+from typing import Dict, List, Tuple
+from uuid import UUID
+
+from src.domain.entities import get_local_time
+from src.domain.exceptions import InsufficientStockError, ProductNotFoundError
+from src.domain.reservation_entities import (
+    RESERVATION_ACTIVE,
+    RESERVATION_CONVERTED,
+    RESERVATION_EXPIRED,
+    RESERVATION_RELEASED,
+    StockReservation,
+)
+from src.ports.repository import ProductRepository
+from src.ports.reservation_repository import ReservationRepository
+
+
+class InMemoryReservationRepository(ReservationRepository):
+    """
+    Reservas en un diccionario, para usar junto a InMemoryProductRepository.
+
+    Un lock serializa las operaciones: la comprobación del stock disponible
+    y la creación de la reserva son atómicas entre hilos.
+    """
+
+    def __init__(self, product_repository: ProductRepository) -> None:
+        self._products = product_repository
+        self._reservations: Dict[UUID, StockReservation] = {}
+        self._lock = threading.Lock()
+
+    def hold(
+        self,
+        reservation_id: UUID,
+        items: List[Tuple[UUID, int]],
+        expires_at: datetime,
+    ) -> List[StockReservation]:
+        requested: Dict[UUID, int] = defaultdict(int)
+        for product_id, quantity in items:
+            requested[product_id] += quantity
+
+        now = get_local_time()
+        with self._lock:
+            reserved = self._reserved(now)
+            for product_id, quantity in requested.items():
+                product = self._products.find_by_id(product_id)
+                if not product:
+                    raise ProductNotFoundError(str(product_id))
+                available = product.stock - reserved.get(product_id, 0)
+                if available < quantity:
+                    raise InsufficientStockError(available=max(available, 0), requested=quantity)
+
+            reservations = [
+                StockReservation(
+                    reservation_id=reservation_id,
+                    product_id=product_id,
+                    quantity=quantity,
+                    expires_at=expires_at,
+                    created_at=now
+                )
+                for product_id, quantity in requested.items()
+            ]
+            for r in reservations:
+                self._reservations[r.id] = deepcopy(r)
+        return reservations
+
+    def convert(self, reservation_id: UUID) -> int:
+        return self._set_status(reservation_id, RESERVATION_CONVERTED)
+
+    def release(self, reservation_id: UUID) -> int:
+        return self._set_status(reservation_id, RESERVATION_RELEASED)
+
+    def expire(self, now: datetime) -> int:
+        with self._lock:
+            expired = [
+                r for r in self._reservations.values()
+                if r.status == RESERVATION_ACTIVE and r.expires_at <= now
+            ]
+            for r in expired:
+                r.status = RESERVATION_EXPIRED
+        return len(expired)
+
+    def reserved_quantities(self, product_ids: List[UUID]) -> Dict[UUID, int]:
+        with self._lock:
+            reserved = self._reserved(get_local_time())
+        return {p: reserved[p] for p in product_ids if p in reserved}
+
+    def _reserved(self, now: datetime) -> Dict[UUID, int]:
+        reserved: Dict[UUID, int] = defaultdict(int)
+        for r in self._reservations.values():
+            if r.is_active(now):
+                reserved[r.product_id] += r.quantity
+        return reserved
+
+    def _set_status(self, reservation_id: UUID, status: str) -> int:
+        with self._lock:
+            lines = [
+                r for r in self._reservations.values()
+                if r.reservation_id == reservation_id and r.status == RESERVATION_ACTIVE
+            ]
+            for r in lines:
+                r.status = status
+        return len(lines)
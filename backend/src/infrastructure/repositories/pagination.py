@@ -0,0 +1,65 @@
+"""
+Paginación por keyset (cursor) para los listados.
+
+El cursor codifica la clave de orden del último elemento de la página
+(`created_at`, `id`); la página siguiente se obtiene con un WHERE sobre esa
+clave en lugar de OFFSET, de modo que el costo no crece con la profundidad.
+"""
+import base64
+from datetime import datetime
+from typing import Callable, List, Optional, Tuple, TypeVar
+
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Query
+
+T = TypeVar("T")
+
+MAX_PAGE_SIZE = 500
+
+
+def encode_cursor(created_at: datetime, id_: str) -> str:
+    raw = f"{created_at.isoformat()}|{id_}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    """
+    Raises:
+        ValueError: Si el cursor no es válido.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, id_ = base64.urlsafe_b64decode(padded.encode()).decode().split("|", 1)
+        return datetime.fromisoformat(created_at), id_
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError("Cursor de paginación inválido") from e
+
+
+def paginate_desc(
+    query: Query,
+    created_col,
+    id_col,
+    limit: int,
+    cursor: Optional[str],
+    to_entity: Callable[[object], T],
+) -> Tuple[List[T], Optional[str]]:
+    """
+    Aplica orden (created_at DESC, id DESC), el keyset del cursor y el límite.
+    Retorna los elementos de la página y el cursor de la siguiente (o None).
+    """
+    if cursor:
+        created_at, id_ = decode_cursor(cursor)
+        query = query.filter(or_(
+            created_col < created_at,
+            and_(created_col == created_at, id_col < id_)
+        ))
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    # Se pide un elemento extra para saber si hay página siguiente
+    rows = query.order_by(created_col.desc(), id_col.desc()).limit(limit + 1).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(getattr(last, created_col.key), getattr(last, id_col.key))
+    return [to_entity(r) for r in rows], next_cursor
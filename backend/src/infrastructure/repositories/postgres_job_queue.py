@@ -0,0 +1,111 @@
+import json
+import os
+from datetime import datetime, timedelta
+from typing import List, Optional
+from uuid import UUID
+
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Session
+
+from src.domain.entities import get_local_time
+from src.domain.job_entities import Job
+from src.ports.job_queue import JobQueue
+from src.infrastructure.database.models import JobModel
+
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "5"))
+# Un trabajo RUNNING sin terminar tras este tiempo se considera huérfano (worker caído)
+JOB_LOCK_TIMEOUT_SECONDS = int(os.getenv("JOB_LOCK_TIMEOUT_SECONDS", "600"))
+JOB_RETRY_BASE_SECONDS = 30
+JOB_RETRY_MAX_SECONDS = 3600
+JOB_ABANDONED_ERROR = "El worker no terminó el trabajo en ninguno de sus intentos"
+
+
+class PostgresJobQueue(JobQueue):
+    def __init__(self, session: Session):
+        self.session = session
+
+    def enqueue(self, kind: str, payload: dict, max_attempts: Optional[int] = None, run_after: Optional[datetime] = None) -> Job:
+        job = Job(
+            kind=kind,
+            payload=payload,
+            max_attempts=max_attempts or JOB_MAX_ATTEMPTS,
+            run_after=run_after or get_local_time()
+        )
+        self.session.add(JobModel(
+            id=str(job.id),
+            kind=job.kind,
+            payload=json.dumps(job.payload, default=str),
+            status=job.status,
+            attempts=job.attempts,
+            max_attempts=job.max_attempts,
+            run_after=job.run_after,
+            created_at=job.created_at
+        ))
+        self.session.commit()
+        return job
+
+    def claim(self, kind: str, limit: int) -> List[Job]:
+        now = get_local_time()
+        stale = now - timedelta(seconds=JOB_LOCK_TIMEOUT_SECONDS)
+        orphaned = and_(JobModel.kind == kind, JobModel.status == "RUNNING", JobModel.locked_at < stale)
+        # Huérfanos que ya agotaron sus intentos: el trabajo tumba al worker, no se reintenta
+        self.session.query(JobModel).filter(
+            orphaned, JobModel.attempts >= JobModel.max_attempts
+        ).update({
+            JobModel.status: "FAILED",
+            JobModel.locked_at: None,
+            JobModel.last_error: JOB_ABANDONED_ERROR,
+        }, synchronize_session=False)
+
+        # FOR UPDATE SKIP LOCKED permite varios workers sin tomar el mismo trabajo
+        # (en SQLite se ignora; la escritura ya está serializada)
+        models = self.session.query(JobModel).filter(
+            JobModel.kind == kind,
+            or_(
+                and_(JobModel.status == "PENDING", JobModel.run_after <= now),
+                and_(orphaned, JobModel.attempts < JobModel.max_attempts)
+            )
+        ).order_by(JobModel.run_after).limit(limit).with_for_update(skip_locked=True).all()
+
+        for m in models:
+            m.status = "RUNNING"
+            m.locked_at = now
+            m.attempts = (m.attempts or 0) + 1
+        self.session.commit()
+        return [self._to_entity(m) for m in models]
+
+    def complete(self, job_id: UUID) -> None:
+        model = self.session.get(JobModel, str(job_id))
+        if model:
+            model.status = "DONE"
+            model.locked_at = None
+            model.last_error = None
+            self.session.commit()
+
+    def fail(self, job_id: UUID, error: str) -> None:
+        model = self.session.get(JobModel, str(job_id))
+        if not model:
+            return
+        model.last_error = (error or "")[:1000]
+        model.locked_at = None
+        if model.attempts >= model.max_attempts:
+            model.status = "FAILED"
+        else:
+            # Backoff exponencial: 30s, 60s, 120s... con tope de 1 hora
+            delay = min(JOB_RETRY_BASE_SECONDS * (2 ** (model.attempts - 1)), JOB_RETRY_MAX_SECONDS)
+            model.status = "PENDING"
+            model.run_after = get_local_time() + timedelta(seconds=delay)
+        self.session.commit()
+
+    def _to_entity(self, m: JobModel) -> Job:
+        return Job(
+            id=UUID(str(m.id)),
+            kind=m.kind,
+            payload=json.loads(m.payload),
+            status=m.status,
+            attempts=m.attempts,
+            max_attempts=m.max_attempts,
+            run_after=m.run_after,
+            last_error=m.last_error,
+            created_at=m.created_at
+        )
@@ -0,0 +1,276 @@
+"""
+Libro de stock sobre PostgreSQL: checkpoints diarios en `stock_snapshots`,
+stock a una fecha reponiendo solo los movimientos desde el último checkpoint
+y conciliación incremental de `products.stock` con los movimientos.
+"""
+from datetime import datetime
+from decimal import Decimal
+from typing import List, Optional
+from uuid import UUID, uuid4
+
+from sqlalchemy import and_, case, delete, func, insert, or_, select, text
+from sqlalchemy.orm import Session
+
+from src.domain.entities import get_local_time
+from src.domain.ledger_entities import (
+    ADJUSTMENT_IN,
+    ADJUSTMENT_OUT,
+    INBOUND_MOVEMENT_TYPES,
+    OUTBOUND_MOVEMENT_TYPES,
+    ReconciliationRun,
+    StockDiscrepancy,
+    StockPosition,
+)
+from src.infrastructure.database.models import (
+    MovementModel,
+    ProductModel,
+    PurchaseOrderModel,
+    ReconciliationRunModel,
+    StockBalanceModel,
+    StockSnapshotModel,
+)
+from src.infrastructure.repositories.sql_dialect import insert_for
+from src.ports.ledger_repository import LedgerRepository
+
+# Clave del advisory lock que serializa las conciliaciones en PostgreSQL
+RECONCILIATION_LOCK_KEY = 47_001
+
+_SIGNED_QUANTITY = case(
+    (MovementModel.type.in_(INBOUND_MOVEMENT_TYPES), MovementModel.quantity),
+    (MovementModel.type.in_(OUTBOUND_MOVEMENT_TYPES), -MovementModel.quantity),
+    else_=0,
+)
+
+
+class PostgresLedgerRepository(LedgerRepository):
+    def __init__(self, session: Session):
+        self._session = session
+
+    def _positions_query(self, as_of: datetime, product_id: Optional[UUID] = None):
+        """(product_id, sku, name, stock, unit_cost) de cada producto en `as_of`."""
+        # Último checkpoint de cada producto no posterior a as_of
+        latest = (
+            select(StockSnapshotModel.product_id, func.max(StockSnapshotModel.as_of).label("as_of"))
+            .where(StockSnapshotModel.as_of <= as_of)
+            .group_by(StockSnapshotModel.product_id)
+            .subquery()
+        )
+        checkpoint = (
+            select(StockSnapshotModel.product_id, StockSnapshotModel.as_of, StockSnapshotModel.stock)
+            .join(latest, and_(
+                latest.c.product_id == StockSnapshotModel.product_id,
+                latest.c.as_of == StockSnapshotModel.as_of,
+            ))
+            .subquery()
+        )
+        # Costo de la última compra recibida hasta as_of
+        received_at = func.coalesce(PurchaseOrderModel.actual_delivery_date, PurchaseOrderModel.created_at)
+        unit_cost = (
+            select(PurchaseOrderModel.unit_price)
+            .where(
+                PurchaseOrderModel.product_id == ProductModel.id,
+                PurchaseOrderModel.status == "RECEIVED",
+                received_at < as_of,
+            )
+            .order_by(received_at.desc())
+            .limit(1)
+            .scalar_subquery()
+        )
+
+        query = (
+            select(
+                ProductModel.id,
+                ProductModel.sku,
+                ProductModel.name,
+                (func.coalesce(checkpoint.c.stock, 0) + func.coalesce(func.sum(_SIGNED_QUANTITY), 0)).label("stock"),
+                unit_cost.label("unit_cost"),
+            )
+            .outerjoin(checkpoint, checkpoint.c.product_id == ProductModel.id)
+            # Solo los movimientos posteriores al checkpoint (usa idx_movement_product_date)
+            .outerjoin(MovementModel, and_(
+                MovementModel.product_id == ProductModel.id,
+                MovementModel.date < as_of,
+                or_(checkpoint.c.as_of.is_(None), MovementModel.date >= checkpoint.c.as_of),
+            ))
+            .group_by(ProductModel.id, ProductModel.sku, ProductModel.name, checkpoint.c.stock)
+            .order_by(ProductModel.sku)
+        )
+        if product_id:
+            query = query.where(ProductModel.id == str(product_id))
+        return query
+
+    def stock_positions(self, as_of: datetime, product_id: Optional[UUID] = None) -> List[StockPosition]:
+        rows = self._session.execute(self._positions_query(as_of, product_id)).all()
+        return [
+            StockPosition(
+                product_id=UUID(row.id),
+                sku=row.sku,
+                name=row.name,
+                stock=int(row.stock),
+                unit_cost=Decimal(str(row.unit_cost)) if row.unit_cost is not None else None,
+            )
+            for row in rows
+        ]
+
+    def save_snapshots(self, as_of: datetime) -> int:
+        positions = self._session.execute(self._positions_query(as_of)).all()
+        if not positions:
+            return 0
+        statement = insert_for(self._session, StockSnapshotModel.__table__)
+        statement = statement.on_conflict_do_update(
+            index_elements=["product_id", "as_of"],
+            set_={"stock": statement.excluded.stock},
+        )
+        try:
+            self._session.execute(statement, [
+                {"id": str(uuid4()), "product_id": row.id, "as_of": as_of, "stock": int(row.stock)}
+                for row in positions
+            ])
+            self._session.commit()
+        except Exception:
+            self._session.rollback()
+            raise
+        return len(positions)
+
+    def _upsert_balances(self, rows: List[dict], set_: dict) -> None:
+        statement = insert_for(self._session, StockBalanceModel.__table__)
+        statement = statement.on_conflict_do_update(
+            index_elements=["product_id"],
+            set_={key: value(statement) for key, value in set_.items()},
+        )
+        self._session.execute(statement, rows)
+
+    def reconcile(self, run: ReconciliationRun, correct: bool = False) -> ReconciliationRun:
+        session = self._session
+        high_water_mark = run.high_water_mark
+        now = get_local_time().replace(tzinfo=None)
+        try:
+            if session.get_bind().dialect.name == "postgresql":
+                # Una conciliación a la vez; el lock se libera con la transacción
+                session.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": RECONCILIATION_LOCK_KEY})
+            last = session.execute(
+                select(ReconciliationRunModel.high_water_mark, ReconciliationRunModel.started_at)
+                .order_by(ReconciliationRunModel.high_water_mark.desc())
+                .limit(1)
+            ).first()
+
+            # 1. Movimientos nuevos desde la marca anterior (usa idx_movement_date)
+            new_movements = (
+                select(MovementModel.product_id, func.sum(_SIGNED_QUANTITY), func.count())
+                .where(MovementModel.date < high_water_mark)
+                .group_by(MovementModel.product_id)
+            )
+            if last:
+                new_movements = new_movements.where(MovementModel.date >= last.high_water_mark)
+            deltas = {}
+            for product_id, delta, count in session.execute(new_movements):
+                deltas[product_id] = int(delta or 0)
+                run.movements_applied += count
+
+            if deltas:
+                self._upsert_balances(
+                    [{"product_id": pid, "expected_stock": delta, "discrepancy": 0, "updated_at": now}
+                     for pid, delta in deltas.items()],
+                    {
+                        "expected_stock": lambda st: StockBalanceModel.__table__.c.expected_stock + st.excluded.expected_stock,
+                        "updated_at": lambda st: st.excluded.updated_at,
+                    },
+                )
+
+            # 2. Comparar con products.stock; el esperado incluye los movimientos
+            #    posteriores a la marca, que aún no están en el saldo
+            tail = (
+                select(MovementModel.product_id.label("product_id"), func.sum(_SIGNED_QUANTITY).label("delta"))
+                .where(MovementModel.date >= high_water_mark)
+                .group_by(MovementModel.product_id)
+                .subquery()
+            )
+            candidates = (
+                select(
+                    ProductModel.id,
+                    ProductModel.sku,
+                    ProductModel.name,
+                    ProductModel.stock,
+                    (func.coalesce(StockBalanceModel.expected_stock, 0) + func.coalesce(tail.c.delta, 0)).label("expected"),
+                    func.coalesce(StockBalanceModel.discrepancy, 0).label("previous"),
+                )
+                .outerjoin(StockBalanceModel, StockBalanceModel.product_id == ProductModel.id)
+                .outerjoin(tail, tail.c.product_id == ProductModel.id)
+            )
+            if last:
+                # Solo lo que pudo cambiar: tocado por movimientos nuevos, stock
+                # modificado desde la pasada anterior o con diferencia pendiente
+                candidates = candidates.where(or_(
+                    ProductModel.id.in_(list(deltas)),
+                    ProductModel.updated_at >= last.started_at,
+                    StockBalanceModel.discrepancy != 0,
+                ))
+
+            balances, adjustments = [], []
+            for row in session.execute(candidates):
+                expected = int(row.expected)
+                difference = row.stock - expected
+                # Se corrige solo si la diferencia ya estaba en la pasada anterior
+                # (no es una operación a medio registrar)
+                corrected = correct and difference != 0 and difference == row.previous
+                if difference:
+                    run.discrepancies.append(StockDiscrepancy(
+                        product_id=UUID(row.id), sku=row.sku, stock=row.stock,
+                        expected_stock=expected, corrected=corrected,
+                    ))
+                if corrected:
+                    adjustments.append({
+                        "id": str(uuid4()),
+                        "product_id": row.id,
+                        "quantity": abs(difference),
+                        "type": ADJUSTMENT_IN if difference > 0 else ADJUSTMENT_OUT,
+                        "reference": f"CONCILIACION {str(run.id)[:8]}",
+                        "product_name": row.name,
+                        "is_returnable": False,
+                        "date": now,
+                    })
+                discrepancy = 0 if corrected else difference
+                if discrepancy != row.previous:
+                    balances.append({"product_id": row.id, "expected_stock": 0, "discrepancy": discrepancy, "updated_at": now})
+
+            if balances:
+                self._upsert_balances(balances, {
+                    "discrepancy": lambda st: st.excluded.discrepancy,
+                    "updated_at": lambda st: st.excluded.updated_at,
+                })
+            if adjustments:
+                session.execute(insert(MovementModel), adjustments)
+
+            session.add(ReconciliationRunModel(
+                id=str(run.id),
+                high_water_mark=high_water_mark,
+                started_at=run.started_at.replace(tzinfo=None),
+                movements_applied=run.movements_applied,
+                discrepancies=len(run.discrepancies),
+                corrections=run.corrections,
+            ))
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        return run
+
+    def reset_reconciliation(self) -> None:
+        self._session.execute(delete(StockBalanceModel))
+        self._session.execute(delete(ReconciliationRunModel))
+        self._session.commit()
+
+    def pending_discrepancies(self) -> List[StockDiscrepancy]:
+        rows = self._session.execute(
+            select(StockBalanceModel.product_id, ProductModel.sku, ProductModel.stock, StockBalanceModel.discrepancy)
+            .join(ProductModel, ProductModel.id == StockBalanceModel.product_id)
+            .where(StockBalanceModel.discrepancy != 0)
+            .order_by(ProductModel.sku)
+        ).all()
+        return [
+            StockDiscrepancy(
+                product_id=UUID(row.product_id), sku=row.sku,
+                stock=row.stock, expected_stock=row.stock - row.discrepancy,
+            )
+            for row in rows
+        ]
@@ -1,9 +1,14 @@
-from typing import List, Optional
+from datetime import datetime
+from decimal import Decimal
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
 from uuid import UUID
+from sqlalchemy import and_, case, delete, func, or_, select, union
 from sqlalchemy.orm import Session, joinedload
-from src.domain.purchase_entities import Supplier, PurchaseOrder
+from src.domain.purchase_entities import Supplier, PurchaseOrder, PurchaseKPIs
 from src.ports.purchase_repository import PurchaseRepository
-from src.infrastructure.database.models import SupplierModel, PurchaseOrderModel, ProductModel
+from src.infrastructure.database.models import SupplierModel, PurchaseOrderModel, ProductModel, supplier_product
+from src.infrastructure.repositories.pagination import paginate_desc
+from src.infrastructure.repositories.sql_dialect import aggregate_strings, insert_for, split_aggregate
 
 class PostgresPurchaseRepository(PurchaseRepository):
     def __init__(self, session: Session):
@@ -20,38 +25,54 @@ class PostgresPurchaseRepository(PurchaseRepository):
             contact_position=supplier.contact_position,
             is_active=supplier.is_active
         )
-        
-        # Add associations
-        if supplier.product_ids:
-            for p_id in supplier.product_ids:
-                product = self.session.query(ProductModel).filter(ProductModel.id == str(p_id)).first()
-                if product:
-                    model.products.append(product)
-
         self.session.add(model)
+        self.session.flush()
+        if supplier.product_ids:
+            self._sync_supplier_products(model.id, supplier.product_ids, current=set())
         self.session.commit()
-        
-        # Refresh to load relationships
-        self.session.refresh(model)
         return self._to_supplier_entity(model)
 
     def get_suppliers(self, skip: int = 0, limit: int = 100) -> List[Supplier]:
-        # Eager load products and purchase_orders -> product to avoid N+1 and ensure data availability
-        models = self.session.query(SupplierModel).options(
-            joinedload(SupplierModel.products),
-            joinedload(SupplierModel.purchase_orders).joinedload(PurchaseOrderModel.product)
-        ).offset(skip).limit(limit).all()
-        
-        return [self._to_supplier_entity(m) for m in models]
+        models = self.session.query(SupplierModel).offset(skip).limit(limit).all()
+        products = self._supplier_products([m.id for m in models])
+        return [self._to_supplier_entity(m, products.get(m.id)) for m in models]
 
     def get_supplier(self, supplier_id: UUID) -> Optional[Supplier]:
-        model = self.session.query(SupplierModel).options(
-            joinedload(SupplierModel.products)
-        ).filter(SupplierModel.id == str(supplier_id)).first()
+        model = self.session.query(SupplierModel).filter(SupplierModel.id == str(supplier_id)).first()
         if not model:
             return None
         return self._to_supplier_entity(model)
 
+    def _supplier_products(self, supplier_ids: List[str]) -> Dict[str, Tuple[List[str], List[str]]]:
+        """
+        Productos de cada proveedor: (IDs, nombres) por supplier_id.
+
+        Son los vinculados en supplier_product más los comprados en alguna OC.
+        El UNION deja pares (proveedor, producto) distintos y la agregación se
+        hace en SQL, así que el costo no depende del historial de órdenes.
+        """
+        if not supplier_ids:
+            return {}
+        links = union(
+            select(supplier_product.c.supplier_id, supplier_product.c.product_id)
+            .where(supplier_product.c.supplier_id.in_(supplier_ids)),
+            select(PurchaseOrderModel.supplier_id, PurchaseOrderModel.product_id)
+            .where(PurchaseOrderModel.supplier_id.in_(supplier_ids))
+        ).subquery()
+        rows = self.session.execute(
+            select(
+                links.c.supplier_id,
+                aggregate_strings(self.session, ProductModel.id),
+                aggregate_strings(self.session, ProductModel.name)
+            )
+            .join(ProductModel, ProductModel.id == links.c.product_id)
+            .group_by(links.c.supplier_id)
+        )
+        return {
+            supplier_id: (split_aggregate(ids), split_aggregate(names))
+            for supplier_id, ids, names in rows
+        }
+
     def update_supplier(self, supplier: Supplier) -> Supplier:
         model = self.session.query(SupplierModel).filter(SupplierModel.id == str(supplier.id)).first()
         if model:
@@ -62,20 +83,46 @@ class PostgresPurchaseRepository(PurchaseRepository):
             model.contact_name = supplier.contact_name
             model.contact_position = supplier.contact_position
             model.is_active = supplier.is_active
-            
-            # Update products
-            model.products = []
-            if supplier.product_ids:
-                for p_id in supplier.product_ids:
-                    product = self.session.query(ProductModel).filter(ProductModel.id == str(p_id)).first()
-                    if product:
-                        model.products.append(product)
-            
+            self._sync_supplier_products(model.id, supplier.product_ids or [])
             self.session.commit()
             self.session.refresh(model)
             return self._to_supplier_entity(model)
         return supplier
 
+    def _sync_supplier_products(
+        self,
+        supplier_id: str,
+        product_ids: Iterable[UUID],
+        current: Optional[Set[str]] = None,
+    ) -> None:
+        """
+        Deja en supplier_product exactamente los productos existentes de `product_ids`.
+
+        Solo se insertan/borran las diferencias, con un número fijo de
+        consultas sin importar cuántos productos tenga el proveedor.
+        """
+        wanted = {str(p) for p in product_ids}
+        desired = set(self.session.execute(
+            select(ProductModel.id).where(ProductModel.id.in_(wanted))
+        ).scalars()) if wanted else set()
+        if current is None:
+            current = set(self.session.execute(
+                select(supplier_product.c.product_id).where(supplier_product.c.supplier_id == supplier_id)
+            ).scalars())
+
+        to_delete = current - desired
+        to_insert = desired - current
+        if to_delete:
+            self.session.execute(delete(supplier_product).where(
+                supplier_product.c.supplier_id == supplier_id,
+                supplier_product.c.product_id.in_(to_delete)
+            ))
+        if to_insert:
+            self.session.execute(
+                insert_for(self.session, supplier_product).on_conflict_do_nothing(),
+                [{"supplier_id": supplier_id, "product_id": p} for p in sorted(to_insert)]
+            )
+
     def delete_supplier(self, supplier_id: UUID) -> bool:
         model = self.session.query(SupplierModel).filter(SupplierModel.id == str(supplier_id)).first()
         if model:
@@ -84,7 +131,14 @@ class PostgresPurchaseRepository(PurchaseRepository):
             return True
         return False
 
-    def _to_supplier_entity(self, m: SupplierModel) -> Supplier:
+    def _to_supplier_entity(
+        self,
+        m: SupplierModel,
+        products: Optional[Tuple[List[str], List[str]]] = None
+    ) -> Supplier:
+        if products is None:
+            products = self._supplier_products([m.id]).get(m.id)
+        product_ids, product_names = products or ([], [])
         return Supplier(
             id=UUID(str(m.id)),
             name=m.name,
@@ -94,8 +148,8 @@ class PostgresPurchaseRepository(PurchaseRepository):
             contact_name=m.contact_name,
             contact_position=m.contact_position,
             is_active=m.is_active,
-            products=list(set([p.name for p in m.products] + [po.product.name for po in m.purchase_orders if po.product])),
-            product_ids=list(set([UUID(str(p.id)) for p in m.products] + [UUID(str(po.product_id)) for po in m.purchase_orders if po.product_id]))
+            products=sorted(set(product_names)),
+            product_ids=[UUID(str(p)) for p in product_ids]
         )
 
     def add_purchase_order(self, order: PurchaseOrder) -> PurchaseOrder:
@@ -127,15 +181,117 @@ class PostgresPurchaseRepository(PurchaseRepository):
         self.session.commit()
         return order
 
+    def _orders_query(self):
+        # Nombre de proveedor y producto en el mismo SELECT (sin lazy-load por fila)
+        return self.session.query(PurchaseOrderModel).options(
+            joinedload(PurchaseOrderModel.supplier).load_only(SupplierModel.name),
+            joinedload(PurchaseOrderModel.product).load_only(ProductModel.name)
+        )
+
     def get_purchase_orders(self, skip: int = 0, limit: int = 100) -> List[PurchaseOrder]:
-        models = self.session.query(PurchaseOrderModel).offset(skip).limit(limit).all()
-        orders = []
-        for m in models:
-            orders.append(self._to_entity(m))
-        return orders
+        models = self._orders_query().order_by(
+            PurchaseOrderModel.created_at.desc(), PurchaseOrderModel.id.desc()
+        ).offset(skip).limit(limit).all()
+        return [self._to_entity(m) for m in models]
+
+    def find_purchase_orders_page(
+        self,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        status: Optional[str] = None,
+        supplier_id: Optional[UUID] = None,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+    ) -> Tuple[List[PurchaseOrder], Optional[str]]:
+        query = self._orders_query()
+        if status:
+            query = query.filter(PurchaseOrderModel.status == status)
+        if supplier_id:
+            query = query.filter(PurchaseOrderModel.supplier_id == str(supplier_id))
+        if start_date:
+            query = query.filter(PurchaseOrderModel.created_at >= start_date)
+        if end_date:
+            query = query.filter(PurchaseOrderModel.created_at <= end_date)
+
+        return paginate_desc(
+            query, PurchaseOrderModel.created_at, PurchaseOrderModel.id, limit, cursor, self._to_entity
+        )
+
+    # Tamaño de lote para iteraciones largas (exportaciones)
+    ITER_BATCH_SIZE = 200
+
+    def iter_purchase_orders(
+        self,
+        order_ids: Optional[List[UUID]] = None,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+    ) -> Iterator[PurchaseOrder]:
+        base = self.session.query(PurchaseOrderModel).options(
+            joinedload(PurchaseOrderModel.supplier),
+            joinedload(PurchaseOrderModel.product)
+        )
+        if start_date:
+            base = base.filter(PurchaseOrderModel.created_at >= start_date)
+        if end_date:
+            base = base.filter(PurchaseOrderModel.created_at <= end_date)
+        base = base.order_by(PurchaseOrderModel.created_at, PurchaseOrderModel.id)
+
+        if order_ids is None:
+            for m in base.yield_per(self.ITER_BATCH_SIZE):
+                yield self._to_entity(m)
+            return
+
+        # Listas de IDs grandes se consultan por tramos para acotar el IN (...)
+        ids = [str(i) for i in order_ids]
+        for i in range(0, len(ids), self.ITER_BATCH_SIZE):
+            chunk = ids[i:i + self.ITER_BATCH_SIZE]
+            for m in base.filter(PurchaseOrderModel.id.in_(chunk)).all():
+                yield self._to_entity(m)
+
+    def get_purchase_kpis(
+        self,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        supplier_id: Optional[UUID] = None,
+    ) -> PurchaseKPIs:
+        po = PurchaseOrderModel
+        rejected = or_(po.is_rejected.is_(True), po.status == "REJECTED")
+        finished = po.actual_delivery_date.isnot(None)
+        on_time = and_(
+            finished,
+            po.expected_delivery_date.isnot(None),
+            po.actual_delivery_date <= po.expected_delivery_date
+        )
+
+        # Una sola agregación sobre la tabla: la respuesta no depende del número de órdenes
+        query = self.session.query(
+            func.count(po.id),
+            func.coalesce(func.sum(case((rejected, 1), else_=0)), 0),
+            func.coalesce(func.sum(po.total_amount), 0),
+            func.coalesce(func.sum(po.savings_amount), 0),
+            func.coalesce(func.sum(case((finished, 1), else_=0)), 0),
+            func.coalesce(func.sum(case((on_time, 1), else_=0)), 0),
+        )
+        if start_date:
+            query = query.filter(po.created_at >= start_date)
+        if end_date:
+            query = query.filter(po.created_at <= end_date)
+        if supplier_id:
+            query = query.filter(po.supplier_id == str(supplier_id))
+
+        total, rejected_count, total_cta, total_savings, finished_count, on_time_count = query.one()
+        total = total or 0
+        return PurchaseKPIs(
+            quality_rate=(rejected_count / total) * 100 if total else 0.0,
+            total_cta=Decimal(str(total_cta)).quantize(Decimal("0.01")),
+            total_savings=Decimal(str(total_savings)).quantize(Decimal("0.01")),
+            on_time_delivery_rate=(on_time_count / finished_count) * 100 if finished_count else 0.0,
+            total_orders=total,
+            rejected_orders=int(rejected_count)
+        )
 
     def get_purchase_order(self, order_id: UUID) -> Optional[PurchaseOrder]:
-        model = self.session.query(PurchaseOrderModel).filter(PurchaseOrderModel.id == str(order_id)).first()
+        model = self._orders_query().filter(PurchaseOrderModel.id == str(order_id)).first()
         if not model:
             return None
         return self._to_entity(model)
@@ -177,15 +333,17 @@ class PostgresPurchaseRepository(PurchaseRepository):
         return False
 
     def link_product_to_supplier(self, supplier_id: UUID, product_id: UUID) -> bool:
-        supplier = self.session.query(SupplierModel).filter(SupplierModel.id == str(supplier_id)).first()
-        product = self.session.query(ProductModel).filter(ProductModel.id == str(product_id)).first()
-        
-        if supplier and product:
-            if product not in supplier.products:
-                supplier.products.append(product)
-                self.session.commit()
-                return True
-        return False
+        # Un solo INSERT ... SELECT: solo inserta si ambos existen y el vínculo es nuevo
+        source = select(SupplierModel.id, ProductModel.id).join(
+            ProductModel, ProductModel.id == str(product_id)
+        ).where(SupplierModel.id == str(supplier_id))
+        result = self.session.execute(
+            insert_for(self.session, supplier_product)
+            .from_select(["supplier_id", "product_id"], source)
+            .on_conflict_do_nothing()
+        )
+        self.session.commit()
+        return result.rowcount > 0
 
     def _to_entity(self, m: PurchaseOrderModel) -> PurchaseOrder:
         return PurchaseOrder(
@@ -1,14 +1,103 @@
 """
 Implementación de ProductRepository para PostgreSQL usando SQLAlchemy.
 """
+from datetime import datetime
 from decimal import Decimal
-from typing import Optional
+from typing import Dict, Iterable, Iterator, List, Optional
 from uuid import UUID
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import and_, case, column, func, insert, literal_column, or_, select, table, true, update
+from sqlalchemy.orm import Session
 
+from src.domain.catalog_entities import (
+    AVAILABILITIES, COMING_SOON, IN_STOCK, PREORDER, SORT_PRICE_ASC, SORT_PRICE_DESC, SORT_RELEVANCE,
+    CatalogQuery, catalog_facets, price_bands,
+)
 from src.domain.entities import Product, Movement, get_local_time
-from src.domain.exceptions import ProductNotFoundError
-from src.infrastructure.database.models import ProductModel, MovementModel
+from src.domain.exceptions import InsufficientStockError, ProductNotFoundError
+from src.infrastructure.database.models import ProductModel, MovementModel, PurchaseOrderModel
+from src.infrastructure.database.product_search import (
+    SEARCH_CONFIG, SQLITE_FTS_TABLE, SQLITE_FTS_WEIGHTS, fts5_query_text, search_document, search_terms, sqlite_fts_available,
+    tsquery_text,
+)
+from src.infrastructure.repositories.row_mapper import RowMapper
+from src.infrastructure.repositories.sql_dialect import insert_for
+
+# Filas por viaje al servidor al recorrer los movimientos para exportar
+EXPORT_BATCH_SIZE = 1000
+
+_HAS_PENDING_PURCHASE_ORDERS = select(PurchaseOrderModel.id).where(
+    PurchaseOrderModel.product_id == ProductModel.id,
+    PurchaseOrderModel.status == "PENDING",
+).exists()
+
+# Visibles en la tienda: con precio y con stock, en preventa o con compra pendiente
+_PUBLIC_VISIBLE = and_(
+    ProductModel.retail_price > 0,
+    or_(ProductModel.stock > 0, ProductModel.is_preorder.is_(True), _HAS_PENDING_PURCHASE_ORDERS),
+)
+
+# Proyecciones para los listados de solo lectura (una fila -> una entidad,
+# sin pasar por el identity map ni cargar relaciones)
+_PRODUCT_ROWS = RowMapper(Product, {
+    "id": ProductModel.id,
+    "name": ProductModel.name,
+    "description": ProductModel.description,
+    "stock": ProductModel.stock,
+    "sku": ProductModel.sku,
+    "retail_price": ProductModel.retail_price,
+    "image_path": ProductModel.image_path,
+    "tech_sheet_path": ProductModel.tech_sheet_path,
+    "is_preorder": func.coalesce(ProductModel.is_preorder, False),
+    "preorder_price": ProductModel.preorder_price,
+    "estimated_delivery_date": ProductModel.estimated_delivery_date,
+    "preorder_description": ProductModel.preorder_description,
+    "stripe_price_id": ProductModel.stripe_price_id,
+    "has_pending_purchase_orders": _HAS_PENDING_PURCHASE_ORDERS,
+    "updated_at": ProductModel.updated_at,
+}, uuid_fields=("id",))
+
+_MOVEMENT_ROWS = RowMapper(Movement, {
+    "id": MovementModel.id,
+    "product_id": MovementModel.product_id,
+    "quantity": MovementModel.quantity,
+    "type": MovementModel.type,
+    "reference": MovementModel.reference,
+    "document_path": MovementModel.document_path,
+    "applicant": MovementModel.applicant,
+    "applicant_area": MovementModel.applicant_area,
+    "is_returnable": MovementModel.is_returnable,
+    "return_deadline": MovementModel.return_deadline,
+    "recipient_email": MovementModel.recipient_email,
+    "sales_order_id": MovementModel.sales_order_id,
+    "parent_id": MovementModel.parent_id,
+    "product_name": func.coalesce(MovementModel.product_name, ProductModel.name),
+    "purchase_order_id": MovementModel.purchase_order_id,
+    "date": MovementModel.date,
+}, uuid_fields=("id", "product_id", "sales_order_id", "parent_id", "purchase_order_id"))
+
+
+def movement_row(movement: Movement) -> dict:
+    """
+    Convierte un movimiento en los valores de columna de `movements`.
+    """
+    return dict(
+        id=str(movement.id),
+        product_id=str(movement.product_id),
+        quantity=movement.quantity,
+        type=movement.type,
+        reference=movement.reference,
+        document_path=movement.document_path,
+        applicant=movement.applicant,
+        applicant_area=movement.applicant_area,
+        is_returnable=movement.is_returnable,
+        return_deadline=movement.return_deadline,
+        recipient_email=movement.recipient_email,
+        sales_order_id=str(movement.sales_order_id) if movement.sales_order_id else None,
+        parent_id=str(movement.parent_id) if movement.parent_id else None,
+        product_name=movement.product_name,
+        purchase_order_id=str(movement.purchase_order_id) if movement.purchase_order_id else None,
+        date=movement.date
+    )
 
 
 class PostgreSQLProductRepository:
@@ -69,6 +158,7 @@ class PostgreSQLProductRepository:
             sales_order_id=UUID(model.sales_order_id) if model.sales_order_id else None,
             parent_id=UUID(model.parent_id) if model.parent_id else None,
             product_name=model.product_name or (model.product.name if model.product else None),
+            purchase_order_id=UUID(model.purchase_order_id) if model.purchase_order_id else None,
             date=model.date
         )
     
@@ -138,6 +228,13 @@ class PostgreSQLProductRepository:
         
         return self._to_entity(model)
     
+    def find_by_sku(self, sku: str) -> Optional[Product]:
+        """
+        Busca un producto por su SKU (índice idx_product_sku).
+        """
+        model = self._session.query(ProductModel).filter(ProductModel.sku == sku).first()
+        return self._to_entity(model) if model else None
+
     def update_stock(self, product_id: UUID, quantity: int) -> Product:
         """
         Actualiza el stock de un producto.
@@ -155,12 +252,265 @@ class PostgreSQLProductRepository:
         
         return self._to_entity(model)
 
+    def find_by_ids(self, product_ids: Iterable[UUID]) -> Dict[UUID, Product]:
+        """
+        Busca varios productos en una sola consulta, indexados por ID.
+        """
+        statement = _PRODUCT_ROWS.select().where(ProductModel.id.in_([str(pid) for pid in set(product_ids)]))
+        return {p.id: p for p in _PRODUCT_ROWS.all(self._session, statement)}
+
+    def apply_stock_movements(self, deltas: Dict[UUID, int], movements: List['Movement']) -> Dict[UUID, int]:
+        """
+        Aplica las variaciones de stock con un único UPDATE y registra los
+        movimientos con un INSERT masivo, todo en una transacción.
+
+        Returns:
+            Stock resultante por producto
+
+        Raises:
+            ProductNotFoundError: Si algún producto ya no existe
+            InsufficientStockError: Si algún stock quedaría negativo
+        """
+        ids = {str(pid): delta for pid, delta in deltas.items()}
+        try:
+            rows = self._session.execute(
+                update(ProductModel)
+                .where(ProductModel.id.in_(list(ids)))
+                .values(
+                    stock=ProductModel.stock + case(ids, value=ProductModel.id, else_=0),
+                    updated_at=get_local_time()
+                )
+                .returning(ProductModel.id, ProductModel.stock)
+                .execution_options(synchronize_session=False)
+            ).all()
+            stocks = {product_id: stock for product_id, stock in rows}
+
+            missing = ids.keys() - stocks.keys()
+            if missing:
+                raise ProductNotFoundError(sorted(missing)[0])
+            for product_id, stock in stocks.items():
+                if stock < 0:
+                    # Otra operación consumió el stock desde la validación
+                    raise InsufficientStockError(available=stock - ids[product_id], requested=-ids[product_id])
+
+            self._session.execute(insert(MovementModel), [movement_row(m) for m in movements])
+            self._session.commit()
+        except Exception:
+            self._session.rollback()
+            raise
+        return {UUID(product_id): stock for product_id, stock in stocks.items()}
+
+    def upsert_by_sku(self, products: List[Product], update_fields: Iterable[str]) -> None:
+        """
+        Inserta los productos o, si el SKU ya existe, sobrescribe solo
+        `update_fields` (el ID y el stock del existente se conservan).
+        Un solo `INSERT ... ON CONFLICT (sku) DO UPDATE` para todo el lote.
+        """
+        now = get_local_time()
+        rows = [
+            dict(
+                id=str(p.id),
+                name=p.name,
+                description=p.description,
+                stock=p.stock,
+                sku=p.sku,
+                retail_price=p.retail_price,
+                image_path=p.image_path,
+                tech_sheet_path=p.tech_sheet_path,
+                is_preorder=p.is_preorder,
+                preorder_price=p.preorder_price,
+                estimated_delivery_date=p.estimated_delivery_date,
+                preorder_description=p.preorder_description,
+                stripe_price_id=p.stripe_price_id,
+                updated_at=now
+            )
+            for p in products
+        ]
+        statement = insert_for(self._session, ProductModel.__table__)
+        statement = statement.on_conflict_do_update(
+            index_elements=["sku"],
+            set_={field: statement.excluded[field] for field in [*update_fields, "updated_at"]}
+        )
+        try:
+            self._session.execute(statement, rows)
+            self._session.commit()
+        except Exception:
+            self._session.rollback()
+            raise
+
     def find_all(self, skip: int = 0, limit: int = 100) -> list[Product]:
         """
         Busca todos los productos en la base de datos con paginación.
         """
-        models = self._session.query(ProductModel).offset(skip).limit(limit).all()
-        return [self._to_entity(m) for m in models]
+        statement = _PRODUCT_ROWS.select().offset(skip).limit(limit)
+        return _PRODUCT_ROWS.all(self._session, statement)
+
+    def search(self, query: str, skip: int = 0, limit: int = 100, public_only: bool = False) -> list[Product]:
+        """
+        Busca por nombre, descripción y SKU con el índice de texto del
+        dialecto: GIN sobre `to_tsvector` en PostgreSQL y FTS5 en SQLite
+        (LIKE si no está disponible). Todas las palabras deben coincidir como
+        prefijo; el orden es por relevancia y luego por nombre.
+
+        La página se elige ordenando solo (id, relevancia, nombre) de las
+        coincidencias; las columnas completas se leen para esa página.
+        """
+        terms = search_terms(query)
+        if not terms:
+            return []
+
+        ranked, rank = self._text_match(select(ProductModel.id, ProductModel.name), terms)
+        if public_only:
+            ranked = ranked.where(_PUBLIC_VISIBLE)
+        page = (
+            ranked.add_columns(rank.label("rank"))
+            .order_by(rank, ProductModel.name, ProductModel.id)
+            .offset(skip).limit(limit)
+            .subquery()
+        )
+        return self._page_products(page, (page.c.rank, page.c.name, page.c.id))
+
+    def find_public(self, catalog: CatalogQuery, skip: int = 0, limit: int = 100) -> list[Product]:
+        """
+        Página del catálogo de la tienda con los filtros y el orden de
+        `catalog`, resueltos en SQL.
+        """
+        rows = self._catalog_rows(catalog.q)
+        if rows is None:
+            return []
+        page = (
+            select(rows)
+            .where(*self._catalog_filters(rows, catalog))
+            .order_by(*self._catalog_order(rows, catalog))
+            .offset(skip).limit(limit)
+            .subquery()
+        )
+        return self._page_products(page, self._catalog_order(page, catalog))
+
+    def public_facets(self, catalog: CatalogQuery) -> dict:
+        """
+        Conteos del catálogo en una sola consulta. Cada faceta aplica todos
+        los filtros menos el propio (los conteos por disponibilidad ignoran el
+        filtro de disponibilidad y los de precio, el de precio).
+        """
+        rows = self._catalog_rows(catalog.q)
+        if rows is None:
+            return catalog_facets(0, {}, None, None, [])
+
+        all_filters = and_(true(), *self._catalog_filters(rows, catalog))
+        by_price = and_(true(), *self._catalog_filters(rows, catalog, availability=False))
+        by_availability = and_(true(), *self._catalog_filters(rows, catalog, price=False))
+        columns = [
+            func.count().filter(all_filters),
+            func.min(rows.c.price).filter(by_availability),
+            func.max(rows.c.price).filter(by_availability),
+            *(func.count().filter(and_(by_price, rows.c.availability == a)) for a in AVAILABILITIES),
+            *(
+                func.count().filter(and_(
+                    by_availability, rows.c.price >= low, *([rows.c.price < high] if high is not None else [])
+                ))
+                for low, high in price_bands()
+            ),
+        ]
+        total, min_price, max_price, *counts = self._session.execute(select(*columns).select_from(rows)).one()
+        return catalog_facets(
+            total, dict(zip(AVAILABILITIES, counts)), min_price, max_price, counts[len(AVAILABILITIES):]
+        )
+
+    def _catalog_rows(self, q: Optional[str]):
+        """
+        Productos visibles en la tienda con su disponibilidad y precio
+        mostrado (mismas reglas que `public_availability` y `display_price`)
+        y, si hay búsqueda, su relevancia. None si la búsqueda no tiene palabras.
+        """
+        now = get_local_time().replace(tzinfo=None)
+        marked = ProductModel.is_preorder.is_(True)
+        incoming = or_(marked, _HAS_PENDING_PURCHASE_ORDERS)
+        date_open = or_(ProductModel.estimated_delivery_date.is_(None), ProductModel.estimated_delivery_date > now)
+        availability = case(
+            (and_(marked, date_open), PREORDER),
+            (and_(incoming, ProductModel.stock <= 0), COMING_SOON),
+            else_=IN_STOCK,
+        )
+        visible = select(
+            ProductModel.id, ProductModel.name, ProductModel.retail_price, ProductModel.preorder_price,
+            availability.label("availability")
+        ).where(_PUBLIC_VISIBLE)
+
+        if q is not None and q.strip():
+            terms = search_terms(q)
+            if not terms:
+                return None
+            visible, rank = self._text_match(visible, terms)
+            visible = visible.add_columns(rank.label("rank"))
+        visible = visible.subquery()
+
+        price = case(
+            (and_(visible.c.availability == PREORDER, visible.c.preorder_price.isnot(None)), visible.c.preorder_price),
+            else_=visible.c.retail_price,
+        )
+        extra = [visible.c.rank] if "rank" in visible.c else []
+        return select(
+            visible.c.id, visible.c.name, visible.c.availability, price.label("price"), *extra
+        ).subquery()
+
+    @staticmethod
+    def _catalog_filters(rows, catalog: CatalogQuery, availability: bool = True, price: bool = True) -> list:
+        filters = []
+        if availability and catalog.availability:
+            filters.append(rows.c.availability.in_(catalog.availability))
+        if price and catalog.min_price is not None:
+            filters.append(rows.c.price >= catalog.min_price)
+        if price and catalog.max_price is not None:
+            filters.append(rows.c.price <= catalog.max_price)
+        return filters
+
+    @staticmethod
+    def _catalog_order(rows, catalog: CatalogQuery) -> tuple:
+        sort = catalog.effective_sort
+        if sort == SORT_PRICE_ASC:
+            return rows.c.price, rows.c.name, rows.c.id
+        if sort == SORT_PRICE_DESC:
+            return rows.c.price.desc(), rows.c.name, rows.c.id
+        if sort == SORT_RELEVANCE and "rank" in rows.c:
+            return rows.c.rank, rows.c.name, rows.c.id
+        return rows.c.name, rows.c.id
+
+    def _text_match(self, statement, terms: List[str]):
+        """
+        Filtra `statement` (que lee de products) por las palabras de la
+        búsqueda con el índice del dialecto. Retorna la consulta y la
+        expresión de relevancia (menor es más relevante).
+        """
+        dialect = self._session.get_bind().dialect.name
+        if dialect == "postgresql":
+            document = search_document(ProductModel.name, ProductModel.description, ProductModel.sku)
+            tsquery = func.to_tsquery(SEARCH_CONFIG, tsquery_text(terms))
+            return statement.where(document.op("@@")(tsquery)), -func.ts_rank(document, tsquery)
+
+        if dialect == "sqlite" and sqlite_fts_available(self._session):
+            fts = table(SQLITE_FTS_TABLE, column("rowid"))
+            statement = (
+                statement.join_from(fts, ProductModel, fts.c.rowid == literal_column("products.rowid"))
+                .where(literal_column(SQLITE_FTS_TABLE).op("MATCH")(fts5_query_text(terms)))
+            )
+            return statement, func.bm25(literal_column(SQLITE_FTS_TABLE), *SQLITE_FTS_WEIGHTS)
+
+        for term in terms:
+            pattern = "%" + term.replace("_", "\\_") + "%"
+            statement = statement.where(or_(
+                ProductModel.name.ilike(pattern, escape="\\"),
+                ProductModel.description.ilike(pattern, escape="\\"),
+                ProductModel.sku.ilike(pattern, escape="\\"),
+            ))
+        # Sin índice: primero los que empiezan con la primera palabra
+        first = terms[0].replace("_", "\\_") + "%"
+        return statement, case((ProductModel.name.ilike(first, escape="\\"), 0), else_=1)
+
+    def _page_products(self, page, order) -> list[Product]:
+        """Lee las columnas completas solo de los productos de `page` (subconsulta con `id`)."""
+        statement = _PRODUCT_ROWS.select().join_from(ProductModel, page, page.c.id == ProductModel.id).order_by(*order)
+        return _PRODUCT_ROWS.all(self._session, statement)
 
     def delete(self, product_id: UUID) -> bool:
         """
@@ -177,23 +527,7 @@ class PostgreSQLProductRepository:
         """
         Registra un movimiento en la base de datos.
         """
-        model = MovementModel(
-            id=str(movement.id),
-            product_id=str(movement.product_id),
-            quantity=movement.quantity,
-            type=movement.type,
-            reference=movement.reference,
-            document_path=movement.document_path,
-            applicant=movement.applicant,
-            applicant_area=movement.applicant_area,
-            is_returnable=movement.is_returnable,
-            return_deadline=movement.return_deadline,
-            recipient_email=movement.recipient_email,
-            sales_order_id=str(movement.sales_order_id) if movement.sales_order_id else None,
-            parent_id=str(movement.parent_id) if movement.parent_id else None,
-            product_name=movement.product_name,
-            date=movement.date
-        )
+        model = MovementModel(**movement_row(movement))
         self._session.add(model)
         self._session.commit()
         return movement
@@ -202,12 +536,39 @@ class PostgreSQLProductRepository:
         """
         Busca todos los movimientos en la base de datos con paginación.
         """
-        models = self._session.query(MovementModel)\
-            .options(joinedload(MovementModel.product))\
+        statement = _MOVEMENT_ROWS.select().select_from(MovementModel)\
+            .outerjoin(ProductModel, ProductModel.id == MovementModel.product_id)\
             .order_by(MovementModel.date.desc())\
-            .offset(skip).limit(limit)\
-            .all()
-        return [self._movement_to_entity(m) for m in models]
+            .offset(skip).limit(limit)
+        return _MOVEMENT_ROWS.all(self._session, statement)
+
+    def iter_movements(
+        self,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        movement_type: Optional[str] = None,
+        product_id: Optional[UUID] = None,
+    ) -> Iterator['Movement']:
+        """
+        Recorre los movimientos filtrados (más antiguos primero) con un cursor
+        del lado del servidor: se traen `EXPORT_BATCH_SIZE` filas a la vez.
+        """
+        statement = _MOVEMENT_ROWS.select().select_from(MovementModel)\
+            .outerjoin(ProductModel, ProductModel.id == MovementModel.product_id)\
+            .order_by(MovementModel.date.asc(), MovementModel.id.asc())
+        if start_date:
+            statement = statement.where(MovementModel.date >= start_date)
+        if end_date:
+            statement = statement.where(MovementModel.date <= end_date)
+        if movement_type:
+            statement = statement.where(MovementModel.type == movement_type)
+        if product_id:
+            statement = statement.where(MovementModel.product_id == str(product_id))
+
+        # yield_per activa stream_results (cursor con nombre en psycopg2)
+        rows = self._session.execute(statement, execution_options={"yield_per": EXPORT_BATCH_SIZE})
+        for row in rows:
+            yield _MOVEMENT_ROWS.map(row)
 
     def find_initial_movement(self, product_id: UUID) -> Optional['Movement']:
         """
@@ -235,3 +596,13 @@ class PostgreSQLProductRepository:
             model.document_path = movement.document_path
             self._session.commit()
         return movement
+
+    def exists_movement_for_purchase_order(self, purchase_order_id: UUID) -> bool:
+        """
+        Verifica por índice si la OC ya tiene su movimiento de entrada.
+        """
+        return self._session.query(
+            self._session.query(MovementModel.id)
+            .filter(MovementModel.purchase_order_id == str(purchase_order_id))
+            .exists()
+        ).scalar()
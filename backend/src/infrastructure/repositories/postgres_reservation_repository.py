@@ -0,0 +1,118 @@
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, List, Tuple
+from uuid import UUID
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from src.domain.entities import get_local_time
+from src.domain.exceptions import InsufficientStockError, ProductNotFoundError
+from src.domain.reservation_entities import (
+    RESERVATION_ACTIVE,
+    RESERVATION_CONVERTED,
+    RESERVATION_EXPIRED,
+    RESERVATION_RELEASED,
+    StockReservation,
+)
+from src.ports.reservation_repository import ReservationRepository
+from src.infrastructure.database.models import ProductModel, StockReservationModel
+
+
+class PostgresReservationRepository(ReservationRepository):
+    def __init__(self, session: Session):
+        self.session = session
+
+    def hold(
+        self,
+        reservation_id: UUID,
+        items: List[Tuple[UUID, int]],
+        expires_at: datetime,
+    ) -> List[StockReservation]:
+        requested: Dict[str, int] = defaultdict(int)
+        for product_id, quantity in items:
+            requested[str(product_id)] += quantity
+        if not requested:
+            return []
+
+        now = get_local_time()
+        try:
+            # FOR UPDATE sobre los productos (en orden fijo para evitar deadlocks):
+            # los checkouts concurrentes del mismo producto se serializan aquí
+            stocks = dict(self.session.query(ProductModel.id, ProductModel.stock).filter(
+                ProductModel.id.in_(requested)
+            ).order_by(ProductModel.id).with_for_update().all())
+            reserved = self._reserved(list(requested), now)
+
+            for product_id, quantity in requested.items():
+                if product_id not in stocks:
+                    raise ProductNotFoundError(product_id)
+                available = (stocks[product_id] or 0) - reserved.get(product_id, 0)
+                if available < quantity:
+                    raise InsufficientStockError(available=max(available, 0), requested=quantity)
+
+            reservations = [
+                StockReservation(
+                    reservation_id=reservation_id,
+                    product_id=UUID(product_id),
+                    quantity=quantity,
+                    expires_at=expires_at,
+                    created_at=now
+                )
+                for product_id, quantity in requested.items()
+            ]
+            self.session.add_all([
+                StockReservationModel(
+                    id=str(r.id),
+                    reservation_id=str(r.reservation_id),
+                    product_id=str(r.product_id),
+                    quantity=r.quantity,
+                    status=r.status,
+                    expires_at=r.expires_at,
+                    created_at=r.created_at
+                )
+                for r in reservations
+            ])
+            self.session.commit()
+        except Exception:
+            self.session.rollback()
+            raise
+        return reservations
+
+    def convert(self, reservation_id: UUID) -> int:
+        return self._set_status(reservation_id, RESERVATION_CONVERTED)
+
+    def release(self, reservation_id: UUID) -> int:
+        return self._set_status(reservation_id, RESERVATION_RELEASED)
+
+    def expire(self, now: datetime) -> int:
+        count = self.session.query(StockReservationModel).filter(
+            StockReservationModel.status == RESERVATION_ACTIVE,
+            StockReservationModel.expires_at <= now
+        ).update({StockReservationModel.status: RESERVATION_EXPIRED}, synchronize_session=False)
+        self.session.commit()
+        return count
+
+    def reserved_quantities(self, product_ids: List[UUID]) -> Dict[UUID, int]:
+        if not product_ids:
+            return {}
+        reserved = self._reserved([str(p) for p in product_ids], get_local_time())
+        return {UUID(product_id): quantity for product_id, quantity in reserved.items()}
+
+    def _reserved(self, product_ids: List[str], now: datetime) -> Dict[str, int]:
+        rows = self.session.query(
+            StockReservationModel.product_id, func.sum(StockReservationModel.quantity)
+        ).filter(
+            StockReservationModel.product_id.in_(product_ids),
+            StockReservationModel.status == RESERVATION_ACTIVE,
+            StockReservationModel.expires_at > now
+        ).group_by(StockReservationModel.product_id).all()
+        return {product_id: int(quantity) for product_id, quantity in rows}
+
+    def _set_status(self, reservation_id: UUID, status: str) -> int:
+        count = self.session.query(StockReservationModel).filter(
+            StockReservationModel.reservation_id == str(reservation_id),
+            StockReservationModel.status == RESERVATION_ACTIVE
+        ).update({StockReservationModel.status: status}, synchronize_session=False)
+        self.session.commit()
+        return count
@@ -1,35 +1,107 @@
-from typing import List, Optional
+import copy
+import os
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
 from uuid import UUID
-from sqlalchemy.orm import Session
+from sqlalchemy import case, func, insert, update
+from sqlalchemy.orm import Session, joinedload
+from src.domain.entities import Movement, get_local_time
 from src.domain.sales_entities import SalesOrder
 from src.ports.sales_repository import SalesRepository
-from src.infrastructure.database.models import SalesOrderModel, ProductModel
+from src.infrastructure.database.models import MovementModel, SalesOrderModel, ProductModel
+from src.infrastructure.repositories.pagination import paginate_desc
+from src.infrastructure.repositories.postgres_repository import movement_row
+
+TOP_SELLING_LIMIT = 5
+# Tope de antigüedad del caché: otras instancias no ven las invalidaciones locales
+SALES_KPIS_CACHE_TTL_SECONDS = float(os.getenv("SALES_KPIS_CACHE_TTL_SECONDS", "60"))
+
+
+class _KPICache:
+    """
+    Caché en proceso de los KPIs de ventas, por ventana de días.
+
+    Cada escritura de ventas incrementa `version`; un resultado calculado con
+    una versión anterior no se guarda, para no cachear datos ya invalidados.
+    """
+
+    def __init__(self, ttl_seconds: float):
+        self.ttl_seconds = ttl_seconds
+        self.version = 0
+        self._entries: Dict[Optional[int], Tuple[float, dict]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: Optional[int]) -> Optional[dict]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or time.monotonic() - entry[0] > self.ttl_seconds:
+                return None
+            return copy.deepcopy(entry[1])
+
+    def set(self, key: Optional[int], value: dict, version: int) -> None:
+        with self._lock:
+            if version == self.version:
+                self._entries[key] = (time.monotonic(), copy.deepcopy(value))
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self.version += 1
+            self._entries.clear()
+
+
+_kpis_cache = _KPICache(SALES_KPIS_CACHE_TTL_SECONDS)
+
 
 class PostgresSalesRepository(SalesRepository):
     def __init__(self, session: Session):
         self.session = session
 
     def save(self, sales_order: SalesOrder) -> None:
-        model = SalesOrderModel(
-            id=str(sales_order.id),
-            customer_name=sales_order.customer_name,
-            customer_email=sales_order.customer_email,
-            product_id=str(sales_order.product_id),
-            quantity=sales_order.quantity,
-            unit_price=sales_order.unit_price,
-            subtotal=sales_order.subtotal,
-            tax_amount=sales_order.tax_amount,
-            total_amount=sales_order.total_amount,
-            shipping_cost=sales_order.shipping_cost,
-            shipping_type=sales_order.shipping_type,
-            shipping_address=sales_order.shipping_address,
-            delivery_date=sales_order.delivery_date,
-            status=sales_order.status,
-            stripe_session_id=sales_order.stripe_session_id,
-            created_at=sales_order.created_at
-        )
-        self.session.add(model)
+        self.session.add(SalesOrderModel(**self._order_row(sales_order)))
         self.session.commit()
+        _kpis_cache.invalidate()
+
+    def save_with_movements(self, orders: List[SalesOrder], movements: List[Movement]) -> List[Movement]:
+        """
+        Inserta las órdenes, descuenta el stock y registra los movimientos en
+        una sola transacción: un INSERT de órdenes, un UPDATE de stock y un
+        INSERT de movimientos, sin importar cuántas líneas tenga el pedido.
+
+        El UPDATE solo descuenta los productos que aún tienen stock para todas
+        sus líneas; los movimientos del resto se descartan y sus órdenes se
+        guardan igual (el pago ya fue cobrado).
+
+        Returns:
+            Los movimientos registrados
+        """
+        totals = defaultdict(int)
+        for movement in movements:
+            totals[str(movement.product_id)] += movement.quantity
+        try:
+            if orders:
+                self.session.execute(insert(SalesOrderModel), [self._order_row(o) for o in orders])
+            deducted = set()
+            if totals:
+                requested = case(totals, value=ProductModel.id, else_=0)
+                deducted = set(self.session.execute(
+                    update(ProductModel)
+                    .where(ProductModel.id.in_(list(totals)), ProductModel.stock >= requested)
+                    .values(stock=ProductModel.stock - requested, updated_at=get_local_time())
+                    .returning(ProductModel.id)
+                    .execution_options(synchronize_session=False)
+                ).scalars())
+            recorded = [m for m in movements if str(m.product_id) in deducted]
+            if recorded:
+                self.session.execute(insert(MovementModel), [movement_row(m) for m in recorded])
+            self.session.commit()
+        except Exception:
+            self.session.rollback()
+            raise
+        _kpis_cache.invalidate()
+        return recorded
 
     def find_by_id(self, order_id: UUID) -> Optional[SalesOrder]:
         model = self.session.query(SalesOrderModel).filter(SalesOrderModel.id == str(order_id)).first()
@@ -41,17 +113,41 @@ class PostgresSalesRepository(SalesRepository):
         models = self.session.query(SalesOrderModel).all()
         return [self._to_entity(m) for m in models]
 
-    def find_by_email(self, email: str) -> List[SalesOrder]:
-        models = self.session.query(SalesOrderModel).filter(
-            SalesOrderModel.customer_email == email
-        ).order_by(SalesOrderModel.created_at.desc()).all()
-        return [self._to_entity(m) for m in models]
+    def find_page(
+        self,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        status: Optional[str] = None,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        customer_email: Optional[str] = None,
+        product_id: Optional[UUID] = None,
+    ) -> Tuple[List[SalesOrder], Optional[str]]:
+        # Nombre e imagen del producto en el mismo SELECT (sin lazy-load por fila)
+        query = self.session.query(SalesOrderModel).options(
+            joinedload(SalesOrderModel.product).load_only(ProductModel.name, ProductModel.image_path)
+        )
+        if status:
+            query = query.filter(SalesOrderModel.status == status)
+        if start_date:
+            query = query.filter(SalesOrderModel.created_at >= start_date)
+        if end_date:
+            query = query.filter(SalesOrderModel.created_at <= end_date)
+        if customer_email:
+            query = query.filter(SalesOrderModel.customer_email == customer_email)
+        if product_id:
+            query = query.filter(SalesOrderModel.product_id == str(product_id))
+
+        return paginate_desc(
+            query, SalesOrderModel.created_at, SalesOrderModel.id, limit, cursor, self._to_entity
+        )
 
     def update_status(self, order_id: UUID, status: str) -> None:
         model = self.session.query(SalesOrderModel).filter(SalesOrderModel.id == str(order_id)).first()
         if model:
             model.status = status
             self.session.commit()
+            _kpis_cache.invalidate()
 
     def update(self, sales_order: SalesOrder) -> None:
         model = self.session.query(SalesOrderModel).filter(SalesOrderModel.id == str(sales_order.id)).first()
@@ -76,12 +172,14 @@ class PostgresSalesRepository(SalesRepository):
             # model.status = sales_order.status 
             
             self.session.commit()
+            _kpis_cache.invalidate()
 
     def delete(self, order_id: UUID) -> None:
         model = self.session.query(SalesOrderModel).filter(SalesOrderModel.id == str(order_id)).first()
         if model:
             self.session.delete(model)
             self.session.commit()
+            _kpis_cache.invalidate()
 
     def find_by_stripe_session_id(self, session_id: str) -> List[SalesOrder]:
         models = self.session.query(SalesOrderModel).filter(
@@ -89,32 +187,72 @@ class PostgresSalesRepository(SalesRepository):
         ).all()
         return [self._to_entity(m) for m in models]
 
-    def get_kpis(self) -> dict:
-        orders = self.session.query(SalesOrderModel).all()
-        total_revenue = sum(o.total_amount for o in orders)
-        pending_deliveries = sum(1 for o in orders if o.status == "PENDING")
-        
-        # Simple top selling products (by revenue)
-        product_revenue = {}
-        for o in orders:
-            p_id = o.product_id
-            product_revenue[p_id] = product_revenue.get(p_id, 0) + o.total_amount
-            
-        top_selling = []
-        for p_id, revenue in sorted(product_revenue.items(), key=lambda item: item[1], reverse=True)[:5]:
-            product = self.session.query(ProductModel).filter(ProductModel.id == p_id).first()
-            top_selling.append({
-                "product_name": product.name if product else "Unknown",
-                "revenue": float(revenue)
-            })
-            
+    def get_kpis(self, window_days: Optional[int] = None) -> dict:
+        since = get_local_time() - timedelta(days=window_days) if window_days else None
+
+        totals = self.session.query(
+            func.count(SalesOrderModel.id),
+            func.coalesce(func.sum(SalesOrderModel.total_amount), 0),
+            func.coalesce(func.sum(case((SalesOrderModel.status == "PENDING", 1), else_=0)), 0),
+        )
+        # Top productos por ingresos, con el nombre resuelto en el mismo JOIN
+        revenue = func.sum(SalesOrderModel.total_amount).label("revenue")
+        top = self.session.query(
+            SalesOrderModel.product_id,
+            ProductModel.name,
+            revenue
+        ).outerjoin(
+            ProductModel, ProductModel.id == SalesOrderModel.product_id
+        )
+
+        if since:
+            totals = totals.filter(SalesOrderModel.created_at >= since)
+            top = top.filter(SalesOrderModel.created_at >= since)
+        top = top.group_by(
+            SalesOrderModel.product_id, ProductModel.name
+        ).order_by(revenue.desc()).limit(TOP_SELLING_LIMIT)
+
+        count, total_revenue, pending = totals.one()
         return {
-            "total_sales_count": len(orders),
+            "total_sales_count": count,
             "total_revenue": float(total_revenue),
-            "pending_deliveries": pending_deliveries,
-            "top_selling_products": top_selling
+            "pending_deliveries": int(pending),
+            "top_selling_products": [
+                {"product_name": name or "Unknown", "revenue": float(product_revenue)}
+                for _, name, product_revenue in top.all()
+            ]
         }
 
+    def get_cached_kpis(self, window_days: Optional[int] = None) -> dict:
+        cached = _kpis_cache.get(window_days)
+        if cached is not None:
+            return cached
+        version = _kpis_cache.version
+        kpis = self.get_kpis(window_days)
+        _kpis_cache.set(window_days, kpis, version)
+        return kpis
+
+    @staticmethod
+    def _order_row(sales_order: SalesOrder) -> dict:
+        return dict(
+            id=str(sales_order.id),
+            customer_name=sales_order.customer_name,
+            customer_email=sales_order.customer_email,
+            product_id=str(sales_order.product_id),
+            quantity=sales_order.quantity,
+            unit_price=sales_order.unit_price,
+            subtotal=sales_order.subtotal,
+            tax_amount=sales_order.tax_amount,
+            total_amount=sales_order.total_amount,
+            shipping_cost=sales_order.shipping_cost,
+            shipping_type=sales_order.shipping_type,
+            shipping_address=sales_order.shipping_address,
+            delivery_date=sales_order.delivery_date,
+            status=sales_order.status,
+            stripe_session_id=sales_order.stripe_session_id,
+            created_at=sales_order.created_at
+        )
+
     def _to_entity(self, m: SalesOrderModel) -> SalesOrder:
         return SalesOrder(
             id=UUID(str(m.id)),
@@ -0,0 +1,51 @@
+"""
+Mapeo directo de filas (`Row`) a entidades de dominio.
+
+Para listados de solo lectura: en lugar de cargar modelos ORM (hidratación,
+identity map, relaciones) y copiarlos campo a campo a la entidad, se
+proyectan solo las columnas necesarias y cada fila se convierte en la
+entidad en una sola llamada.
+"""
+from typing import Callable, Dict, Generic, Iterable, List, Type, TypeVar
+from uuid import UUID
+
+from sqlalchemy import Select, select
+from sqlalchemy.orm import Session
+
+T = TypeVar("T")
+
+
+def _uuid_or_none(value):
+    return UUID(value) if value is not None else None
+
+
+class RowMapper(Generic[T]):
+    """
+    Proyección de columnas -> entidad.
+
+    `columns` asocia cada campo de la entidad con una expresión SQL; los campos
+    de `uuid_fields` se guardan como texto en la BD y se convierten a UUID.
+    Los campos que no se proyectan toman su valor por defecto.
+    """
+
+    def __init__(self, entity_cls: Type[T], columns: Dict[str, object], uuid_fields: Iterable[str] = ()):
+        self.entity_cls = entity_cls
+        self.fields = tuple(columns)
+        self.columns = [expr.label(name) for name, expr in columns.items()]
+        uuid_fields = set(uuid_fields)
+        self._converters: List[Callable] = [
+            _uuid_or_none if name in uuid_fields else None for name in self.fields
+        ]
+
+    def select(self) -> Select:
+        return select(*self.columns)
+
+    def map(self, row) -> T:
+        values = {
+            name: convert(value) if convert else value
+            for name, convert, value in zip(self.fields, self._converters, row)
+        }
+        return self.entity_cls(**values)
+
+    def all(self, session: Session, statement: Select) -> List[T]:
+        return [self.map(row) for row in session.execute(statement)]
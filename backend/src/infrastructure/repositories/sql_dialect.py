@@ -0,0 +1,40 @@
+"""
+Construcciones SQL que dependen del dialecto.
+
+Producción usa PostgreSQL y desarrollo/tests SQLite. Ambos soportan
+`INSERT ... ON CONFLICT` (SQLAlchemy lo expone en el `insert` de cada
+dialecto), pero la agregación de cadenas difiere: `array_agg` frente a
+`group_concat`.
+"""
+from typing import List
+
+from sqlalchemy import func
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+
+def insert_for(session: Session, table):
+    """`INSERT` del dialecto de la sesión (con `on_conflict_do_nothing/do_update`)."""
+    if session.get_bind().dialect.name == "postgresql":
+        return postgresql.insert(table)
+    return sqlite.insert(table)
+
+
+# Separador de group_concat en SQLite (no aparece en IDs ni nombres)
+_AGG_SEPARATOR = "\x1f"
+
+
+def aggregate_strings(session: Session, column):
+    """Agrega los valores de `column` por grupo: `array_agg` en PostgreSQL, `group_concat` en SQLite."""
+    if session.get_bind().dialect.name == "postgresql":
+        return func.array_agg(column)
+    return func.group_concat(column, _AGG_SEPARATOR)
+
+
+def split_aggregate(value) -> List[str]:
+    """Convierte el resultado de `aggregate_strings` en lista."""
+    if value is None:
+        return []
+    if isinstance(value, list):
+        return value
+    return value.split(_AGG_SEPARATOR)
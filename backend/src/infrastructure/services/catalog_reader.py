@@ -0,0 +1,74 @@
+"""
+Lectura en streaming de catálogos de productos (CSV o XLSX).
+
+Las filas se leen de una en una desde el archivo en disco, así que la memoria
+no depende del tamaño del catálogo.
+"""
+import csv
+import io
+from pathlib import Path
+from typing import BinaryIO, Dict, Iterator, Tuple
+
+CATALOG_FORMATS = (".csv", ".xlsx")
+
+
+def catalog_format(filename: str) -> str:
+    """
+    Retorna la extensión del catálogo.
+
+    Raises:
+        ValueError: Si el formato no es CSV ni XLSX
+    """
+    suffix = Path(filename or "").suffix.lower()
+    if suffix not in CATALOG_FORMATS:
+        raise ValueError("Formato no soportado: use un archivo .csv o .xlsx")
+    return suffix
+
+
+def _clean(header: list, values) -> Dict[str, object]:
+    # Todas las columnas de la cabecera, con None en las celdas vacías
+    row = {}
+    for key, value in zip(header, values):
+        if not key:
+            continue
+        if isinstance(value, str):
+            value = value.strip()
+        row[key] = None if value == "" else value
+    return row
+
+
+def _iter_csv(file: BinaryIO) -> Iterator[Tuple[int, Dict[str, object]]]:
+    text = io.TextIOWrapper(file, encoding="utf-8-sig", newline="")
+    reader = csv.reader(text)
+    header = [h.strip() for h in next(reader, [])]
+    for values in reader:
+        if any(values):
+            yield reader.line_num, _clean(header, values)
+
+
+def _iter_xlsx(file: BinaryIO) -> Iterator[Tuple[int, Dict[str, object]]]:
+    try:
+        from openpyxl import load_workbook
+    except ImportError:
+        raise ValueError("La importación XLSX requiere openpyxl")
+
+    # read_only: la hoja se recorre en streaming sin cargarla completa
+    workbook = load_workbook(file, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = [str(h).strip() if h is not None else None for h in next(rows, ())]
+        for row_number, values in enumerate(rows, start=2):
+            if any(v not in (None, "") for v in values):
+                yield row_number, _clean(header, values)
+    finally:
+        workbook.close()
+
+
+def iter_catalog_rows(file: BinaryIO, filename: str) -> Iterator[Tuple[int, Dict[str, object]]]:
+    """
+    Recorre las filas del catálogo como (número de fila, {columna: valor}).
+    La primera fila es la cabecera con los nombres de los campos.
+    """
+    if catalog_format(filename) == ".xlsx":
+        return _iter_xlsx(file)
+    return _iter_csv(file)
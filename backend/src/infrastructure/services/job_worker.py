@@ -0,0 +1,109 @@
+"""
+Worker de la cola persistente de trabajos.
+
+Procesa los recibos de movimientos (acta PDF + correo) fuera del proceso de la
+API: toma lotes de la tabla `jobs`, renderiza los PDFs del lote en el process
+pool compartido y envía los correos con concurrencia limitada. Los fallos se
+reintentan con backoff hasta agotar `max_attempts`.
+"""
+import asyncio
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional, Tuple
+
+from src.domain.job_entities import MOVEMENT_RECEIPT_JOB
+from src.infrastructure.database.config import SessionLocal
+from src.infrastructure.repositories.postgres_job_queue import PostgresJobQueue
+from src.infrastructure.services.pdf_service import render_movement_receipt
+from src.infrastructure.services.render_pool import bounded_map
+
+logger = logging.getLogger(__name__)
+
+JOB_BATCH_SIZE = int(os.getenv("JOB_BATCH_SIZE", "20"))
+RECEIPT_EMAIL_CONCURRENCY = int(os.getenv("RECEIPT_EMAIL_CONCURRENCY", "4"))
+JOB_POLL_INTERVAL = float(os.getenv("JOB_POLL_INTERVAL", "2"))
+
+
+def render_receipt_job(payload: dict) -> Tuple[Optional[bytes], Optional[str]]:
+    """
+    Renderiza el PDF de un trabajo de recibo dentro del process pool.
+    Retorna (pdf, None) o (None, error) para que un fallo no aborte el lote.
+    """
+    try:
+        return render_movement_receipt(payload["movement_data"]), None
+    except Exception as e:
+        return None, f"{type(e).__name__}: {e}"
+
+
+class ReceiptJobWorker:
+    def __init__(
+        self,
+        session_factory: Callable = SessionLocal,
+        email_service=None,
+        batch_size: int = JOB_BATCH_SIZE,
+        email_concurrency: int = RECEIPT_EMAIL_CONCURRENCY,
+    ):
+        if email_service is None:
+            from src.infrastructure.security.email_service import SMTPEmailService
+            email_service = SMTPEmailService()
+        self.session_factory = session_factory
+        self.email_service = email_service
+        self.batch_size = batch_size
+        self._email_pool = ThreadPoolExecutor(
+            max_workers=max(1, email_concurrency), thread_name_prefix="receipt-email"
+        )
+
+    def _send(self, email: str, movement_data: dict, pdf_content: bytes) -> None:
+        # SMTPEmailService es async pero bloqueante por dentro; cada hilo corre su propio loop
+        asyncio.run(self.email_service.send_receipt_email(email, movement_data, pdf_content))
+
+    def run_once(self) -> int:
+        """Procesa un lote de trabajos. Retorna cuántos trabajos se tomaron."""
+        session = self.session_factory()
+        try:
+            queue = PostgresJobQueue(session)
+            jobs = queue.claim(MOVEMENT_RECEIPT_JOB, self.batch_size)
+            if not jobs:
+                return 0
+
+            rendered = bounded_map(render_receipt_job, [job.payload for job in jobs])
+            sends = []
+            for job, (pdf_content, error) in zip(jobs, rendered):
+                if error:
+                    logger.error(f"Job {job.id}: PDF rendering failed: {error}")
+                    queue.fail(job.id, error)
+                    continue
+                future = self._email_pool.submit(
+                    self._send, job.payload["email"], job.payload["movement_data"], pdf_content
+                )
+                sends.append((job, future))
+
+            for job, future in sends:
+                try:
+                    future.result()
+                    queue.complete(job.id)
+                except Exception as e:
+                    logger.error(f"Job {job.id}: email delivery failed (attempt {job.attempts}): {e}")
+                    queue.fail(job.id, f"{type(e).__name__}: {e}")
+
+            logger.info(f"Processed {len(jobs)} receipt jobs")
+            return len(jobs)
+        finally:
+            session.close()
+
+    def run_forever(self, poll_interval: float = JOB_POLL_INTERVAL, stop_event: Optional[threading.Event] = None) -> None:
+        stop_event = stop_event or threading.Event()
+        logger.info("Receipt job worker started")
+        while not stop_event.is_set():
+            try:
+                processed = self.run_once()
+            except Exception as e:
+                logger.error(f"Error in job worker loop: {e}", exc_info=True)
+                processed = 0
+            # Si el lote vino lleno probablemente hay más trabajo: no esperar
+            if processed < self.batch_size:
+                stop_event.wait(poll_interval)
+        self._email_pool.shutdown(wait=True)
+        logger.info("Receipt job worker stopped")
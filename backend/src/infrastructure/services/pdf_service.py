@@ -2,71 +2,125 @@ from reportlab.lib.pagesizes import letter
 from reportlab.pdfgen import canvas
 from reportlab.lib import colors
 from reportlab.lib.units import inch
+from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
+from reportlab.lib.styles import getSampleStyleSheet
+from reportlab import rl_config
+from reportlab.pdfbase.pdfdoc import (
+    PDFArray, PDFBase85Encode, PDFDictionary, PDFFormXObject, PDFName, PDFStream, PDFZCompress, pdfdocEnc
+)
 import io
 import os
+import threading
 from datetime import datetime
+from typing import Optional
+
+
+def purchase_order_pdf_filename(order) -> str:
+    """Nombre de archivo estándar para el PDF de una orden de compra."""
+    return f"OC-{str(order.id)[:8]}.pdf"
+
+
+def render_purchase_order_pdf(order) -> bytes:
+    """
+    Renderiza una OC a bytes.
+    Es una función top-level para poder enviarse a un ProcessPoolExecutor.
+    """
+    return PDFService().generate_purchase_order_pdf(order)
+
+
+def render_movement_receipt(movement_data: dict) -> bytes:
+    """Renderiza el acta de un movimiento (top-level, apta para el process pool)."""
+    return PDFService().generate_movement_receipt(movement_data)
+
 
 class PDFService:
-    def generate_movement_receipt(self, movement_data: dict) -> bytes:
+    def generate_purchase_order_pdf(self, order) -> bytes:
+        """
+        Genera el PDF de una orden de compra y lo retorna como bytes.
+        """
+        buffer = io.BytesIO()
+        doc = SimpleDocTemplate(buffer, pagesize=letter)
+        elements = []
+        styles = getSampleStyleSheet()
+
+        # Header
+        elements.append(Paragraph(f"ORDEN DE COMPRA: #{str(order.id)[:8].upper()}", styles['Title']))
+        elements.append(Paragraph(f"Fecha: {order.created_at.strftime('%Y-%m-%d')}", styles['Normal']))
+        elements.append(Spacer(1, 12))
+
+        # Supplier Info
+        elements.append(Paragraph(f"PROVEEDOR: {order.supplier_name}", styles['Heading2']))
+        elements.append(Paragraph(f"RUC: (Consultar Sistema)", styles['Normal'])) # In a real scenario fetch supplier details
+        elements.append(Spacer(1, 12))
+
+        # Order Details Table
+        data = [
+            ["Producto", "Cantidad", "Unidad", "Precio Unit.", "Subtotal"],
+            [order.product_name, str(order.quantity), "UND", f"{order.currency} {order.unit_price}", f"{order.currency} {order.quantity * order.unit_price}"],
+            ["", "", "", "IGV (18%)", f"{order.currency} {order.tax_amount}"],
+            ["", "", "", "Transporte/Flete", f"{order.currency} {order.freight_amount}"],
+            ["", "", "", f"Otros: {order.other_expenses_description or 'N/A'}", f"{order.currency} {order.other_expenses_amount}"],
+            ["", "", "", "Descuentos", f"-{order.currency} {order.savings_amount}"],
+            ["", "", "", "TOTAL", f"{order.currency} {order.total_amount}"]
+        ]
+
+        t = Table(data)
+        t.setStyle(TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+            ('GRID', (0, 0), (-1, -1), 1, colors.black),
+        ]))
+        elements.append(t)
+        elements.append(Spacer(1, 48))
+
+        # Signatures
+        elements.append(Paragraph("_" * 40, styles['Normal']))
+        elements.append(Paragraph("Jefe de Comercio - GUSMI", styles['Normal']))
+
+        doc.build(elements)
+        pdf_bytes = buffer.getvalue()
+        buffer.close()
+        return pdf_bytes
+
+    def generate_movement_receipt(self, movement_data: dict, use_template: bool = True) -> bytes:
         """
         Genera un buffer de bytes con el PDF del acta de movimiento.
+
+        Con `use_template` el mobiliario estático (título, cabecera de la tabla,
+        etiquetas y firmas) se estampa desde una plantilla cacheada y solo se
+        dibujan los campos variables; sin ella se redibuja todo en cada llamada.
         """
         buffer = io.BytesIO()
         p = canvas.Canvas(buffer, pagesize=letter)
         width, height = letter
 
-        # Título
-        p.setFont("Helvetica-Bold", 18)
-        p.drawCentredString(width / 2, height - (1 * inch), "ACTA DE RECEPCIÓN / DESPACHO")
-        
-        p.setFont("Helvetica", 10)
-        p.drawCentredString(width / 2, height - (1.3 * inch), f"Fecha de Emisión: {datetime.now().strftime('%d-%m-%Y, %I:%M:%S %p')}")
+        if use_template:
+            _receipt_template.stamp(p)
+        else:
+            _draw_receipt_static(p)
 
-        p.line(0.75 * inch, height - (1.5 * inch), width - (0.75 * inch), height - (1.5 * inch))
-
-        # Tabla de Información
-        y = height - (2.2 * inch)
-        
-        # Header de la tabla
-        p.setFillColor(colors.dodgerblue)
-        p.rect(0.75 * inch, y - 0.1 * inch, width - 1.5 * inch, 0.3 * inch, fill=1)
-        p.setFillColor(colors.white)
-        p.setFont("Helvetica-Bold", 11)
-        p.drawString(0.85 * inch, y, "Campo")
-        p.drawString(3.0 * inch, y, "Detalle")
-        
-        y -= 0.3 * inch
+        # Campos variables
         p.setFillColor(colors.black)
         p.setFont("Helvetica", 10)
-        
-        details = [
-            ("Tipo de Movimiento:", "VENTA (SALIDA)" if movement_data.get("is_sale") else ("SALIDA (DEVOLUTIVO)" if movement_data.get("is_returnable") else "SALIDA")),
-            ("Referencia / Guía:", movement_data.get("reference", "N/A")),
-            ("Producto:", movement_data.get("product_name", "N/A")),
-            ("Cantidad:", f"{movement_data.get('quantity', 0)} unidades"),
-            ("Cliente / Receptor:", movement_data.get("applicant", "N/A")),
-            ("Fecha Entrega/Retorno:", movement_data.get("return_deadline", "N/A")),
-            ("Email Cliente:", movement_data.get("recipient_email", "N/A"))
-        ]
+        p.drawCentredString(width / 2, height - (1.3 * inch), f"Fecha de Emisión: {datetime.now().strftime('%d-%m-%Y, %I:%M:%S %p')}")
 
-        for i, (label, value) in enumerate(details):
-            # Fondo alterno
-            if i % 2 == 0:
-                p.setFillColor(colors.whitesmoke)
-                p.rect(0.75 * inch, y - 0.1 * inch, width - 1.5 * inch, 0.25 * inch, fill=1)
-            
-            p.setFillColor(colors.black)
-            p.drawString(0.85 * inch, y, label)
+        values = [
+            "VENTA (SALIDA)" if movement_data.get("is_sale") else ("SALIDA (DEVOLUTIVO)" if movement_data.get("is_returnable") else "SALIDA"),
+            movement_data.get("reference", "N/A"),
+            movement_data.get("product_name", "N/A"),
+            f"{movement_data.get('quantity', 0)} unidades",
+            movement_data.get("applicant", "N/A"),
+            movement_data.get("return_deadline", "N/A"),
+            movement_data.get("recipient_email", "N/A")
+        ]
+        y = _RECEIPT_FIRST_ROW_Y
+        for value in values:
             p.drawString(3.0 * inch, y, str(value))
-            y -= 0.25 * inch
-
-        # Firmas
-        y -= 1.5 * inch
-        p.line(1 * inch, y, 3.5 * inch, y)
-        p.drawCentredString(2.25 * inch, y - 0.2 * inch, "Firma Jefe de Almacén")
-
-        p.line(width - 3.5 * inch, y, width - 1 * inch, y)
-        p.drawCentredString(width - 2.25 * inch, y - 0.2 * inch, "Firma Receptor")
+            y -= _RECEIPT_ROW_HEIGHT
 
         p.showPage()
         p.save()
@@ -74,3 +128,115 @@ class PDFService:
         pdf_bytes = buffer.getvalue()
         buffer.close()
         return pdf_bytes
+
+
+_RECEIPT_LABELS = (
+    "Tipo de Movimiento:",
+    "Referencia / Guía:",
+    "Producto:",
+    "Cantidad:",
+    "Cliente / Receptor:",
+    "Fecha Entrega/Retorno:",
+    "Email Cliente:",
+)
+_RECEIPT_FIRST_ROW_Y = letter[1] - (2.5 * inch)
+_RECEIPT_ROW_HEIGHT = 0.25 * inch
+# Orden fijo de registro: los nombres internos (/F1, /F2) de la plantilla
+# deben coincidir con los del documento donde se estampa
+_RECEIPT_FONTS = ("Helvetica", "Helvetica-Bold")
+
+
+def _draw_receipt_static(p: canvas.Canvas) -> None:
+    """Dibuja la parte del acta que no depende del movimiento."""
+    width, height = letter
+
+    # Título
+    p.setFont("Helvetica-Bold", 18)
+    p.drawCentredString(width / 2, height - (1 * inch), "ACTA DE RECEPCIÓN / DESPACHO")
+
+    p.line(0.75 * inch, height - (1.5 * inch), width - (0.75 * inch), height - (1.5 * inch))
+
+    # Header de la tabla
+    y = height - (2.2 * inch)
+    p.setFillColor(colors.dodgerblue)
+    p.rect(0.75 * inch, y - 0.1 * inch, width - 1.5 * inch, 0.3 * inch, fill=1)
+    p.setFillColor(colors.white)
+    p.setFont("Helvetica-Bold", 11)
+    p.drawString(0.85 * inch, y, "Campo")
+    p.drawString(3.0 * inch, y, "Detalle")
+
+    y = _RECEIPT_FIRST_ROW_Y
+    p.setFont("Helvetica", 10)
+    for i, label in enumerate(_RECEIPT_LABELS):
+        # Fondo alterno
+        if i % 2 == 0:
+            p.setFillColor(colors.whitesmoke)
+            p.rect(0.75 * inch, y - 0.1 * inch, width - 1.5 * inch, 0.25 * inch, fill=1)
+
+        p.setFillColor(colors.black)
+        p.drawString(0.85 * inch, y, label)
+        y -= _RECEIPT_ROW_HEIGHT
+
+    # Firmas
+    y -= 1.5 * inch
+    p.line(1 * inch, y, 3.5 * inch, y)
+    p.drawCentredString(2.25 * inch, y - 0.2 * inch, "Firma Jefe de Almacén")
+
+    p.line(width - 3.5 * inch, y, width - 1 * inch, y)
+    p.drawCentredString(width - 2.25 * inch, y - 0.2 * inch, "Firma Receptor")
+
+
+class _ReceiptTemplate:
+    """
+    Plantilla del acta pre-renderizada una vez por proceso.
+
+    El mobiliario estático se dibuja en la primera llamada y se guarda como el
+    stream ya comprimido de un form XObject; cada acta solo registra ese form
+    y lo referencia con `doForm`, sin recalcular geometría, colores ni anchos
+    de texto y sin volver a comprimir el contenido.
+    """
+    FORM_NAME = "receipt_static"
+
+    def __init__(self) -> None:
+        self._filters: Optional[PDFArray] = None
+        self._content: Optional[bytes] = None
+        self._lock = threading.Lock()
+
+    def _render(self) -> None:
+        scratch = canvas.Canvas(io.BytesIO(), pagesize=letter)
+        _register_fonts(scratch)
+        _draw_receipt_static(scratch)
+        content = pdfdocEnc("\n".join([scratch._preamble] + scratch._code))
+
+        filters = [PDFBase85Encode, PDFZCompress] if rl_config.useA85 else [PDFZCompress]
+        for f in reversed(filters):
+            content = f.encode(content)
+        if isinstance(content, str):
+            content = content.encode("latin-1")
+        self._filters = PDFArray([PDFName(f.pdfname) for f in filters])
+        self._content = content
+
+    def stamp(self, p: canvas.Canvas) -> None:
+        if self._content is None:
+            with self._lock:
+                if self._content is None:
+                    self._render()
+
+        width, height = letter
+        form = PDFFormXObject(0, 0, width, height)
+        # Con "Filter" ya presente, PDFStream emite el contenido tal cual
+        form.Contents = PDFStream(
+            dictionary=PDFDictionary({"Filter": self._filters}),
+            content=self._content,
+        )
+        _register_fonts(p)
+        p._doc.addForm(self.FORM_NAME, form)
+        p.doForm(self.FORM_NAME)
+
+
+def _register_fonts(p: canvas.Canvas) -> None:
+    for font_name in _RECEIPT_FONTS:
+        p._doc.getInternalFontName(font_name)
+
+
+_receipt_template = _ReceiptTemplate()
@@ -0,0 +1,85 @@
+"""
+Process pool compartido para el renderizado de PDFs.
+
+ReportLab es CPU-bound y no libera el GIL, por lo que renderizar muchos
+documentos en hilos no escala. Este módulo mantiene un único
+ProcessPoolExecutor por proceso y expone un `map` con ventana acotada para
+que el consumo de memoria no dependa del número de documentos.
+"""
+import logging
+import os
+import threading
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Callable, Iterable, Iterator, Optional, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+# 0 desactiva el pool y renderiza en el proceso actual (útil en Vercel/Lambda,
+# donde no existe /dev/shm y multiprocessing no está disponible).
+PDF_RENDER_WORKERS = int(os.getenv("PDF_RENDER_WORKERS", str(min(4, os.cpu_count() or 1))))
+
+_pool: Optional[Executor] = None
+_pool_lock = threading.Lock()
+_pool_unavailable = False
+
+
+def get_render_pool() -> Optional[Executor]:
+    """
+    Retorna el pool compartido, creándolo en el primer uso.
+    Retorna None si el pool está desactivado o no puede crearse.
+    """
+    global _pool, _pool_unavailable
+    if PDF_RENDER_WORKERS <= 0 or _pool_unavailable:
+        return None
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None and not _pool_unavailable:
+                try:
+                    _pool = ProcessPoolExecutor(max_workers=PDF_RENDER_WORKERS)
+                    logger.info(f"PDF render pool started with {PDF_RENDER_WORKERS} workers")
+                except (OSError, NotImplementedError, ImportError) as e:
+                    logger.warning(f"Process pool unavailable, rendering inline: {e}")
+                    _pool_unavailable = True
+    return _pool
+
+
+def shutdown_render_pool() -> None:
+    """Apaga el pool compartido (llamado en el shutdown de la aplicación)."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+
+def bounded_map(
+    fn: Callable[[T], R],
+    items: Iterable[T],
+    window: Optional[int] = None,
+    executor: Optional[Executor] = None,
+) -> Iterator[R]:
+    """
+    Equivalente a `executor.map` pero con un máximo de `window` tareas en vuelo.
+
+    `Executor.map` envía todo el iterable de golpe y retiene cada resultado
+    hasta que se consume; aquí solo se mantienen `window` resultados en memoria
+    y se preserva el orden de entrada. Sin pool disponible se ejecuta en línea.
+    """
+    executor = executor if executor is not None else get_render_pool()
+    if executor is None:
+        for item in items:
+            yield fn(item)
+        return
+
+    window = window or max(1, PDF_RENDER_WORKERS) * 2
+    pending = deque()
+    for item in items:
+        pending.append(executor.submit(fn, item))
+        if len(pending) >= window:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
@@ -1,13 +1,21 @@
 import logging
 import asyncio
+import os
 from datetime import datetime, timedelta
 from apscheduler.schedulers.background import BackgroundScheduler
 from src.infrastructure.database.config import SessionLocal
 from src.infrastructure.database.models import MovementModel, ProductModel
 from src.infrastructure.security.email_service import SMTPEmailService
+from src.infrastructure.repositories.postgres_reservation_repository import PostgresReservationRepository
+from src.application.reservation_service import ReservationService
+from src.infrastructure.repositories.postgres_ledger_repository import PostgresLedgerRepository
+from src.application.ledger_service import LedgerService, ReconciliationService
 
 logger = logging.getLogger(__name__)
 
+RESERVATION_EXPIRY_INTERVAL_MINUTES = int(os.getenv("RESERVATION_EXPIRY_INTERVAL_MINUTES", "5"))
+RECONCILIATION_INTERVAL_MINUTES = int(os.getenv("RECONCILIATION_INTERVAL_MINUTES", "15"))
+
 class SchedulerService:
     def __init__(self):
         self.scheduler = BackgroundScheduler()
@@ -26,6 +34,29 @@ class SchedulerService:
                 id='return_reminder_job',
                 replace_existing=True
             )
+            self.scheduler.add_job(
+                self.expire_stock_reservations,
+                'interval',
+                minutes=RESERVATION_EXPIRY_INTERVAL_MINUTES,
+                id='stock_reservation_expiry_job',
+                replace_existing=True
+            )
+            # Checkpoint del stock al cierre del día anterior
+            self.scheduler.add_job(
+                self.take_stock_snapshot,
+                'cron',
+                hour=0,
+                minute=5,
+                id='stock_snapshot_job',
+                replace_existing=True
+            )
+            self.scheduler.add_job(
+                self.reconcile_stock,
+                'interval',
+                minutes=RECONCILIATION_INTERVAL_MINUTES,
+                id='stock_reconciliation_job',
+                replace_existing=True
+            )
             self.scheduler.start()
             logger.info("Scheduler started. Return deadline check job scheduled daily at 8:00 AM.")
 
@@ -75,5 +106,35 @@ class SchedulerService:
         finally:
             session.close()
 
+    def expire_stock_reservations(self):
+        """Marca como vencidas las reservas de checkouts que no se pagaron a tiempo."""
+        session = SessionLocal()
+        try:
+            ReservationService(PostgresReservationRepository(session)).expire_stale()
+        except Exception as e:
+            logger.error(f"Error expiring stock reservations: {e}")
+        finally:
+            session.close()
+
+    def take_stock_snapshot(self):
+        """Guarda el checkpoint de stock de cada producto al cierre de ayer."""
+        session = SessionLocal()
+        try:
+            LedgerService(PostgresLedgerRepository(session)).take_daily_snapshot()
+        except Exception as e:
+            logger.error(f"Error taking stock snapshot: {e}")
+        finally:
+            session.close()
+
+    def reconcile_stock(self):
+        """Concilia el stock de los productos con los movimientos nuevos."""
+        session = SessionLocal()
+        try:
+            ReconciliationService(PostgresLedgerRepository(session)).run()
+        except Exception as e:
+            logger.error(f"Error reconciling stock: {e}")
+        finally:
+            session.close()
+
 # Singleton instance
 scheduler_service = SchedulerService()
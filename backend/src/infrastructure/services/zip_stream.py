@@ -0,0 +1,51 @@
+"""
+Generación de archivos ZIP en streaming.
+
+`zipfile` sabe escribir sobre un destino no posicionable (sin `tell`/`seek`):
+en ese caso usa data descriptors en lugar de reescribir las cabeceras. Aquí
+el destino es un buffer que se vacía después de cada entrada, de modo que el
+ZIP completo nunca está en memoria.
+"""
+import zipfile
+from typing import Iterable, Iterator, Tuple
+
+
+class _ZipSink:
+    """Destino de solo escritura que acumula bytes hasta que se drenan."""
+
+    def __init__(self) -> None:
+        self._chunks: list[bytes] = []
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def stream_zip(
+    entries: Iterable[Tuple[str, bytes]],
+    compression: int = zipfile.ZIP_DEFLATED,
+) -> Iterator[bytes]:
+    """
+    Produce un ZIP como secuencia de chunks a partir de pares (nombre, contenido).
+
+    Cada entrada se emite en cuanto se escribe, por lo que la memoria usada
+    depende del tamaño de una entrada y no del número de entradas.
+    """
+    sink = _ZipSink()
+    with zipfile.ZipFile(sink, mode="w", compression=compression) as zf:
+        for name, content in entries:
+            zf.writestr(name, content)
+            chunk = sink.drain()
+            if chunk:
+                yield chunk
+    tail = sink.drain()
+    if tail:
+        yield tail
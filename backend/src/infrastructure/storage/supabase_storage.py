@@ -1,10 +1,12 @@
 """
 Supabase Storage service for uploading product images and files.
-Uses the Supabase Storage REST API via httpx.
+Uses the Supabase Storage REST API via a shared httpx.AsyncClient
+(keep-alive connection pool, HTTP/2 when the `h2` package is installed).
 """
+import asyncio
 import os
 import logging
-from typing import Optional
+from typing import AsyncIterable, Callable, Optional
 
 import httpx
 
@@ -14,13 +16,87 @@ SUPABASE_URL = os.getenv("SUPABASE_URL", "")
 SUPABASE_SERVICE_ROLE_KEY = os.getenv("SUPABASE_SERVICE_ROLE_KEY", "")
 SUPABASE_STORAGE_BUCKET = os.getenv("SUPABASE_STORAGE_BUCKET", "products")
 
+STORAGE_TIMEOUT_SECONDS = float(os.getenv("STORAGE_TIMEOUT_SECONDS", "30"))
+STORAGE_MAX_RETRIES = int(os.getenv("STORAGE_MAX_RETRIES", "3"))
+STORAGE_RETRY_BACKOFF_SECONDS = 0.5
+STORAGE_MAX_CONNECTIONS = int(os.getenv("STORAGE_MAX_CONNECTIONS", "20"))
+
+_client: Optional[httpx.AsyncClient] = None
+
 
 def is_configured() -> bool:
     """Check if Supabase Storage is configured."""
     return bool(SUPABASE_URL and SUPABASE_SERVICE_ROLE_KEY)
 
 
-def upload_file(
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def get_client() -> httpx.AsyncClient:
+    """Return the shared client, creating it on first use."""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            http2=_http2_available(),
+            timeout=STORAGE_TIMEOUT_SECONDS,
+            limits=httpx.Limits(
+                max_connections=STORAGE_MAX_CONNECTIONS,
+                max_keepalive_connections=STORAGE_MAX_CONNECTIONS,
+            ),
+        )
+    return _client
+
+
+async def close_client() -> None:
+    """Close the shared client (called on application shutdown)."""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+def _object_url(bucket: str, path: str) -> str:
+    return f"{SUPABASE_URL}/storage/v1/object/{bucket}/{path}"
+
+
+def _public_url(bucket: str, path: str) -> str:
+    return f"{SUPABASE_URL}/storage/v1/object/public/{bucket}/{path}"
+
+
+def _headers(content_type: str) -> dict:
+    return {
+        "Authorization": f"Bearer {SUPABASE_SERVICE_ROLE_KEY}",
+        "apikey": SUPABASE_SERVICE_ROLE_KEY,
+        "Content-Type": content_type,
+        "x-upsert": "true",
+    }
+
+
+async def _post_with_retry(url: str, make_content: Callable, headers: dict) -> httpx.Response:
+    """
+    POST with retries on 5xx responses and transport errors.
+    `make_content` builds a fresh body for each attempt (streams can only be consumed once).
+    """
+    client = get_client()
+    for attempt in range(STORAGE_MAX_RETRIES + 1):
+        try:
+            resp = await client.post(url, content=make_content(), headers=headers)
+            if resp.status_code < 500 or attempt == STORAGE_MAX_RETRIES:
+                return resp
+            logger.warning("Supabase Storage returned %s, retrying (%s/%s)", resp.status_code, attempt + 1, STORAGE_MAX_RETRIES)
+        except httpx.TransportError as e:
+            if attempt == STORAGE_MAX_RETRIES:
+                raise RuntimeError(f"Supabase Storage upload failed: {e}") from e
+            logger.warning("Supabase Storage transport error (%s), retrying (%s/%s)", e, attempt + 1, STORAGE_MAX_RETRIES)
+        await asyncio.sleep(STORAGE_RETRY_BACKOFF_SECONDS * (2 ** attempt))
+
+
+async def upload_file(
     path: str,
     file_bytes: bytes,
     content_type: str = "application/octet-stream",
@@ -39,24 +115,55 @@ def upload_file(
         Public URL of the uploaded file.
 
     Raises:
-        RuntimeError: If the upload fails.
+        RuntimeError: If the upload fails after retries.
     """
     bucket = bucket or SUPABASE_STORAGE_BUCKET
-    url = f"{SUPABASE_URL}/storage/v1/object/{bucket}/{path}"
+    resp = await _post_with_retry(_object_url(bucket, path), lambda: file_bytes, _headers(content_type))
+    return _check_upload(resp, bucket, path)
 
-    headers = {
-        "Authorization": f"Bearer {SUPABASE_SERVICE_ROLE_KEY}",
-        "apikey": SUPABASE_SERVICE_ROLE_KEY,
-        "Content-Type": content_type,
-        "x-upsert": "true",
-    }
 
-    resp = httpx.post(url, content=file_bytes, headers=headers, timeout=30)
+async def upload_stream(
+    path: str,
+    open_stream: Callable[[], AsyncIterable[bytes]],
+    content_type: str = "application/octet-stream",
+    content_length: Optional[int] = None,
+    bucket: Optional[str] = None,
+) -> str:
+    """
+    Upload a file to Supabase Storage from an async stream of chunks.
+
+    The body is sent as it is produced, so the file is never held in memory.
+    If the stream raises (e.g. the size limit is exceeded) the request is
+    aborted and the exception propagates to the caller.
+
+    Args:
+        path: Object path inside the bucket
+        open_stream: Returns a new async iterable with the file content;
+            called again on each retry
+        content_type: MIME type of the file
+        content_length: Total size if known (otherwise chunked transfer is used)
+        bucket: Bucket name (defaults to SUPABASE_STORAGE_BUCKET env var)
+
+    Returns:
+        Public URL of the uploaded file.
+
+    Raises:
+        RuntimeError: If the upload fails after retries.
+    """
+    bucket = bucket or SUPABASE_STORAGE_BUCKET
+    headers = _headers(content_type)
+    if content_length is not None:
+        headers["Content-Length"] = str(content_length)
+
+    resp = await _post_with_retry(_object_url(bucket, path), open_stream, headers)
+    return _check_upload(resp, bucket, path)
+
 
+def _check_upload(resp: httpx.Response, bucket: str, path: str) -> str:
     if resp.status_code not in (200, 201):
         logger.error("Supabase Storage upload failed: %s %s", resp.status_code, resp.text)
         raise RuntimeError(f"Supabase Storage upload failed ({resp.status_code}): {resp.text}")
 
-    public_url = f"{SUPABASE_URL}/storage/v1/object/public/{bucket}/{path}"
+    public_url = _public_url(bucket, path)
     logger.info("Uploaded to Supabase Storage: %s", public_url)
     return public_url
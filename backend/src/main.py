@@ -96,6 +96,16 @@ async def lifespan(app: FastAPI):
             logger.info("Scheduler shut down")
         except Exception:
             pass
+        try:
+            from src.infrastructure.services.render_pool import shutdown_render_pool
+            shutdown_render_pool()
+        except Exception:
+            pass
+        try:
+            from src.infrastructure.storage.supabase_storage import close_client
+            await close_client()
+        except Exception:
+            pass
         logger.info("Lifespan cleanup finished")
 
 
@@ -197,6 +207,8 @@ async def dynamic_cors_middleware(request, call_next):
         # keep other CORS headers permissive
         response.headers.setdefault("Access-Control-Allow-Methods", "GET,POST,PUT,PATCH,DELETE,OPTIONS")
         response.headers.setdefault("Access-Control-Allow-Headers", "Authorization,Content-Type,Accept,Origin")
+        # Cursor de paginación de los listados
+        response.headers.setdefault("Access-Control-Expose-Headers", "X-Next-Cursor")
     return response
 
 app.include_router(products_router, prefix="/api/v1/products")
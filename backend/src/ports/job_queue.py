@@ -0,0 +1,30 @@
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import List, Optional
+from uuid import UUID
+
+from src.domain.job_entities import Job
+
+
+class JobQueue(ABC):
+    @abstractmethod
+    def enqueue(self, kind: str, payload: dict, max_attempts: Optional[int] = None, run_after: Optional[datetime] = None) -> Job:
+        pass
+
+    @abstractmethod
+    def claim(self, kind: str, limit: int) -> List[Job]:
+        """
+        Toma hasta `limit` trabajos listos (o RUNNING huérfanos con intentos
+        disponibles) y los marca como RUNNING. Los huérfanos sin intentos
+        restantes pasan a FAILED.
+        """
+        pass
+
+    @abstractmethod
+    def complete(self, job_id: UUID) -> None:
+        pass
+
+    @abstractmethod
+    def fail(self, job_id: UUID, error: str) -> None:
+        """Reprograma el trabajo con backoff o lo marca FAILED si agotó sus intentos."""
+        pass
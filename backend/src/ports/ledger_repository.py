@@ -0,0 +1,48 @@
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import List, Optional
+from uuid import UUID
+
+from src.domain.ledger_entities import ReconciliationRun, StockDiscrepancy, StockPosition
+
+
+class LedgerRepository(ABC):
+    @abstractmethod
+    def stock_positions(self, as_of: datetime, product_id: Optional[UUID] = None) -> List[StockPosition]:
+        """
+        Stock de cada producto en `as_of`: el checkpoint más reciente no
+        posterior a `as_of` más los movimientos entre ese checkpoint y
+        `as_of` (sin checkpoint se suman todos los movimientos anteriores).
+        """
+        pass
+
+    @abstractmethod
+    def save_snapshots(self, as_of: datetime) -> int:
+        """
+        Guarda (o rehace) el checkpoint de todos los productos en `as_of`.
+        Retorna la cantidad de productos.
+        """
+        pass
+
+    @abstractmethod
+    def reconcile(self, run: ReconciliationRun, correct: bool = False) -> ReconciliationRun:
+        """
+        Suma al stock esperado los movimientos con fecha en
+        [marca de la pasada anterior, run.high_water_mark) y compara
+        `products.stock` con el esperado (incluidos los movimientos posteriores
+        a la marca) solo en los productos tocados o modificados desde la pasada
+        anterior, o con una diferencia pendiente. Con `correct`, las
+        diferencias que se repiten desde la pasada anterior se corrigen con un
+        movimiento de ajuste. Todo en una transacción.
+        """
+        pass
+
+    @abstractmethod
+    def reset_reconciliation(self) -> None:
+        """Borra saldos y pasadas: la siguiente conciliación recorre todo el historial."""
+        pass
+
+    @abstractmethod
+    def pending_discrepancies(self) -> List[StockDiscrepancy]:
+        """Diferencias encontradas por la última conciliación que siguen sin corregir."""
+        pass
@@ -1,7 +1,8 @@
 from abc import ABC, abstractmethod
-from typing import List, Optional
+from datetime import datetime
+from typing import Iterator, List, Optional, Tuple
 from uuid import UUID
-from src.domain.purchase_entities import Supplier, PurchaseOrder
+from src.domain.purchase_entities import Supplier, PurchaseOrder, PurchaseKPIs
 
 class PurchaseRepository(ABC):
     @abstractmethod
@@ -20,9 +21,42 @@ class PurchaseRepository(ABC):
     def get_purchase_orders(self, skip: int = 0, limit: int = 100) -> List[PurchaseOrder]:
         pass
     
+    @abstractmethod
+    def find_purchase_orders_page(
+        self,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        status: Optional[str] = None,
+        supplier_id: Optional[UUID] = None,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+    ) -> Tuple[List[PurchaseOrder], Optional[str]]:
+        """Página de órdenes (más recientes primero) y cursor de la siguiente página."""
+        pass
+
+    @abstractmethod
+    def iter_purchase_orders(
+        self,
+        order_ids: Optional[List[UUID]] = None,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+    ) -> Iterator[PurchaseOrder]:
+        """Itera órdenes por ID o rango de fechas sin cargarlas todas en memoria."""
+        pass
+
     @abstractmethod
     def get_purchase_order(self, order_id: UUID) -> Optional[PurchaseOrder]:
         pass
+
+    @abstractmethod
+    def get_purchase_kpis(
+        self,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        supplier_id: Optional[UUID] = None,
+    ) -> PurchaseKPIs:
+        """Calcula los KPIs de compras sobre todas las órdenes que cumplen los filtros."""
+        pass
     
     @abstractmethod
     def link_product_to_supplier(self, supplier_id: UUID, product_id: UUID) -> bool:
@@ -1,9 +1,11 @@
 """
 Interfaces y puertos para el repositorio de productos.
 """
-from typing import Optional, Protocol
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional, Protocol
 from uuid import UUID
 
+from src.domain.catalog_entities import CatalogQuery
 from src.domain.entities import Product, User, Movement
 
 
@@ -40,6 +42,39 @@ class ProductRepository(Protocol):
         """
         ...
     
+    def find_by_sku(self, sku: str) -> Optional[Product]:
+        """
+        Busca un producto por su SKU (único).
+        """
+        ...
+
+    def find_by_ids(self, product_ids: Iterable[UUID]) -> Dict[UUID, Product]:
+        """
+        Busca varios productos a la vez; los IDs inexistentes no aparecen.
+        """
+        ...
+
+    def apply_stock_movements(self, deltas: Dict[UUID, int], movements: List[Movement]) -> Dict[UUID, int]:
+        """
+        Suma `deltas` (producto -> variación) al stock y registra los
+        movimientos de forma atómica.
+
+        Returns:
+            Stock resultante por producto
+
+        Raises:
+            ProductNotFoundError: Si algún producto no existe
+            InsufficientStockError: Si algún stock quedaría negativo
+        """
+        ...
+
+    def upsert_by_sku(self, products: List[Product], update_fields: Iterable[str]) -> None:
+        """
+        Inserta un lote de productos; los que ya existen (mismo SKU) solo
+        actualizan los campos `update_fields`.
+        """
+        ...
+
     def update_stock(self, product_id: UUID, quantity: int) -> Product:
         """
         Actualiza el stock de un producto.
@@ -65,6 +100,34 @@ class ProductRepository(Protocol):
         """
         ...
 
+    def search(self, query: str, skip: int = 0, limit: int = 100, public_only: bool = False) -> list[Product]:
+        """
+        Busca productos por nombre, descripción y SKU. Cada palabra de
+        `query` debe aparecer como prefijo de alguna palabra del producto.
+
+        Args:
+            query: Texto a buscar
+            public_only: Solo productos visibles en la tienda
+
+        Returns:
+            Productos ordenados por relevancia y luego por nombre
+        """
+        ...
+
+    def find_public(self, catalog: CatalogQuery, skip: int = 0, limit: int = 100) -> list[Product]:
+        """
+        Productos visibles en la tienda que cumplen los filtros de `catalog`,
+        en su orden y con paginación.
+        """
+        ...
+
+    def public_facets(self, catalog: CatalogQuery) -> dict:
+        """
+        Total y conteos por disponibilidad y rango de precio del catálogo
+        de la tienda (ver `catalog_facets`).
+        """
+        ...
+
     def delete(self, product_id: UUID) -> bool:
         """
         Elimina un producto del repositorio.
@@ -89,6 +152,19 @@ class ProductRepository(Protocol):
         """
         ...
 
+    def iter_movements(
+        self,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        movement_type: Optional[str] = None,
+        product_id: Optional[UUID] = None,
+    ) -> Iterator['Movement']:
+        """
+        Recorre los movimientos filtrados en orden cronológico sin cargarlos
+        todos en memoria (exportaciones completas del historial).
+        """
+        ...
+
     def find_initial_movement(self, product_id: UUID) -> Optional['Movement']:
         """
         Busca el primer movimiento de entrada de un producto.
@@ -101,6 +177,12 @@ class ProductRepository(Protocol):
         """
         ...
 
+    def exists_movement_for_purchase_order(self, purchase_order_id: UUID) -> bool:
+        """
+        Indica si ya se registró la entrada de stock de una orden de compra.
+        """
+        ...
+
 
 class UserRepository(Protocol):
     """
@@ -0,0 +1,47 @@
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Dict, List, Tuple
+from uuid import UUID
+
+from src.domain.reservation_entities import StockReservation
+
+
+class ReservationRepository(ABC):
+    @abstractmethod
+    def hold(
+        self,
+        reservation_id: UUID,
+        items: List[Tuple[UUID, int]],
+        expires_at: datetime,
+    ) -> List[StockReservation]:
+        """
+        Reserva todas las líneas (producto, cantidad) o ninguna.
+
+        El stock disponible es el stock del producto menos las reservas
+        activas no vencidas; la comprobación y la inserción son atómicas.
+
+        Raises:
+            ProductNotFoundError: Si algún producto no existe.
+            InsufficientStockError: Si algún producto no tiene stock disponible.
+        """
+        pass
+
+    @abstractmethod
+    def convert(self, reservation_id: UUID) -> int:
+        """Marca las líneas activas como CONVERTED. Retorna cuántas cambió."""
+        pass
+
+    @abstractmethod
+    def release(self, reservation_id: UUID) -> int:
+        """Libera las líneas activas (RELEASED). Retorna cuántas cambió."""
+        pass
+
+    @abstractmethod
+    def expire(self, now: datetime) -> int:
+        """Marca como EXPIRED todas las reservas activas vencidas. Retorna cuántas cambió."""
+        pass
+
+    @abstractmethod
+    def reserved_quantities(self, product_ids: List[UUID]) -> Dict[UUID, int]:
+        """Cantidad reservada (activa y no vencida) por producto."""
+        pass
@@ -1,6 +1,8 @@
 from abc import ABC, abstractmethod
-from typing import List, Optional
+from datetime import datetime
+from typing import List, Optional, Tuple
 from uuid import UUID
+from src.domain.entities import Movement
 from src.domain.sales_entities import SalesOrder
 
 class SalesRepository(ABC):
@@ -8,6 +10,18 @@ class SalesRepository(ABC):
     def save(self, sales_order: SalesOrder) -> None:
         pass
 
+    @abstractmethod
+    def save_with_movements(self, orders: List[SalesOrder], movements: List[Movement]) -> List[Movement]:
+        """
+        Guarda las órdenes y, en la misma transacción, descuenta el stock y
+        registra los movimientos de venta. Los productos sin stock suficiente
+        no se descuentan y sus movimientos no se registran.
+
+        Returns:
+            Los movimientos registrados
+        """
+        pass
+
     @abstractmethod
     def find_by_id(self, order_id: UUID) -> Optional[SalesOrder]:
         pass
@@ -17,7 +31,17 @@ class SalesRepository(ABC):
         pass
 
     @abstractmethod
-    def find_by_email(self, email: str) -> List[SalesOrder]:
+    def find_page(
+        self,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        status: Optional[str] = None,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        customer_email: Optional[str] = None,
+        product_id: Optional[UUID] = None,
+    ) -> Tuple[List[SalesOrder], Optional[str]]:
+        """Página de órdenes (más recientes primero) y cursor de la siguiente página."""
         pass
 
     @abstractmethod
@@ -37,5 +61,11 @@ class SalesRepository(ABC):
         pass
 
     @abstractmethod
-    def get_kpis(self) -> dict:
+    def get_kpis(self, window_days: Optional[int] = None) -> dict:
+        """KPIs de ventas; con `window_days` solo considera los últimos N días."""
+        pass
+
+    @abstractmethod
+    def get_cached_kpis(self, window_days: Optional[int] = None) -> dict:
+        """Como get_kpis, pero cacheado e invalidado en cada escritura de ventas."""
         pass
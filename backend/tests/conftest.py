@@ -0,0 +1,68 @@
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from src.infrastructure.database.config import Base
+from src.infrastructure.database import models  # noqa: F401  (registra las tablas)
+from src.infrastructure.repositories.in_memory_repository import InMemoryProductRepository
+from src.infrastructure.repositories.postgres_repository import PostgreSQLProductRepository
+
+
+@pytest.fixture
+def db_engine():
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+
+    @event.listens_for(engine, "connect")
+    def set_sqlite_pragma(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA foreign_keys=ON")
+        cursor.close()
+
+    Base.metadata.create_all(bind=engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def db_session(db_engine):
+    session = sessionmaker(autocommit=False, autoflush=False, bind=db_engine)()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture(params=["postgres", "memory"])
+def product_repo(request, db_session):
+    """Repositorio de productos; el test corre con la implementación SQL y con la de memoria."""
+    if request.param == "postgres":
+        return PostgreSQLProductRepository(db_session)
+    return InMemoryProductRepository()
+
+
+@pytest.fixture
+def count_statements(db_engine):
+    """
+    Junta el SQL que se ejecuta dentro del bloque:
+
+        with count_statements() as statements:
+            repo.find_all()
+        assert len(statements) == 1
+    """
+    @contextmanager
+    def counting():
+        statements = []
+        listener = lambda conn, cursor, statement, *args: statements.append(statement)
+        event.listen(db_engine, "before_cursor_execute", listener)
+        try:
+            yield statements
+        finally:
+            event.remove(db_engine, "before_cursor_execute", listener)
+    return counting
@@ -0,0 +1,72 @@
+from uuid import uuid4
+
+import pytest
+
+from src.application.services import InventoryService
+from src.domain.entities import Movement, Product
+from src.domain.exceptions import BulkStockError, InsufficientStockError
+from src.infrastructure.repositories.postgres_repository import PostgreSQLProductRepository
+
+
+def _products(repo, *stocks):
+    return [repo.save(Product(name=f"P{i}", description="-", stock=s, sku=f"SKU-{i}")) for i, s in enumerate(stocks)]
+
+
+def test_bulk_receive_applies_every_line(product_repo):
+    a, b = _products(product_repo, 1, 0)
+    service = InventoryService(product_repo)
+
+    results = service.receive_stock_bulk([(a.id, 2, "GR-1"), (b.id, 5, "GR-1"), (a.id, 3, "GR-2")])
+
+    assert [stock for _, stock in results] == [6, 5, 6]
+    assert [(m.type, m.product_name, m.reference) for m, _ in results] == [
+        ("INGRESO", "P0", "GR-1"), ("INGRESO", "P1", "GR-1"), ("INGRESO", "P0", "GR-2")
+    ]
+    assert product_repo.find_by_id(a.id).stock == 6
+    assert product_repo.find_by_id(b.id).stock == 5
+    assert len(product_repo.find_all_movements()) == 3
+
+
+def test_bulk_sell_validates_all_lines_before_applying(product_repo):
+    a, b = _products(product_repo, 5, 5)
+    service = InventoryService(product_repo)
+
+    with pytest.raises(BulkStockError) as exc:
+        service.sell_stock_bulk([(a.id, 3, "S-1"), (b.id, 1, "S-1"), (a.id, 3, "S-2"), (uuid4(), 1, "S-3")])
+
+    assert [e["line"] for e in exc.value.errors] == [0, 2, 3]
+    assert "Disponible: 5, Solicitado: 6" in exc.value.errors[0]["error"]
+    assert product_repo.find_by_id(a.id).stock == 5
+    assert product_repo.find_by_id(b.id).stock == 5
+    assert product_repo.find_all_movements() == []
+
+    results = service.sell_stock_bulk([(a.id, 5, "S-1"), (b.id, 1, "S-1")], applicant="Ana", applicant_area="TI")
+    assert [stock for _, stock in results] == [0, 4]
+    assert all(m.type == "CONSUMO INTERNO" and m.applicant == "Ana" for m, _ in results)
+
+
+def test_apply_stock_movements_is_atomic(product_repo):
+    a, b = _products(product_repo, 5, 1)
+
+    # Stock consumido entre la validación y la escritura
+    with pytest.raises(InsufficientStockError):
+        product_repo.apply_stock_movements({a.id: -1, b.id: -2}, [
+            Movement(product_id=a.id, quantity=1, type="CONSUMO INTERNO", reference="S"),
+            Movement(product_id=b.id, quantity=2, type="CONSUMO INTERNO", reference="S"),
+        ])
+
+    assert product_repo.find_by_id(a.id).stock == 5
+    assert product_repo.find_by_id(b.id).stock == 1
+    assert product_repo.find_all_movements() == []
+
+
+def test_bulk_receive_uses_constant_queries(db_session, count_statements):
+    repo = PostgreSQLProductRepository(db_session)
+    products = _products(repo, *([0] * 50))
+
+    with count_statements() as statements:
+        InventoryService(repo).receive_stock_bulk([(p.id, 1, "GR") for p in products])
+
+    # SELECT de validación + UPDATE + INSERT masivo
+    assert len(statements) == 3
+    assert all(p.stock == 1 for p in repo.find_by_ids(p.id for p in products).values())
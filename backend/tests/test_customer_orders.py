@@ -0,0 +1,64 @@
+import json
+from datetime import datetime, timedelta
+from decimal import Decimal
+from uuid import UUID, uuid4
+
+import pytest
+
+from src.application.ecommerce_service import EcommerceService
+from src.domain.sales_entities import SalesOrder
+from src.infrastructure.api.public_routes import _stream_json_array
+from src.infrastructure.database.models import ProductModel
+from src.infrastructure.repositories.postgres_sales_repository import PostgresSalesRepository
+
+
+@pytest.fixture
+def ecommerce(db_session, monkeypatch):
+    product = ProductModel(id=str(uuid4()), name="Polo", description="-", stock=10, sku="POLO-1", image_path="polo.png")
+    db_session.add(product)
+    db_session.commit()
+
+    repo = PostgresSalesRepository(db_session)
+    base = datetime(2026, 3, 1, 12, 0, 0)
+    for i in range(30):
+        repo.save(SalesOrder(
+            customer_name="Cliente",
+            customer_email="frecuente@test.com" if i % 3 else "otro@test.com",
+            product_id=UUID(product.id),
+            quantity=1,
+            unit_price=Decimal("10.00"),
+            subtotal=Decimal("10.00"),
+            tax_amount=Decimal("1.80"),
+            total_amount=Decimal("11.80"),
+            created_at=base + timedelta(hours=i),
+        ))
+    db_session.expunge_all()
+    monkeypatch.setattr(EcommerceService, "CUSTOMER_ORDERS_BATCH_SIZE", 7)
+    return EcommerceService(product_repository=None, sales_repository=repo, stripe_service=None)
+
+
+def test_customer_orders_page_is_one_query(ecommerce, count_statements):
+    with count_statements() as statements:
+        orders, cursor = ecommerce.get_customer_orders("frecuente@test.com", limit=5)
+
+    assert len(orders) == 5
+    assert cursor is not None
+    assert all(o["customer_email"] == "frecuente@test.com" for o in orders)
+    assert all(o["product_name"] == "Polo" and o["product_image"] == "polo.png" for o in orders)
+    assert len(statements) == 1
+
+
+def test_iter_customer_orders_walks_full_history(ecommerce):
+    orders = list(ecommerce.iter_customer_orders("frecuente@test.com"))
+
+    assert len(orders) == 20
+    assert len({o["id"] for o in orders}) == 20
+    created = [o["created_at"] for o in orders]
+    assert created == sorted(created, reverse=True)
+
+
+def test_stream_json_array_is_valid_json(ecommerce):
+    body = b"".join(_stream_json_array(ecommerce.iter_customer_orders("frecuente@test.com")))
+
+    assert len(json.loads(body)) == 20
+    assert json.loads(b"".join(_stream_json_array([]))) == []
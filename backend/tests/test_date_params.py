@@ -0,0 +1,20 @@
+from datetime import datetime
+
+from src.application.ledger_service import end_of_day
+from src.infrastructure.api.date_params import end_of_day_param
+
+
+def test_date_only_values_cover_the_whole_day():
+    day = datetime(2026, 3, 31)
+
+    assert end_of_day_param(day) == datetime(2026, 3, 31, 23, 59, 59)
+    # Corte exclusivo: el mismo que usa la valorización por fecha
+    assert end_of_day_param(day, exclusive=True) == end_of_day(day.date())
+
+
+def test_values_with_time_or_missing_are_kept():
+    moment = datetime(2026, 3, 31, 18, 30)
+
+    assert end_of_day_param(moment) == moment
+    assert end_of_day_param(moment, exclusive=True) == moment
+    assert end_of_day_param(None) is None
@@ -0,0 +1,88 @@
+from decimal import Decimal
+
+import pytest
+
+from src.application.ecommerce_service import EcommerceService
+from src.application.stripe_service import StripeService
+from src.domain.entities import Product
+from src.domain.public_schemas import CartItem
+from src.infrastructure.repositories.postgres_repository import PostgreSQLProductRepository
+from src.infrastructure.repositories.postgres_sales_repository import PostgresSalesRepository
+
+
+@pytest.fixture
+def ecommerce(db_session, monkeypatch):
+    monkeypatch.setenv("MOCK_STRIPE", "true")
+    products = PostgreSQLProductRepository(db_session)
+    service = EcommerceService(
+        product_repository=products,
+        sales_repository=PostgresSalesRepository(db_session),
+        stripe_service=StripeService(),
+    )
+    polo = products.save(Product(name="Polo", description="-", stock=3, sku="POLO", retail_price=Decimal("50.00")))
+    gorra = products.save(Product(name="Gorra", description="-", stock=5, sku="GORRA", retail_price=Decimal("20.00")))
+    taza = products.save(Product(
+        name="Taza", description="-", stock=0, sku="TAZA", retail_price=Decimal("15.00"), is_preorder=True
+    ))
+    return service, products, polo, gorra, taza
+
+
+def _session_id(service, *lines):
+    session = service.create_checkout_session(
+        items=[
+            CartItem(product_id=p.id, product_name=p.name, unit_price=float(p.retail_price), quantity=q)
+            for p, q in lines
+        ],
+        customer_email="cliente@test.com",
+        customer_name="Cliente",
+        shipping_address=None,
+    )
+    return session["session_id"]
+
+
+def test_orders_and_sale_movements_are_written_together(ecommerce, db_session):
+    service, products, polo, gorra, taza = ecommerce
+    session_id = _session_id(service, (polo, 2), (gorra, 1), (taza, 4))
+
+    result = service.create_orders_from_session(session_id)
+
+    movements = {m.product_id: m for m in products.find_all_movements()}
+    orders = {o.product_id: o for o in PostgresSalesRepository(db_session).find_by_stripe_session_id(session_id)}
+    assert len(result["order_ids"]) == 3
+    assert set(movements) == {polo.id, gorra.id}  # la preventa sin stock no descuenta
+    for product_id, movement in movements.items():
+        assert (movement.type, movement.sales_order_id) == ("VENTA", orders[product_id].id)
+        assert movement.quantity == orders[product_id].quantity
+    assert products.find_by_id(polo.id).stock == 1
+    assert products.find_by_id(gorra.id).stock == 4
+
+    # Idempotente: la segunda confirmación no duplica órdenes ni movimientos
+    service.create_orders_from_session(session_id)
+    assert len(products.find_all_movements()) == 2
+
+
+def test_order_is_kept_without_movement_when_stock_ran_out(ecommerce):
+    service, products, polo, gorra, _ = ecommerce
+    session_id = _session_id(service, (polo, 2), (gorra, 1))
+    # Otra salida consumió el stock entre el checkout y el pago
+    products.update_stock(polo.id, 1)
+
+    result = service.create_orders_from_session(session_id)
+
+    assert len(result["order_ids"]) == 2
+    assert [m.product_id for m in products.find_all_movements()] == [gorra.id]
+    assert products.find_by_id(polo.id).stock == 1
+    assert products.find_by_id(gorra.id).stock == 4
+
+
+def test_order_materialization_uses_constant_writes(ecommerce, count_statements):
+    service, _, polo, gorra, taza = ecommerce
+    session_id = _session_id(service, (polo, 1), (gorra, 1), (taza, 1))
+
+    with count_statements() as statements:
+        service.create_orders_from_session(session_id)
+
+    # INSERT de órdenes + UPDATE de stock + INSERT de movimientos
+    verbs = [s.split()[0] for s in statements]
+    assert verbs.count("INSERT") == 2
+    assert verbs.count("UPDATE") == 1
@@ -0,0 +1,49 @@
+import asyncio
+import json
+from decimal import Decimal
+
+import pytest
+
+from src.application.services import InventoryService
+from src.domain.entities import Movement, Product
+from src.infrastructure.api.routes import get_all_pending_returns, get_movements, list_products
+from src.infrastructure.repositories.in_memory_repository import InMemoryProductRepository
+
+
+@pytest.fixture
+def service():
+    repo = InMemoryProductRepository()
+    for i in range(5):
+        product = repo.save(Product(
+            name=f"Producto {i}", description="-", stock=10, sku=f"SKU-{i}",
+            retail_price=Decimal("19.90"), image_path=f"/tmp/uploads/products/images/{i}.png"
+        ))
+        repo.save_movement(Movement(
+            product_id=product.id, quantity=2, type="EXIT", reference=f"GS-{i}",
+            document_path="uploads/docs/acta.pdf", is_returnable=True, product_name=product.name
+        ))
+    return InventoryService(repo)
+
+
+def _default_body(result):
+    return json.loads(json.dumps([item.model_dump(mode="json") for item in result]))
+
+
+def test_fast_path_returns_the_same_json(service, monkeypatch):
+    default = (
+        asyncio.run(list_products(service)),
+        get_movements(service),
+        get_all_pending_returns(service),
+    )
+    monkeypatch.setenv("FAST_JSON_RESPONSES", "true")
+    fast = (
+        asyncio.run(list_products(service)),
+        get_movements(service),
+        get_all_pending_returns(service),
+    )
+
+    for before, after in zip(default, fast):
+        assert after.media_type == "application/json"
+        assert json.loads(after.body) == _default_body(before)
+    # Los validadores de los schemas se siguen aplicando
+    assert json.loads(fast[0].body)[0]["image_path"].startswith("/uploads/products/images/")
@@ -0,0 +1,87 @@
+import threading
+from datetime import timedelta
+from uuid import uuid4
+
+import pytest
+
+from src.domain.entities import Movement, Product, get_local_time
+from src.infrastructure.repositories.in_memory_repository import InMemoryProductRepository
+
+
+@pytest.fixture
+def repo():
+    return InMemoryProductRepository()
+
+
+def _product(sku="SKU-1", stock=5):
+    return Product(name="Polo", description="-", stock=stock, sku=sku)
+
+
+def test_returned_entities_do_not_alias_the_store(repo):
+    product = repo.save(_product())
+
+    product.stock = 99
+    found = repo.find_by_id(product.id)
+    found.name = "Otro"
+
+    assert repo.find_by_id(product.id).stock == 5
+    assert repo.find_by_id(product.id).name == "Polo"
+
+
+def test_sku_index_follows_updates_and_rejects_duplicates(repo):
+    product = repo.save(_product("A"))
+
+    product.sku = "B"
+    repo.save(product)
+
+    assert repo.find_by_sku("A") is None
+    assert repo.find_by_sku("B").id == product.id
+    with pytest.raises(ValueError):
+        repo.save(_product("B"))
+
+    repo.delete(product.id)
+    assert repo.find_by_sku("B") is None
+
+
+def test_find_all_and_movements_are_paginated(repo):
+    products = [repo.save(_product(f"SKU-{i}")) for i in range(10)]
+    base = get_local_time()
+    for i in range(10):
+        repo.save_movement(Movement(
+            product_id=products[i % 2].id, quantity=1, type="ENTRY", reference=f"M{i}",
+            date=base + timedelta(minutes=i)
+        ))
+
+    assert [p.sku for p in repo.find_all(skip=2, limit=3)] == ["SKU-2", "SKU-3", "SKU-4"]
+    assert [m.reference for m in repo.find_all_movements(skip=1, limit=3)] == ["M8", "M7", "M6"]
+    assert repo.find_initial_movement(products[1].id).reference == "M1"
+
+
+def test_delete_cascades_movements(repo):
+    product = repo.save(_product())
+    order_id = uuid4()
+    repo.save_movement(Movement(product_id=product.id, quantity=1, type="ENTRY", reference="OC", purchase_order_id=order_id))
+
+    assert repo.delete(product.id) is True
+
+    assert repo.find_all_movements() == []
+    assert repo.exists_movement_for_purchase_order(order_id) is False
+
+
+def test_concurrent_writes(repo):
+    products = [repo.save(_product(f"SKU-{i}", stock=0)) for i in range(8)]
+
+    def worker(n):
+        for i in range(200):
+            product = products[(n + i) % len(products)]
+            repo.update_stock(product.id, i)
+            repo.save_movement(Movement(product_id=product.id, quantity=1, type="ENTRY", reference=f"{n}-{i}"))
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(repo.find_all_movements(limit=10_000)) == 1600
+    assert all(repo.find_initial_movement(p.id) is not None for p in products)
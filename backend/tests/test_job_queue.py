@@ -0,0 +1,114 @@
+from datetime import timedelta
+
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+from src.domain.entities import get_local_time
+from src.domain.job_entities import MOVEMENT_RECEIPT_JOB
+from src.infrastructure.database.models import JobModel
+from src.infrastructure.repositories.postgres_job_queue import PostgresJobQueue
+from src.infrastructure.services import render_pool
+from src.infrastructure.services.job_worker import ReceiptJobWorker
+
+MOVEMENT_DATA = {
+    "product_name": "Laptop",
+    "type": "EXIT",
+    "reference": "GR-001",
+    "quantity": 1,
+    "applicant": "Ana",
+    "applicant_area": "TI",
+    "is_returnable": True,
+    "is_sale": False,
+    "return_deadline": "N/A",
+    "recipient_email": "ana@test.com",
+}
+
+
+class FakeEmailService:
+    def __init__(self, fail_for=()):
+        self.sent = []
+        self.fail_for = set(fail_for)
+
+    async def send_receipt_email(self, email, movement_data, pdf_content):
+        if email in self.fail_for:
+            raise ConnectionError("SMTP unavailable")
+        self.sent.append((email, pdf_content))
+
+
+@pytest.fixture(autouse=True)
+def inline_rendering(monkeypatch):
+    monkeypatch.setattr(render_pool, "PDF_RENDER_WORKERS", 0)
+
+
+def test_claim_marks_jobs_running_and_skips_future_jobs(db_session):
+    queue = PostgresJobQueue(db_session)
+    ready = queue.enqueue(MOVEMENT_RECEIPT_JOB, {"email": "a@test.com"})
+    queue.enqueue(MOVEMENT_RECEIPT_JOB, {"email": "b@test.com"}, run_after=get_local_time() + timedelta(hours=1))
+
+    claimed = queue.claim(MOVEMENT_RECEIPT_JOB, 10)
+
+    assert [job.id for job in claimed] == [ready.id]
+    assert claimed[0].attempts == 1
+    assert claimed[0].payload == {"email": "a@test.com"}
+    assert queue.claim(MOVEMENT_RECEIPT_JOB, 10) == []
+
+
+def test_fail_retries_with_backoff_until_max_attempts(db_session):
+    queue = PostgresJobQueue(db_session)
+    job = queue.enqueue(MOVEMENT_RECEIPT_JOB, {}, max_attempts=2)
+
+    queue.claim(MOVEMENT_RECEIPT_JOB, 1)
+    queue.fail(job.id, "boom")
+    model = db_session.get(JobModel, str(job.id))
+    assert model.status == "PENDING"
+    assert model.last_error == "boom"
+
+    # Adelantar el reintento y agotar los intentos
+    model.run_after = model.run_after - timedelta(hours=2)
+    db_session.commit()
+    queue.claim(MOVEMENT_RECEIPT_JOB, 1)
+    queue.fail(job.id, "boom again")
+    assert db_session.get(JobModel, str(job.id)).status == "FAILED"
+
+
+def test_orphaned_jobs_are_reclaimed_until_max_attempts(db_session):
+    queue = PostgresJobQueue(db_session)
+    job = queue.enqueue(MOVEMENT_RECEIPT_JOB, {}, max_attempts=2)
+
+    def crash_worker():
+        # El worker muere sin llamar a complete/fail: el lock queda vencido
+        model = db_session.get(JobModel, str(job.id))
+        model.locked_at = model.locked_at - timedelta(hours=1)
+        db_session.commit()
+
+    assert [j.attempts for j in queue.claim(MOVEMENT_RECEIPT_JOB, 1)] == [1]
+    crash_worker()
+    assert [j.attempts for j in queue.claim(MOVEMENT_RECEIPT_JOB, 1)] == [2]
+    crash_worker()
+
+    assert queue.claim(MOVEMENT_RECEIPT_JOB, 1) == []
+    db_session.expire_all()
+    model = db_session.get(JobModel, str(job.id))
+    assert (model.status, model.attempts, model.locked_at) == ("FAILED", 2, None)
+    assert model.last_error
+
+
+def test_worker_renders_and_sends_batch(db_engine, db_session):
+    queue = PostgresJobQueue(db_session)
+    ok = queue.enqueue(MOVEMENT_RECEIPT_JOB, {"email": "ana@test.com", "movement_data": MOVEMENT_DATA})
+    bad = queue.enqueue(MOVEMENT_RECEIPT_JOB, {"email": "down@test.com", "movement_data": MOVEMENT_DATA})
+    email_service = FakeEmailService(fail_for={"down@test.com"})
+
+    worker = ReceiptJobWorker(session_factory=sessionmaker(bind=db_engine), email_service=email_service)
+    assert worker.run_once() == 2
+
+    assert len(email_service.sent) == 1
+    email, pdf_content = email_service.sent[0]
+    assert email == "ana@test.com"
+    assert pdf_content.startswith(b"%PDF")
+
+    db_session.expire_all()
+    assert db_session.get(JobModel, str(ok.id)).status == "DONE"
+    failed = db_session.get(JobModel, str(bad.id))
+    assert failed.status == "PENDING"
+    assert "SMTP unavailable" in failed.last_error
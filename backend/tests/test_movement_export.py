@@ -0,0 +1,53 @@
+import csv
+import io
+import json
+from datetime import datetime, timedelta
+
+import pytest
+
+from src.domain.entities import Movement, Product
+from src.infrastructure.api import routes
+
+BASE = datetime(2026, 3, 1, 9, 0)
+
+
+@pytest.fixture
+def repo(product_repo):
+    repo = product_repo
+    polo = repo.save(Product(name="Polo", description="-", stock=10, sku="POLO"))
+    gorra = repo.save(Product(name="Gorra", description="-", stock=10, sku="GORRA"))
+    for i in range(6):
+        repo.save_movement(Movement(
+            product_id=(polo if i % 2 else gorra).id, quantity=1, type="ENTRY" if i < 3 else "EXIT",
+            reference=f"M{i}", date=BASE + timedelta(days=i)
+        ))
+    return repo, polo
+
+
+def test_iter_movements_filters_in_chronological_order(repo):
+    repo, polo = repo
+
+    assert [m.reference for m in repo.iter_movements()] == ["M0", "M1", "M2", "M3", "M4", "M5"]
+    assert [m.reference for m in repo.iter_movements(
+        start_date=BASE + timedelta(days=1), end_date=BASE + timedelta(days=4)
+    )] == ["M1", "M2", "M3", "M4"]
+    assert [m.reference for m in repo.iter_movements(movement_type="EXIT", product_id=polo.id)] == ["M3", "M5"]
+    assert all(m.product_id == polo.id for m in repo.iter_movements(product_id=polo.id))
+
+
+def test_export_chunks_ndjson_and_csv(repo, monkeypatch):
+    repo, _ = repo
+    monkeypatch.setattr(routes, "EXPORT_CHUNK_ROWS", 4)
+
+    chunks = list(routes._export_chunks(repo.iter_movements(), "ndjson"))
+    lines = b"".join(chunks).decode().splitlines()
+    assert len(chunks) == 2
+    assert [json.loads(line)["reference"] for line in lines] == ["M0", "M1", "M2", "M3", "M4", "M5"]
+
+    rows = list(csv.DictReader(io.StringIO(b"".join(routes._export_chunks(repo.iter_movements(), "csv")).decode())))
+    assert [r["reference"] for r in rows] == ["M0", "M1", "M2", "M3", "M4", "M5"]
+    assert rows[0]["date"] == "2026-03-01T09:00:00"
+
+    # Sin movimientos el CSV trae solo la cabecera
+    empty = b"".join(routes._export_chunks([], "csv")).decode()
+    assert empty.strip() == ",".join(routes.MovementResponse.model_fields)
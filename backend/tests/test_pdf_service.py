@@ -0,0 +1,30 @@
+from src.infrastructure.services.pdf_service import PDFService
+
+MOVEMENT_DATA = {
+    "product_name": "Laptop",
+    "reference": "GR-001",
+    "quantity": 2,
+    "applicant": "Ana",
+    "return_deadline": "N/A",
+    "recipient_email": "ana@test.com",
+    "is_returnable": True,
+}
+
+
+def test_movement_receipt_stamps_cached_template():
+    service = PDFService()
+    first = service.generate_movement_receipt(MOVEMENT_DATA)
+    second = service.generate_movement_receipt(MOVEMENT_DATA)
+
+    assert first.startswith(b"%PDF")
+    assert b"/FormXob.receipt_static" in first
+    # El mobiliario estático se comprime una sola vez y se reutiliza
+    static_stream = first.split(b"/Subtype /Form")[1].split(b"endstream")[0]
+    assert static_stream in second
+
+
+def test_movement_receipt_without_template_draws_inline():
+    pdf = PDFService().generate_movement_receipt(MOVEMENT_DATA, use_template=False)
+
+    assert pdf.startswith(b"%PDF")
+    assert b"/FormXob.receipt_static" not in pdf
@@ -0,0 +1,99 @@
+import io
+from decimal import Decimal
+
+import pytest
+
+from src.application.services import InventoryService
+from src.domain.entities import Product
+from src.infrastructure.repositories.postgres_repository import PostgreSQLProductRepository
+from src.infrastructure.services.catalog_reader import catalog_format, iter_catalog_rows
+
+CATALOG = (
+    "sku,name,description,retail_price,is_preorder\n"
+    "POLO,Polo azul,Algodón,49.90,\n"
+    "GORRA,Gorra,Visera,,true\n"
+    "MALO,,Sin nombre,10,\n"
+    "\n"
+    "TAZA,Taza,Cerámica,-5,\n"
+    "POLO,Polo azul v2,Algodón pima,59.90,\n"
+).encode()
+
+
+def _rows(content=CATALOG, filename="catalogo.csv"):
+    return iter_catalog_rows(io.BytesIO(content), filename)
+
+
+def test_csv_rows_keep_line_numbers_and_empty_cells():
+    rows = list(_rows())
+
+    assert [n for n, _ in rows] == [2, 3, 4, 6, 7]
+    assert rows[1][1] == {"sku": "GORRA", "name": "Gorra", "description": "Visera", "retail_price": None, "is_preorder": "true"}
+    with pytest.raises(ValueError):
+        catalog_format("catalogo.json")
+
+
+def test_import_upserts_by_sku_and_reports_row_errors(product_repo):
+    existing = product_repo.save(Product(
+        name="Polo", description="-", stock=7, sku="POLO", image_path="uploads/products/images/polo.png"
+    ))
+
+    events = list(InventoryService(product_repo).import_products(_rows(), batch_size=2))
+
+    assert [e["processed"] for e in events[:-1]] == [2, 4, 5]
+    assert events[-1] == {"done": True, "processed": 5, "upserted": 3, "failed": 2}
+    errors = [err for e in events[:-1] for err in e["errors"]]
+    assert [err["row"] for err in errors] == [4, 6]
+    assert "name" in errors[0]["error"] and "retail_price" in errors[1]["error"]
+
+    polo = product_repo.find_by_sku("POLO")
+    # Mismo producto: conserva ID, stock y las columnas que no vienen en el archivo
+    assert (polo.id, polo.stock, polo.image_path) == (existing.id, 7, "uploads/products/images/polo.png")
+    assert (polo.name, polo.retail_price) == ("Polo azul v2", Decimal("59.90"))
+    gorra = product_repo.find_by_sku("GORRA")
+    assert (gorra.stock, gorra.is_preorder, gorra.retail_price) == (0, True, None)
+    assert product_repo.find_by_sku("MALO") is None
+
+
+def test_blank_cells_keep_the_current_values(product_repo):
+    product_repo.save(Product(
+        name="Polo", description="-", stock=3, sku="POLO", retail_price=Decimal("10"), is_preorder=True
+    ))
+    content = "sku,name,description,retail_price,is_preorder\nPOLO,Polo v2,d,,\nGORRA,Gorra,Visera,,\n"
+
+    events = list(InventoryService(product_repo).import_products(_rows(content.encode())))
+
+    assert events[-1]["upserted"] == 2
+    polo = product_repo.find_by_sku("POLO")
+    assert (polo.name, polo.retail_price, polo.is_preorder) == ("Polo v2", Decimal("10"), True)
+    gorra = product_repo.find_by_sku("GORRA")
+    assert (gorra.retail_price, gorra.is_preorder) == (None, False)
+
+
+def test_import_runs_one_upsert_per_batch(db_session, count_statements):
+    repo = PostgreSQLProductRepository(db_session)
+    content = "sku,name,description\n" + "".join(f"SKU-{i},Producto {i},-\n" for i in range(25))
+
+    with count_statements() as statements:
+        events = list(InventoryService(repo).import_products(_rows(content.encode()), batch_size=10))
+
+    assert events[-1]["upserted"] == 25
+    assert sum(s.startswith("INSERT") for s in statements) == 3
+    assert len(repo.find_all(limit=100)) == 25
+
+
+def test_xlsx_rows_are_read_in_streaming_mode():
+    openpyxl = pytest.importorskip("openpyxl")
+    workbook = openpyxl.Workbook()
+    sheet = workbook.active
+    sheet.append(["sku", "name", "description", "retail_price"])
+    sheet.append(["POLO", "Polo", "Algodón", 49.9])
+    sheet.append([None, None, None, None])
+    sheet.append(["GORRA", "Gorra", "Visera", None])
+    buffer = io.BytesIO()
+    workbook.save(buffer)
+
+    rows = list(_rows(buffer.getvalue(), "catalogo.xlsx"))
+
+    assert [n for n, _ in rows] == [2, 4]
+    assert rows[0][1]["retail_price"] == 49.9
+    assert rows[1][1]["retail_price"] is None
@@ -0,0 +1,85 @@
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import text
+
+from src.application.services import InventoryService
+from src.domain.entities import Product
+from src.infrastructure.database.product_search import fts5_query_text, search_terms, tsquery_text
+from src.infrastructure.repositories.postgres_repository import PostgreSQLProductRepository
+
+CATALOG = [
+    # (sku, nombre, descripción, stock, precio)
+    ("POLO-AZ", "Polo azul", "Algodón pima", 5, "49.90"),
+    ("POLO-RJ", "Polo rojo", "Algodón", 0, "49.90"),
+    ("GORRA-01", "Gorra", "Visera azul marino", 3, "20.00"),
+    ("TAZA-01", "Taza", "Cerámica", 8, None),
+]
+
+
+@pytest.fixture
+def repo(product_repo):
+    repo = product_repo
+    for sku, name, description, stock, price in CATALOG:
+        repo.save(Product(
+            name=name, description=description, stock=stock, sku=sku,
+            retail_price=Decimal(price) if price else None
+        ))
+    return repo
+
+
+def _skus(products):
+    return [p.sku for p in products]
+
+
+def test_query_terms_are_sanitized():
+    assert search_terms("  Polo & (azul):* ") == ["polo", "azul"]
+    assert tsquery_text(["polo", "az"]) == "polo:* & az:*"
+    assert fts5_query_text(["polo", "az"]) == '"polo"* "az"*'
+
+
+def test_every_word_matches_as_prefix(repo):
+    service = InventoryService(repo)
+
+    assert _skus(service.search_products("pol az")) == ["POLO-AZ"]
+    assert _skus(service.search_products("taz")) == ["TAZA-01"]
+    assert _skus(service.search_products("gorra-01")) == ["GORRA-01"]
+    assert service.search_products("polo verde") == []
+    assert service.search_products(" & ") == []
+
+
+def test_results_are_ranked_and_paginated(repo):
+    # "azul" en el nombre pesa más que en la descripción
+    assert _skus(repo.search("azul")) == ["POLO-AZ", "GORRA-01"]
+    ranked = _skus(repo.search("polo"))
+    assert sorted(ranked) == ["POLO-AZ", "POLO-RJ"]
+    assert _skus(repo.search("polo", skip=1, limit=1)) == ranked[1:]
+
+
+def test_public_search_only_returns_storefront_products(repo):
+    # POLO-RJ no tiene stock y TAZA-01 no tiene precio
+    assert _skus(repo.search("polo", public_only=True)) == ["POLO-AZ"]
+    assert repo.search("taza", public_only=True) == []
+
+
+def test_index_follows_updates_and_deletes(db_session):
+    repo = PostgreSQLProductRepository(db_session)
+    product = repo.save(Product(name="Polo", description="-", stock=1, sku="P-1"))
+
+    product.name = "Casaca"
+    repo.save(product)
+    assert repo.search("polo") == []
+    assert _skus(repo.search("casaca")) == ["P-1"]
+
+    repo.delete(product.id)
+    assert repo.search("casaca") == []
+
+
+def test_falls_back_to_like_without_fts(db_session):
+    repo = PostgreSQLProductRepository(db_session)
+    repo.save(Product(name="Polo azul", description="Algodón", stock=1, sku="POLO_AZ"))
+    repo.save(Product(name="Polo rojo", description="Algodón", stock=1, sku="POLOXAZ"))
+    db_session.execute(text("DROP TABLE products_fts"))
+
+    assert _skus(repo.search("polo azul")) == ["POLO_AZ"]
+    assert _skus(repo.search("o_a")) == ["POLO_AZ"]
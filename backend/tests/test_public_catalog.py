@@ -0,0 +1,176 @@
+from datetime import timedelta
+from decimal import Decimal
+from itertools import product as combinations
+from uuid import uuid4
+
+import pytest
+
+from src.application.ecommerce_service import EcommerceService
+from src.domain.catalog_entities import (
+    AVAILABILITIES, COMING_SOON, IN_STOCK, PREORDER, CatalogQuery, public_availability,
+)
+from src.domain.entities import Product, get_local_time
+from src.infrastructure.database.models import PurchaseOrderModel, SupplierModel
+from src.infrastructure.repositories.in_memory_repository import InMemoryProductRepository
+from src.infrastructure.repositories.postgres_repository import PostgreSQLProductRepository
+
+FUTURE = get_local_time().replace(tzinfo=None) + timedelta(days=10)
+PAST = get_local_time().replace(tzinfo=None) - timedelta(days=10)
+
+
+def _add_pending_purchase(db_session, product_id):
+    supplier = db_session.query(SupplierModel).first()
+    if supplier is None:
+        supplier = SupplierModel(id=str(uuid4()), name="Proveedor SAC", email="p@test.com", ruc="20123456789")
+        db_session.add(supplier)
+    db_session.add(PurchaseOrderModel(
+        id=str(uuid4()), supplier_id=supplier.id, product_id=str(product_id), quantity=10,
+        unit_price=Decimal("5.00"), total_amount=Decimal("50.00"), status="PENDING"
+    ))
+    db_session.commit()
+
+
+def _save(repo, db_session, pending=False, **fields):
+    product = Product(has_pending_purchase_orders=pending and isinstance(repo, InMemoryProductRepository), **fields)
+    repo.save(product)
+    if pending and isinstance(repo, PostgreSQLProductRepository):
+        _add_pending_purchase(db_session, product.id)
+    return product
+
+
+@pytest.fixture
+def repo(product_repo, db_session):
+    repo = product_repo
+    for sku, name, description, stock, price, extra in [
+        ("POLO-AZ", "Polo azul", "Algodón pima", 5, "49.90", {}),
+        ("POLO-RJ", "Polo rojo", "Algodón", 0, "49.90",
+         {"is_preorder": True, "preorder_price": Decimal("39.90"), "estimated_delivery_date": FUTURE}),
+        ("CASACA", "Casaca", "Impermeable", 2, "120.00",
+         {"is_preorder": True, "preorder_price": Decimal("99.00"), "estimated_delivery_date": FUTURE}),
+        ("GORRA", "Gorra", "Visera azul", 3, "20.00", {}),
+        ("TERMO", "Termo", "Acero", 0, "250.00", {"pending": True}),
+        ("TAZA", "Taza", "Sin precio", 8, None, {}),
+        ("LLAVERO", "Llavero", "Agotado", 0, "10.00", {}),
+    ]:
+        _save(
+            repo, db_session, name=name, description=description, stock=stock, sku=sku,
+            retail_price=Decimal(price) if price else None, **extra
+        )
+    return repo
+
+
+def _skus(products):
+    return [p.sku for p in products]
+
+
+def test_default_listing_is_visible_products_by_name(repo):
+    assert _skus(repo.find_public(CatalogQuery())) == ["CASACA", "GORRA", "POLO-AZ", "POLO-RJ", "TERMO"]
+
+
+def test_sorts_by_displayed_price_and_paginates(repo):
+    ascending = _skus(repo.find_public(CatalogQuery(sort="price_asc")))
+
+    # CASACA y POLO-RJ se ordenan por su precio de preventa
+    assert ascending == ["GORRA", "POLO-RJ", "POLO-AZ", "CASACA", "TERMO"]
+    assert _skus(repo.find_public(CatalogQuery(sort="price_desc"))) == ascending[::-1]
+    assert _skus(repo.find_public(CatalogQuery(sort="price_asc"), skip=1, limit=2)) == ["POLO-RJ", "POLO-AZ"]
+
+
+def test_filters_by_price_range_and_availability(repo):
+    # CASACA cuesta 120 pero se muestra a 99 en preventa
+    in_range = repo.find_public(CatalogQuery(min_price=Decimal("30"), max_price=Decimal("100")))
+    assert _skus(in_range) == ["CASACA", "POLO-AZ", "POLO-RJ"]
+
+    assert _skus(repo.find_public(CatalogQuery(availability=(PREORDER,)))) == ["CASACA", "POLO-RJ"]
+    assert _skus(repo.find_public(CatalogQuery(availability=(IN_STOCK,)))) == ["GORRA", "POLO-AZ"]
+    assert _skus(repo.find_public(CatalogQuery(availability=(COMING_SOON,)))) == ["TERMO"]
+    # Varias disponibilidades: cualquiera de ellas (la pestaña "Disponibles" de la tienda)
+    assert _skus(repo.find_public(CatalogQuery(availability=(IN_STOCK, COMING_SOON)))) == ["GORRA", "POLO-AZ", "TERMO"]
+
+
+def test_search_combines_with_filters(repo):
+    assert _skus(repo.find_public(CatalogQuery(q="azul", availability=(IN_STOCK,), sort="price_asc"))) == ["GORRA", "POLO-AZ"]
+    assert _skus(repo.find_public(CatalogQuery(q="polo", max_price=Decimal("40")))) == ["POLO-RJ"]
+    assert _skus(repo.find_public(CatalogQuery(q="taza"))) == []
+    assert repo.find_public(CatalogQuery(q=" & ")) == []
+
+
+def test_each_facet_ignores_its_own_filter(repo):
+    facets = repo.public_facets(CatalogQuery(availability=(PREORDER,), min_price=Decimal("30")))
+
+    assert facets["total"] == 2
+    assert facets["availability"] == {IN_STOCK: 1, PREORDER: 2, COMING_SOON: 1}
+    price = facets["price"]
+    assert (price["min"], price["max"]) == (Decimal("39.90"), Decimal("99.00"))
+    assert [band["count"] for band in price["bands"]] == [1, 1, 0, 0]
+    assert price["bands"][-1]["max"] is None
+
+
+def test_facets_without_matches(repo):
+    facets = repo.public_facets(CatalogQuery(q="inexistente"))
+
+    assert facets["total"] == 0
+    assert facets["availability"] == {a: 0 for a in AVAILABILITIES}
+    assert facets["price"]["min"] is None and [b["count"] for b in facets["price"]["bands"]] == [0, 0, 0, 0]
+
+
+@pytest.mark.parametrize("stock, marked, pending, delivery, expected", [
+    (0, True, False, FUTURE, PREORDER),
+    (5, True, False, None, PREORDER),
+    (0, True, False, PAST, COMING_SOON),
+    (0, False, True, None, COMING_SOON),
+    (5, True, True, PAST, IN_STOCK),
+    (0, False, False, None, None),
+])
+def test_preorder_ends_at_the_estimated_date(stock, marked, pending, delivery, expected):
+    # Preventa solo mientras el checkout cobra el precio de preventa; luego, sin stock, "próximo arribo"
+    product = Product(
+        name="Polo", description="-", stock=stock, sku="P-1", retail_price=Decimal("50"), is_preorder=marked,
+        preorder_price=Decimal("40"), estimated_delivery_date=delivery, has_pending_purchase_orders=pending
+    )
+
+    assert public_availability(product, get_local_time()) == expected
+
+
+def test_sql_availability_matches_domain_rules(db_session):
+    repo = PostgreSQLProductRepository(db_session)
+    for i, (stock, marked, pending, delivery, price) in enumerate(
+        combinations((0, 3), (False, True), (False, True), (None, PAST, FUTURE), (None, "0", "15.00"))
+    ):
+        _save(
+            repo, db_session, pending=pending, name=f"Producto {i:03d}", description="-", stock=stock,
+            sku=f"SKU-{i:03d}", retail_price=Decimal(price) if price else None, is_preorder=marked,
+            preorder_price=Decimal("12.00") if marked else None, estimated_delivery_date=delivery
+        )
+
+    now = get_local_time()
+    expected = {a: [] for a in AVAILABILITIES}
+    for product in repo.find_all(limit=500):
+        availability = public_availability(repo.find_by_id(product.id), now)
+        if availability is not None:
+            expected[availability].append(product.sku)
+
+    for availability in AVAILABILITIES:
+        found = repo.find_public(CatalogQuery(availability=(availability,)), limit=500)
+        assert sorted(_skus(found)) == sorted(expected[availability])
+    assert sum(repo.public_facets(CatalogQuery())["availability"].values()) == sum(map(len, expected.values()))
+
+
+def test_facets_run_in_a_single_query(db_session, count_statements):
+    repo = PostgreSQLProductRepository(db_session)
+    _save(repo, db_session, name="Polo", description="-", stock=1, sku="P-1", retail_price=Decimal("10"))
+
+    with count_statements() as statements:
+        repo.public_facets(CatalogQuery(q="polo", min_price=Decimal("5")))
+
+    # Además de la consulta de conteos solo se consulta si existe el índice FTS5
+    assert len([s for s in statements if "sqlite_master" not in s]) == 1
+
+
+def test_service_rejects_inverted_price_range():
+    service = EcommerceService(InMemoryProductRepository(), sales_repository=None, stripe_service=None)
+
+    with pytest.raises(ValueError):
+        service.list_public_products(CatalogQuery(min_price=Decimal("50"), max_price=Decimal("10")))
+    with pytest.raises(ValueError):
+        service.public_catalog_facets(CatalogQuery(sort="popular"))
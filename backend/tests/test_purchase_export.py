@@ -0,0 +1,69 @@
+import io
+import zipfile
+from datetime import datetime, timedelta
+from decimal import Decimal
+from uuid import UUID, uuid4
+
+import pytest
+
+from src.application.purchase_service import PurchaseService
+from src.domain.purchase_entities import PurchaseOrder
+from src.infrastructure.database.models import ProductModel, SupplierModel
+from src.infrastructure.repositories.postgres_purchase_repository import PostgresPurchaseRepository
+from src.infrastructure.services.zip_stream import stream_zip
+
+
+@pytest.fixture
+def purchase_service(db_session):
+    product = ProductModel(id=str(uuid4()), name="Laptop", description="Laptop", stock=0, sku="LAP-001")
+    supplier = SupplierModel(id=str(uuid4()), name="Proveedor SAC", email="p@test.com", ruc="20123456789")
+    db_session.add_all([product, supplier])
+    db_session.commit()
+
+    repo = PostgresPurchaseRepository(db_session)
+    orders = []
+    for i in range(5):
+        orders.append(repo.add_purchase_order(PurchaseOrder(
+            supplier_id=UUID(supplier.id),
+            product_id=UUID(product.id),
+            quantity=i + 1,
+            unit_price=Decimal("10.00"),
+            total_amount=Decimal("11.80") * (i + 1),
+            created_at=datetime(2026, 1, 1, 10, 0, 0) + timedelta(days=i),
+        )))
+    return PurchaseService(repo), orders
+
+
+def _read_zip(chunks):
+    return zipfile.ZipFile(io.BytesIO(b"".join(chunks)))
+
+
+def test_stream_zip_emits_one_chunk_per_entry():
+    chunks = list(stream_zip([("a.txt", b"hola"), ("b.txt", b"mundo")]))
+    assert len(chunks) >= 2
+    zf = _read_zip(chunks)
+    assert zf.read("a.txt") == b"hola"
+    assert zf.read("b.txt") == b"mundo"
+
+
+def test_export_by_ids(purchase_service):
+    service, orders = purchase_service
+    selected = [orders[0].id, orders[3].id]
+
+    zf = _read_zip(service.export_orders_pdf_zip(order_ids=selected))
+
+    names = sorted(zf.namelist())
+    assert names == sorted(f"OC-{str(o.id)[:8]}.pdf" for o in (orders[0], orders[3]))
+    for name in names:
+        assert zf.read(name).startswith(b"%PDF")
+
+
+def test_export_by_date_range(purchase_service):
+    service, orders = purchase_service
+
+    zf = _read_zip(service.export_orders_pdf_zip(
+        start_date=datetime(2026, 1, 2),
+        end_date=datetime(2026, 1, 4, 23, 59, 59),
+    ))
+
+    assert len(zf.namelist()) == 3
@@ -0,0 +1,74 @@
+from datetime import datetime, timedelta
+from decimal import Decimal
+from uuid import UUID, uuid4
+
+import pytest
+
+from src.application.purchase_service import PurchaseService
+from src.domain.purchase_entities import PurchaseOrder
+from src.infrastructure.database.models import ProductModel, SupplierModel
+from src.infrastructure.repositories.postgres_purchase_repository import PostgresPurchaseRepository
+
+
+@pytest.fixture
+def kpi_setup(db_session):
+    product = ProductModel(id=str(uuid4()), name="Laptop", description="Laptop", stock=0, sku="LAP-001")
+    suppliers = [
+        SupplierModel(id=str(uuid4()), name=f"Proveedor {i}", email=f"p{i}@test.com", ruc=f"2012345678{i}")
+        for i in range(2)
+    ]
+    db_session.add_all([product, *suppliers])
+    db_session.commit()
+
+    repo = PostgresPurchaseRepository(db_session)
+    expected = datetime(2026, 2, 1)
+    # 150 órdenes: más que el límite por defecto de get_purchase_orders
+    for i in range(150):
+        repo.add_purchase_order(PurchaseOrder(
+            supplier_id=UUID(suppliers[i % 2].id),
+            product_id=UUID(product.id),
+            quantity=1,
+            unit_price=Decimal("10.00"),
+            total_amount=Decimal("10.00"),
+            savings_amount=Decimal("1.00"),
+            is_rejected=i % 10 == 0,
+            expected_delivery_date=expected,
+            actual_delivery_date=(expected - timedelta(days=1) if i % 3 else expected + timedelta(days=1)) if i < 60 else None,
+            created_at=datetime(2026, 1, 1) + timedelta(hours=i),
+        ))
+    return PurchaseService(repo), suppliers
+
+
+def test_kpis_cover_all_orders(kpi_setup):
+    service, _ = kpi_setup
+
+    kpis = service.calculate_kpis()
+
+    assert kpis.total_orders == 150
+    assert kpis.rejected_orders == 15
+    assert kpis.quality_rate == pytest.approx(10.0)
+    assert kpis.total_cta == Decimal("1500.00")
+    assert kpis.total_savings == Decimal("150.00")
+    # 60 entregadas, 40 a tiempo (i % 3 != 0)
+    assert kpis.on_time_delivery_rate == pytest.approx(40 / 60 * 100)
+
+
+def test_kpis_filter_by_supplier_and_date(kpi_setup):
+    service, suppliers = kpi_setup
+
+    kpis = service.calculate_kpis(
+        start_date=datetime(2026, 1, 1),
+        end_date=datetime(2026, 1, 1, 23, 59, 59),
+        supplier_id=UUID(suppliers[0].id),
+    )
+
+    assert kpis.total_orders == 12
+    assert kpis.total_cta == Decimal("120.00")
+
+
+def test_kpis_empty(db_session):
+    kpis = PurchaseService(PostgresPurchaseRepository(db_session)).calculate_kpis()
+
+    assert kpis.total_orders == 0
+    assert kpis.quality_rate == 0.0
+    assert kpis.total_cta == Decimal("0.00")
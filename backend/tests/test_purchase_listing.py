@@ -0,0 +1,92 @@
+from datetime import datetime, timedelta
+from decimal import Decimal
+from uuid import UUID, uuid4
+
+import pytest
+
+from src.application.purchase_service import PurchaseService
+from src.domain.purchase_entities import PurchaseOrder
+from src.infrastructure.database.models import ProductModel, SupplierModel
+from src.infrastructure.repositories.postgres_purchase_repository import PostgresPurchaseRepository
+
+
+@pytest.fixture
+def purchase_service(db_session):
+    product = ProductModel(id=str(uuid4()), name="Laptop", description="Laptop", stock=0, sku="LAP-001")
+    suppliers = [
+        SupplierModel(id=str(uuid4()), name=f"Proveedor {i}", email=f"p{i}@test.com", ruc=f"2012345678{i}")
+        for i in range(2)
+    ]
+    db_session.add_all([product, *suppliers])
+    db_session.commit()
+
+    repo = PostgresPurchaseRepository(db_session)
+    base = datetime(2026, 3, 1, 12, 0, 0)
+    for i in range(25):
+        repo.add_purchase_order(PurchaseOrder(
+            supplier_id=UUID(suppliers[i % 2].id),
+            product_id=UUID(product.id),
+            quantity=1,
+            unit_price=Decimal("10.00"),
+            total_amount=Decimal("10.00"),
+            status="RECEIVED" if i % 5 == 0 else "PENDING",
+            # Pares de órdenes con el mismo created_at para probar el desempate por id
+            created_at=base + timedelta(hours=i // 2),
+        ))
+    supplier_ids = [UUID(s.id) for s in suppliers]
+    # Sin objetos en la sesión: proveedor y producto deben venir en la misma consulta
+    db_session.expunge_all()
+    return PurchaseService(repo), supplier_ids
+
+
+def test_keyset_pagination_walks_all_orders_once(purchase_service):
+    service, _ = purchase_service
+
+    seen, cursor, pages = [], None, 0
+    while True:
+        orders, cursor = service.list_purchase_orders(limit=10, cursor=cursor)
+        seen.extend(orders)
+        pages += 1
+        if not cursor:
+            break
+
+    assert pages == 3
+    assert len({o.id for o in seen}) == 25
+    keys = [(o.created_at, str(o.id)) for o in seen]
+    assert keys == sorted(keys, reverse=True)
+
+
+def test_listing_is_a_single_query(purchase_service, count_statements):
+    service, supplier_ids = purchase_service
+
+    with count_statements() as statements:
+        orders, cursor = service.list_purchase_orders(
+            status="PENDING",
+            supplier_id=supplier_ids[0],
+            start_date=datetime(2026, 3, 1, 12, 0, 0),
+            end_date=datetime(2026, 3, 2, 23, 59, 59),
+        )
+
+    # i par, i % 5 != 0 -> 2, 4, 6, 8, 12, 14, 16, 18, 22, 24
+    assert len(orders) == 10
+    assert cursor is None
+    assert all(o.supplier_name == "Proveedor 0" and o.product_name == "Laptop" for o in orders)
+    assert len(statements) == 1
+
+
+def test_get_purchase_order_is_a_single_query(purchase_service, count_statements):
+    service, _ = purchase_service
+    (orders, _) = service.list_purchase_orders(limit=1)
+
+    with count_statements() as statements:
+        order = service.repo.get_purchase_order(orders[0].id)
+
+    assert order.supplier_name is not None and order.product_name == "Laptop"
+    assert len(statements) == 1
+
+
+def test_invalid_cursor_raises_value_error(purchase_service):
+    service, _ = purchase_service
+
+    with pytest.raises(ValueError):
+        service.list_purchase_orders(cursor="not-a-cursor")
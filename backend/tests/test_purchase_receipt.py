@@ -0,0 +1,66 @@
+from datetime import datetime
+from decimal import Decimal
+from uuid import UUID, uuid4
+
+import pytest
+from sqlalchemy import text
+
+from scripts import migrate_db
+from src.application.purchase_service import PurchaseService
+from src.application.services import InventoryService
+from src.domain.purchase_entities import PurchaseOrder
+from src.infrastructure.database.models import MovementModel, ProductModel, SupplierModel
+from src.infrastructure.repositories.postgres_purchase_repository import PostgresPurchaseRepository
+from src.infrastructure.repositories.postgres_repository import PostgreSQLProductRepository
+
+
+@pytest.fixture
+def order_setup(db_session):
+    product = ProductModel(id=str(uuid4()), name="Laptop", description="Laptop", stock=0, sku="LAP-001")
+    supplier = SupplierModel(id=str(uuid4()), name="Proveedor SAC", email="p@test.com", ruc="20123456789")
+    db_session.add_all([product, supplier])
+    db_session.commit()
+
+    repo = PostgresPurchaseRepository(db_session)
+    order = repo.add_purchase_order(PurchaseOrder(
+        supplier_id=UUID(supplier.id),
+        product_id=UUID(product.id),
+        quantity=5,
+        unit_price=Decimal("10.00"),
+        total_amount=Decimal("59.00"),
+        created_at=datetime(2026, 1, 1, 10, 0, 0),
+    ))
+    inventory = InventoryService(PostgreSQLProductRepository(db_session))
+    return PurchaseService(repo, inventory), inventory, order, product
+
+
+def test_received_order_adds_stock_once_regardless_of_ledger_size(db_session, order_setup):
+    service, inventory, order, product = order_setup
+    # Más de una página de movimientos: la verificación anterior solo veía los últimos 100
+    for i in range(120):
+        inventory.receive_stock(UUID(product.id), 1, reference=f"Entrada {i}")
+
+    service.update_order_status(order.id, status="RECEIVED")
+    service.update_order_status(order.id, status="RECEIVED")
+
+    receipts = db_session.query(MovementModel).filter(MovementModel.purchase_order_id == str(order.id)).all()
+    assert len(receipts) == 1
+    assert inventory.get_product(UUID(product.id)).stock == 125
+    assert inventory.has_purchase_order_receipt(order.id)
+
+
+def test_migration_backfills_purchase_order_id_from_reference(db_engine, db_session, order_setup):
+    _, _, order, product = order_setup
+    oc_ref = f"OC {str(order.id)[:8]}"
+    with db_engine.begin() as conn:
+        for i, reference in enumerate([f"ENTRADA POR COMPRA: {oc_ref} | Factura: N/A", f"ENTRADA POR COMPRA: {oc_ref} (duplicada)", "OC zzzz"]):
+            conn.execute(
+                text("INSERT INTO movements (id, product_id, quantity, type, reference, date) VALUES (:id, :product_id, 5, 'INGRESO', :reference, :date)"),
+                {"id": str(uuid4()), "product_id": product.id, "reference": reference, "date": datetime(2026, 1, 2, 10, i)}
+            )
+        migrate_db.movements_purchase_order_id(conn)
+        # Idempotente
+        migrate_db.movements_purchase_order_id(conn)
+
+    linked = db_session.query(MovementModel).filter(MovementModel.purchase_order_id == str(order.id)).all()
+    assert [m.reference for m in linked] == [f"ENTRADA POR COMPRA: {oc_ref} | Factura: N/A"]
@@ -0,0 +1,66 @@
+from datetime import timedelta
+from uuid import uuid4
+
+import pytest
+
+from src.domain.entities import Movement, Product, get_local_time
+from src.infrastructure.database.models import PurchaseOrderModel, SupplierModel
+from src.infrastructure.repositories.postgres_repository import PostgreSQLProductRepository
+
+
+@pytest.fixture
+def repo(db_session):
+    return PostgreSQLProductRepository(db_session)
+
+
+def test_slotted_entities_reject_unknown_attributes():
+    product = Product(name="Polo", description="-", stock=1, sku="SKU-1")
+
+    with pytest.raises(AttributeError):
+        product.colour = "rojo"
+    assert not hasattr(product, "__dict__")
+
+
+def test_product_listing_is_a_single_query(repo, db_session, count_statements):
+    pending = repo.save(Product(name="Polo", description="-", stock=1, sku="SKU-1"))
+    repo.save(Product(name="Gorra", description="-", stock=2, sku="SKU-2", is_preorder=True))
+    supplier = SupplierModel(id=str(uuid4()), name="Proveedor SAC", email="p@test.com", ruc="20123456789")
+    db_session.add(supplier)
+    db_session.add(PurchaseOrderModel(
+        id=str(uuid4()), supplier_id=supplier.id, product_id=str(pending.id), quantity=5,
+        unit_price=10, total_amount=50, status="PENDING"
+    ))
+    db_session.commit()
+    db_session.expunge_all()
+
+    with count_statements() as statements:
+        products = {p.sku: p for p in repo.find_all()}
+
+    assert len(statements) == 1
+    assert products["SKU-1"].id == pending.id
+    assert products["SKU-1"].has_pending_purchase_orders is True
+    assert products["SKU-2"].has_pending_purchase_orders is False
+    assert products["SKU-2"].is_preorder is True
+
+
+def test_movement_listing_is_a_single_query(repo, db_session, count_statements):
+    product = repo.save(Product(name="Polo", description="-", stock=1, sku="SKU-1"))
+    base = get_local_time()
+    entry = repo.save_movement(Movement(
+        product_id=product.id, quantity=1, type="ENTRY", reference="GR-1", date=base
+    ))
+    repo.save_movement(Movement(
+        product_id=product.id, quantity=1, type="EXIT", reference="GS-1", parent_id=entry.id,
+        product_name="Polo (histórico)", date=base + timedelta(minutes=1)
+    ))
+    db_session.expunge_all()
+
+    with count_statements() as statements:
+        exit_, first = repo.find_all_movements()
+
+    assert len(statements) == 1
+    assert first.id == entry.id and first.product_id == product.id
+    assert first.product_name == "Polo"
+    assert exit_.parent_id == entry.id
+    assert exit_.product_name == "Polo (histórico)"
+    assert [m.reference for m in repo.find_all_movements(skip=1, limit=1)] == ["GR-1"]
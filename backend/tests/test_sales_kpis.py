@@ -0,0 +1,89 @@
+from datetime import timedelta
+from decimal import Decimal
+from uuid import UUID, uuid4
+
+import pytest
+
+from src.domain.entities import get_local_time
+from src.domain.sales_entities import SalesOrder
+from src.infrastructure.database.models import ProductModel
+from src.infrastructure.repositories import postgres_sales_repository
+from src.infrastructure.repositories.postgres_sales_repository import PostgresSalesRepository
+
+
+def _order(product_id: str, total: str, status: str = "PENDING", days_ago: int = 0) -> SalesOrder:
+    amount = Decimal(total)
+    return SalesOrder(
+        customer_name="Cliente",
+        customer_email="cliente@test.com",
+        product_id=UUID(product_id),
+        quantity=1,
+        unit_price=amount,
+        subtotal=amount,
+        tax_amount=Decimal("0.00"),
+        total_amount=amount,
+        status=status,
+        created_at=get_local_time() - timedelta(days=days_ago),
+    )
+
+
+@pytest.fixture
+def sales_repo(db_session, monkeypatch):
+    monkeypatch.setattr(postgres_sales_repository, "_kpis_cache", postgres_sales_repository._KPICache(60))
+    products = [
+        ProductModel(id=str(uuid4()), name=f"Producto {i}", description="-", stock=10, sku=f"SKU-{i}")
+        for i in range(7)
+    ]
+    db_session.add_all(products)
+    db_session.commit()
+
+    repo = PostgresSalesRepository(db_session)
+    for i, product in enumerate(products):
+        repo.save(_order(product.id, f"{(i + 1) * 10}.00", status="COMPLETED" if i % 2 else "PENDING"))
+    repo.save(_order(products[0].id, "500.00", days_ago=40))
+    return repo, products
+
+
+def test_kpis_totals_and_top_five(sales_repo):
+    repo, _ = sales_repo
+
+    kpis = repo.get_kpis()
+
+    assert kpis["total_sales_count"] == 8
+    assert kpis["total_revenue"] == pytest.approx(780.0)
+    assert kpis["pending_deliveries"] == 5
+    assert [p["product_name"] for p in kpis["top_selling_products"]] == [
+        "Producto 0", "Producto 6", "Producto 5", "Producto 4", "Producto 3"
+    ]
+    assert kpis["top_selling_products"][0]["revenue"] == pytest.approx(510.0)
+
+
+def test_kpis_time_window(sales_repo):
+    repo, _ = sales_repo
+
+    kpis = repo.get_kpis(window_days=30)
+
+    assert kpis["total_sales_count"] == 7
+    assert kpis["total_revenue"] == pytest.approx(280.0)
+    assert kpis["top_selling_products"][0]["product_name"] == "Producto 6"
+
+
+def test_kpis_run_in_two_queries(sales_repo, count_statements):
+    repo, _ = sales_repo
+
+    with count_statements() as statements:
+        repo.get_kpis()
+
+    assert len(statements) == 2
+
+
+def test_cached_kpis_invalidate_on_write(sales_repo):
+    repo, products = sales_repo
+
+    first = repo.get_cached_kpis()
+    first["total_sales_count"] = -1  # las copias no comparten estado con el caché
+    assert repo.get_cached_kpis()["total_sales_count"] == 8
+
+    repo.save(_order(products[1].id, "1.00"))
+
+    assert repo.get_cached_kpis()["total_sales_count"] == 9
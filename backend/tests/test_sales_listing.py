@@ -0,0 +1,84 @@
+from datetime import datetime, timedelta
+from decimal import Decimal
+from uuid import UUID, uuid4
+
+import pytest
+
+from src.application.sales_service import SalesService
+from src.domain.sales_entities import SalesOrder
+from src.infrastructure.database.models import ProductModel
+from src.infrastructure.repositories.postgres_sales_repository import PostgresSalesRepository
+
+
+@pytest.fixture
+def sales_service(db_session):
+    products = [
+        ProductModel(id=str(uuid4()), name=f"Producto {i}", description="-", stock=10, sku=f"SKU-{i}", image_path=f"img{i}.png")
+        for i in range(2)
+    ]
+    db_session.add_all(products)
+    db_session.commit()
+
+    repo = PostgresSalesRepository(db_session)
+    base = datetime(2026, 3, 1, 12, 0, 0)
+    for i in range(25):
+        repo.save(SalesOrder(
+            customer_name="Cliente",
+            customer_email=f"c{i % 3}@test.com",
+            product_id=UUID(products[i % 2].id),
+            quantity=1,
+            unit_price=Decimal("10.00"),
+            subtotal=Decimal("10.00"),
+            tax_amount=Decimal("1.80"),
+            total_amount=Decimal("11.80"),
+            status="COMPLETED" if i % 5 == 0 else "PENDING",
+            # Pares de órdenes con el mismo created_at para probar el desempate por id
+            created_at=base + timedelta(hours=i // 2),
+        ))
+    product_ids = [UUID(p.id) for p in products]
+    # Sin objetos en la sesión: el producto debe venir en la misma consulta
+    db_session.expunge_all()
+    return SalesService(repo), product_ids
+
+
+def test_keyset_pagination_walks_all_orders_once(sales_service):
+    service, _ = sales_service
+
+    seen, cursor, pages = [], None, 0
+    while True:
+        orders, cursor = service.list_sales_orders(limit=10, cursor=cursor)
+        seen.extend(orders)
+        pages += 1
+        if not cursor:
+            break
+
+    assert pages == 3
+    assert len({o.id for o in seen}) == 25
+    keys = [(o.created_at, str(o.id)) for o in seen]
+    assert keys == sorted(keys, reverse=True)
+
+
+def test_filters_and_eager_product_loading(sales_service, count_statements):
+    service, product_ids = sales_service
+
+    with count_statements() as statements:
+        orders, cursor = service.list_sales_orders(
+            status="PENDING",
+            product_id=product_ids[0],
+            customer_email="c0@test.com",
+            start_date=datetime(2026, 3, 1, 12, 0, 0),
+            end_date=datetime(2026, 3, 2, 23, 59, 59),
+        )
+
+    # i par, i % 3 == 0, i % 5 != 0 -> 6, 12, 18, 24
+    assert len(orders) == 4
+    assert cursor is None
+    assert all(o.product_name == "Producto 0" and o.product_image == "img0.png" for o in orders)
+    assert len(statements) == 1
+
+
+def test_invalid_cursor_raises_value_error(sales_service):
+    service, _ = sales_service
+
+    with pytest.raises(ValueError):
+        service.list_sales_orders(cursor="not-a-cursor")
@@ -0,0 +1,95 @@
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from uuid import uuid4
+
+import pytest
+
+from src.application.ledger_service import LedgerService, end_of_day
+from src.domain.entities import Movement, Product
+from src.domain.ledger_entities import movement_delta
+from src.infrastructure.database.models import PurchaseOrderModel, StockSnapshotModel, SupplierModel
+from src.infrastructure.repositories.postgres_ledger_repository import PostgresLedgerRepository
+from src.infrastructure.repositories.postgres_repository import PostgreSQLProductRepository
+
+DAY = date(2026, 3, 1)
+MOVES = [  # (día, hora, tipo, cantidad)
+    (0, 9, "INGRESO", 10),
+    (0, 15, "CONSUMO INTERNO", 3),
+    (1, 10, "VENTA", 2),
+    (1, 18, "RETURN", 1),
+    (2, 8, "ENTRY", 5),
+    (3, 12, "EXIT", 4),
+]
+
+
+@pytest.fixture
+def ledger(db_session):
+    products = PostgreSQLProductRepository(db_session)
+    polo = products.save(Product(name="Polo", description="-", stock=0, sku="POLO"))
+    gorra = products.save(Product(name="Gorra", description="-", stock=0, sku="GORRA"))
+    for offset, hour, kind, quantity in MOVES:
+        products.save_movement(Movement(
+            product_id=polo.id, quantity=quantity, type=kind, reference=kind,
+            date=datetime.combine(DAY + timedelta(days=offset), datetime.min.time()) + timedelta(hours=hour)
+        ))
+    return LedgerService(PostgresLedgerRepository(db_session)), polo, gorra
+
+
+def _replay(as_of):
+    return sum(
+        movement_delta(kind, quantity)
+        for offset, hour, kind, quantity in MOVES
+        if datetime.combine(DAY + timedelta(days=offset), datetime.min.time()) + timedelta(hours=hour) < as_of
+    )
+
+
+def _stock(service, product, as_of):
+    return service.valuation(as_of, product_id=product.id)["items"][0]["stock"]
+
+
+def test_stock_as_of_matches_a_full_replay(ledger):
+    service, polo, gorra = ledger
+    service.take_daily_snapshot(DAY + timedelta(days=1))
+
+    for hours in range(0, 4 * 24 + 1, 6):
+        as_of = datetime.combine(DAY, datetime.min.time()) + timedelta(hours=hours)
+        assert _stock(service, polo, as_of) == _replay(as_of)
+    assert _stock(service, gorra, end_of_day(DAY + timedelta(days=3))) == 0
+
+
+def test_as_of_replays_only_from_the_nearest_checkpoint(ledger, db_session):
+    service, polo, _ = ledger
+    assert service.take_daily_snapshot(DAY) == 2
+    assert service.take_daily_snapshot(DAY) == 2  # rehacer el checkpoint no lo duplica
+    assert db_session.query(StockSnapshotModel).count() == 2
+
+    # Si el checkpoint se usa, su valor manda sobre los movimientos anteriores
+    snapshot = db_session.query(StockSnapshotModel).filter_by(product_id=str(polo.id)).one()
+    snapshot.stock += 100
+    db_session.commit()
+
+    assert _stock(service, polo, end_of_day(DAY)) == 107
+    assert _stock(service, polo, end_of_day(DAY + timedelta(days=1))) == 106
+    assert _stock(service, polo, datetime.combine(DAY, datetime.min.time()) + timedelta(hours=12)) == 10
+
+
+def test_valuation_uses_the_last_cost_received_before_the_cut(ledger, db_session):
+    service, polo, gorra = ledger
+    supplier = SupplierModel(id=str(uuid4()), name="Proveedor SAC", email="p@test.com", ruc="20123456789")
+    db_session.add(supplier)
+    for day, cost in ((0, "8.00"), (1, "9.50"), (3, "12.00")):
+        db_session.add(PurchaseOrderModel(
+            id=str(uuid4()), supplier_id=supplier.id, product_id=str(polo.id), quantity=1,
+            unit_price=Decimal(cost), total_amount=Decimal(cost), status="RECEIVED",
+            actual_delivery_date=datetime.combine(DAY + timedelta(days=day), datetime.min.time())
+        ))
+    db_session.commit()
+
+    report = service.valuation(end_of_day(DAY + timedelta(days=2)))
+
+    by_sku = {item["sku"]: item for item in report["items"]}
+    assert by_sku["POLO"]["stock"] == 11
+    assert by_sku["POLO"]["unit_cost"] == Decimal("9.50")
+    assert report["total_value"] == Decimal("104.50")
+    assert by_sku["GORRA"]["value"] is None
+    assert report["total_units"] == 11 and report["unvalued_products"] == 0
@@ -0,0 +1,86 @@
+import pytest
+
+from src.application.ledger_service import ReconciliationService
+from src.application.services import InventoryService
+from src.domain.entities import Product
+from src.domain.ledger_entities import ADJUSTMENT_IN, ADJUSTMENT_OUT
+from src.infrastructure.repositories.postgres_ledger_repository import PostgresLedgerRepository
+from src.infrastructure.repositories.postgres_repository import PostgreSQLProductRepository
+
+
+@pytest.fixture
+def setup(db_session):
+    products = PostgreSQLProductRepository(db_session)
+    inventory = InventoryService(products)
+    polo = products.save(Product(name="Polo", description="-", stock=0, sku="POLO"))
+    gorra = products.save(Product(name="Gorra", description="-", stock=0, sku="GORRA"))
+    inventory.receive_stock(polo.id, 10, reference="GR-1")
+    inventory.sell_product(polo.id, 3, reference="GS-1")
+    inventory.receive_stock(gorra.id, 4, reference="GR-2")
+    reconciliation = ReconciliationService(PostgresLedgerRepository(db_session), lag_seconds=0)
+    return reconciliation, inventory, products, polo, gorra
+
+
+def test_runs_only_apply_new_movements(setup):
+    reconciliation, inventory, _, polo, _ = setup
+
+    first = reconciliation.run()
+    assert (first.movements_applied, first.discrepancies) == (3, [])
+
+    inventory.sell_product(polo.id, 2, reference="GS-2")
+    second = reconciliation.run()
+    assert (second.movements_applied, second.discrepancies) == (1, [])
+    assert reconciliation.run().movements_applied == 0
+
+
+def test_flags_stock_written_without_movements(setup):
+    reconciliation, _, products, polo, gorra = setup
+    reconciliation.run()
+
+    # Como la tienda: descuenta stock sin registrar movimiento
+    products.update_stock(gorra.id, 1)
+    run = reconciliation.run()
+
+    assert [(d.sku, d.stock, d.expected_stock, d.difference) for d in run.discrepancies] == [("GORRA", 1, 4, -3)]
+    assert [d.sku for d in reconciliation.pending_discrepancies()] == ["GORRA"]
+
+
+def test_corrects_only_confirmed_discrepancies(setup):
+    reconciliation, _, products, polo, gorra = setup
+    reconciliation.run()
+    products.update_stock(gorra.id, 1)
+    products.update_stock(polo.id, 9)
+
+    detected = reconciliation.run(correct=True)
+    assert [d.corrected for d in detected.discrepancies] == [False, False]
+
+    corrected = reconciliation.run(correct=True)
+    assert corrected.corrections == 2
+    adjustments = {m.product_name: m for m in products.find_all_movements() if m.reference.startswith("CONCILIACION")}
+    assert (adjustments["Gorra"].type, adjustments["Gorra"].quantity) == (ADJUSTMENT_OUT, 3)
+    assert (adjustments["Polo"].type, adjustments["Polo"].quantity) == (ADJUSTMENT_IN, 2)
+
+    after = reconciliation.run(correct=True)
+    assert after.discrepancies == [] and after.movements_applied == 2
+    assert reconciliation.pending_discrepancies() == []
+
+
+def test_movements_after_the_high_water_mark_count_as_expected(db_session, setup):
+    _, inventory, _, polo, _ = setup
+    # Marca una hora atrás: los movimientos recién registrados quedan en la cola
+    lagging = ReconciliationService(PostgresLedgerRepository(db_session), lag_seconds=3600)
+
+    run = lagging.run()
+
+    assert run.movements_applied == 0
+    assert run.discrepancies == []
+
+
+def test_rebuild_recomputes_from_scratch(setup):
+    reconciliation, _, _, _, _ = setup
+    reconciliation.run()
+
+    rebuilt = reconciliation.rebuild()
+
+    assert rebuilt.movements_applied == 3
+    assert rebuilt.discrepancies == []
@@ -0,0 +1,183 @@
+import threading
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+import stripe
+
+from src.application.ecommerce_service import EcommerceService
+from src.application.reservation_service import ReservationService, _checkout_session_ttl_minutes
+from src.application.stripe_service import StripeService
+from src.domain.entities import Product, get_local_time
+from src.domain.exceptions import InsufficientStockError, ProductNotFoundError
+from src.domain.public_schemas import CartItem
+from src.infrastructure.repositories.in_memory_repository import InMemoryProductRepository
+from src.infrastructure.repositories.in_memory_reservation_repository import InMemoryReservationRepository
+from src.infrastructure.repositories.postgres_repository import PostgreSQLProductRepository
+from src.infrastructure.repositories.postgres_reservation_repository import PostgresReservationRepository
+from src.infrastructure.repositories.postgres_sales_repository import PostgresSalesRepository
+
+
+@pytest.fixture
+def repos(product_repo, db_session):
+    if isinstance(product_repo, PostgreSQLProductRepository):
+        return product_repo, PostgresReservationRepository(db_session)
+    return product_repo, InMemoryReservationRepository(product_repo)
+
+
+def _product(products, stock):
+    return products.save(Product(name="Polo", description="-", stock=stock, sku=f"SKU-{uuid4().hex[:8]}"))
+
+
+def test_hold_counts_active_reservations(repos):
+    products, reservations = repos
+    product = _product(products, 5)
+    service = ReservationService(reservations)
+
+    service.hold([(product.id, 3)])
+    with pytest.raises(InsufficientStockError) as exc:
+        service.hold([(product.id, 3)])
+
+    assert exc.value.available == 2
+    assert reservations.reserved_quantities([product.id]) == {product.id: 3}
+
+
+def test_hold_is_all_or_nothing(repos):
+    products, reservations = repos
+    a, b = _product(products, 5), _product(products, 1)
+    service = ReservationService(reservations)
+
+    with pytest.raises(InsufficientStockError):
+        service.hold([(a.id, 2), (b.id, 2)])
+    with pytest.raises(ProductNotFoundError):
+        service.hold([(a.id, 1), (uuid4(), 1)])
+
+    assert reservations.reserved_quantities([a.id, b.id]) == {}
+
+
+def test_release_convert_and_expiry_free_the_stock(repos):
+    products, reservations = repos
+    product = _product(products, 4)
+    service = ReservationService(reservations)
+
+    released, _, _ = service.hold([(product.id, 4)])
+    assert service.release(released) == 1
+    converted, _, _ = service.hold([(product.id, 4)])
+    assert service.convert(converted) == 1
+    assert service.release(converted) == 0
+
+    # Una reserva vencida deja de contar aunque el planificador aún no la marque
+    stale = ReservationService(reservations, ttl_minutes=-1)
+    stale.hold([(product.id, 4)])
+    assert reservations.reserved_quantities([product.id]) == {}
+    assert service.expire_stale() == 1
+    assert service.expire_stale() == 0
+
+
+def test_in_memory_holds_are_atomic_across_threads():
+    products = InMemoryProductRepository()
+    product = _product(products, 10)
+    service = ReservationService(InMemoryReservationRepository(products))
+    results = []
+
+    def worker():
+        try:
+            service.hold([(product.id, 1)])
+            results.append(True)
+        except InsufficientStockError:
+            results.append(False)
+
+    threads = [threading.Thread(target=worker) for _ in range(30)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert results.count(True) == 10
+
+
+@pytest.fixture
+def ecommerce(db_session, monkeypatch):
+    monkeypatch.setenv("MOCK_STRIPE", "true")
+    products = PostgreSQLProductRepository(db_session)
+    reservations = PostgresReservationRepository(db_session)
+    service = EcommerceService(
+        product_repository=products,
+        sales_repository=PostgresSalesRepository(db_session),
+        stripe_service=StripeService(),
+        reservation_service=ReservationService(reservations),
+    )
+    product = products.save(Product(
+        name="Polo", description="-", stock=3, sku="POLO-1", retail_price=Decimal("50.00")
+    ))
+    return service, products, reservations, product
+
+
+def _checkout(service, product, quantity):
+    return service.create_checkout_session(
+        items=[CartItem(product_id=product.id, product_name=product.name, unit_price=50.0, quantity=quantity)],
+        customer_email="cliente@test.com",
+        customer_name="Cliente",
+        shipping_address=None,
+    )
+
+
+def test_checkout_holds_stock_until_the_order_is_created(ecommerce):
+    service, products, reservations, product = ecommerce
+
+    session = _checkout(service, product, 2)
+    # El segundo checkout ve solo 1 unidad disponible
+    with pytest.raises(ValueError, match="Stock insuficiente"):
+        _checkout(service, product, 2)
+
+    service.create_orders_from_session(session["session_id"])
+
+    assert products.find_by_id(product.id).stock == 1
+    assert reservations.reserved_quantities([product.id]) == {}
+    _checkout(service, product, 1)
+
+
+def test_checkout_releases_the_hold_if_stripe_fails(ecommerce, monkeypatch):
+    service, _, reservations, product = ecommerce
+
+    def fail(*args, **kwargs):
+        raise ValueError("Error de Stripe")
+    monkeypatch.setattr(service._stripe, "create_checkout_session", fail)
+
+    with pytest.raises(ValueError):
+        _checkout(service, product, 2)
+
+    assert reservations.reserved_quantities([product.id]) == {}
+    assert reservations.expire(get_local_time() + timedelta(days=1)) == 0
+
+
+def test_live_checkout_expiry_meets_stripe_minimum(ecommerce, monkeypatch):
+    service, _, reservations, product = ecommerce
+    monkeypatch.setenv("MOCK_STRIPE", "false")
+    monkeypatch.setenv("STRIPE_API_KEY", "sk_test_123")
+    sent = {}
+
+    def create(**kwargs):
+        sent["now"] = time.time()
+        sent.update(kwargs)
+        return SimpleNamespace(id="cs_test_1", url="https://checkout.stripe.test/cs_test_1")
+    monkeypatch.setattr(stripe.checkout.Session, "create", create)
+
+    _checkout(service, product, 1)
+
+    assert sent["expires_at"] - sent["now"] >= 30 * 60
+    # La reserva vence exactamente cuando vence la sesión
+    held = datetime.fromtimestamp(sent["expires_at"], get_local_time().tzinfo).replace(tzinfo=None)
+    assert reservations.expire(held - timedelta(seconds=1)) == 0
+    assert reservations.expire(held) == 1
+
+
+@pytest.mark.parametrize("minutes", ["30", "1441"])
+def test_ttl_outside_stripe_limits_is_rejected(monkeypatch, minutes):
+    monkeypatch.setenv("CHECKOUT_SESSION_TTL_MINUTES", minutes)
+
+    with pytest.raises(ValueError, match="CHECKOUT_SESSION_TTL_MINUTES"):
+        _checkout_session_ttl_minutes()
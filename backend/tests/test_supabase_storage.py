@@ -0,0 +1,123 @@
+import asyncio
+import http.server
+import io
+import threading
+
+import pytest
+import pytest_asyncio
+from fastapi import UploadFile
+
+from src.infrastructure.api.uploads import save_upload
+from src.infrastructure.storage import supabase_storage
+
+
+class FakeStorageHandler(http.server.BaseHTTPRequestHandler):
+    """Imita el endpoint POST /storage/v1/object/{bucket}/{path} de Supabase."""
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        server = self.server
+        if "Content-Length" in self.headers:
+            body = self.rfile.read(int(self.headers["Content-Length"]))
+        else:
+            body = self._read_chunked()
+        with server.lock:
+            server.requests.append((self.path, body))
+            fail = server.failures > 0
+            if fail:
+                server.failures -= 1
+        status, payload = (503, b'{"error":"unavailable"}') if fail else (200, b'{"Key":"ok"}')
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _read_chunked(self) -> bytes:
+        body = b""
+        while True:
+            size = int(self.rfile.readline().strip(), 16)
+            if size == 0:
+                self.rfile.readline()
+                return body
+            body += self.rfile.read(size)
+            self.rfile.readline()
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def storage_server(monkeypatch):
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), FakeStorageHandler)
+    server.requests = []
+    server.failures = 0
+    server.lock = threading.Lock()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    monkeypatch.setattr(supabase_storage, "SUPABASE_URL", f"http://127.0.0.1:{server.server_port}")
+    monkeypatch.setattr(supabase_storage, "SUPABASE_SERVICE_ROLE_KEY", "service-key")
+    monkeypatch.setattr(supabase_storage, "STORAGE_RETRY_BACKOFF_SECONDS", 0)
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest_asyncio.fixture(autouse=True)
+async def shared_client():
+    yield
+    # Cada test corre en su propio event loop
+    await supabase_storage.close_client()
+
+
+@pytest.mark.asyncio
+async def test_upload_file_reuses_shared_client(storage_server):
+    url = await supabase_storage.upload_file("images/a.png", b"abc", "image/png")
+    client = supabase_storage.get_client()
+    await supabase_storage.upload_file("images/b.png", b"def", "image/png")
+
+    assert url.endswith("/storage/v1/object/public/products/images/a.png")
+    assert supabase_storage.get_client() is client
+    assert storage_server.requests == [
+        ("/storage/v1/object/products/images/a.png", b"abc"),
+        ("/storage/v1/object/products/images/b.png", b"def"),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_upload_file_retries_on_5xx(storage_server):
+    storage_server.failures = 2
+
+    await supabase_storage.upload_file("specs/a.pdf", b"%PDF-1.4")
+
+    assert len(storage_server.requests) == 3
+
+
+@pytest.mark.asyncio
+async def test_upload_file_gives_up_after_max_retries(storage_server, monkeypatch):
+    monkeypatch.setattr(supabase_storage, "STORAGE_MAX_RETRIES", 1)
+    storage_server.failures = 5
+
+    with pytest.raises(RuntimeError):
+        await supabase_storage.upload_file("specs/a.pdf", b"%PDF-1.4")
+    assert len(storage_server.requests) == 2
+
+
+@pytest.mark.asyncio
+async def test_parallel_streamed_uploads_replay_on_retry(storage_server):
+    storage_server.failures = 1
+    image = UploadFile(file=io.BytesIO(b"\x89PNG\r\n\x1a\n" + b"i" * 200), filename="foto.png")
+    sheet = UploadFile(file=io.BytesIO(b"%PDF-1.4" + b"s" * 200), filename="ficha.pdf")
+
+    image_url, sheet_url = await asyncio.gather(
+        save_upload(image, "products/images", remote_prefix="images"),
+        save_upload(sheet, "products/specs", remote_prefix="specs"),
+    )
+
+    assert "/public/products/images/" in image_url
+    assert "/public/products/specs/" in sheet_url
+    bodies = sorted(body for _, body in storage_server.requests)
+    # Uno de los dos se reintentó tras el 503 con el contenido completo
+    assert len(bodies) == 3
+    assert all(body.endswith(b"i" * 200) or body.endswith(b"s" * 200) for body in bodies)
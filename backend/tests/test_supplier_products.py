@@ -0,0 +1,92 @@
+from decimal import Decimal
+from uuid import UUID, uuid4
+
+import pytest
+from sqlalchemy import select
+
+from src.application.purchase_service import PurchaseService
+from src.infrastructure.database.models import ProductModel, PurchaseOrderModel, supplier_product
+from src.infrastructure.repositories.postgres_purchase_repository import PostgresPurchaseRepository
+
+
+@pytest.fixture
+def setup(db_session):
+    products = [
+        ProductModel(id=str(uuid4()), name=f"Producto {i}", description="-", stock=0, sku=f"SKU-{i}")
+        for i in range(200)
+    ]
+    db_session.add_all(products)
+    db_session.commit()
+    return PurchaseService(PostgresPurchaseRepository(db_session)), [UUID(p.id) for p in products]
+
+
+def _links(db_session, supplier_id):
+    return set(db_session.execute(
+        select(supplier_product.c.product_id).where(supplier_product.c.supplier_id == str(supplier_id))
+    ).scalars())
+
+
+def test_create_supplier_links_products_in_constant_queries(setup, db_session, count_statements):
+    service, product_ids = setup
+
+    with count_statements() as statements:
+        supplier = service.create_supplier(
+            name="Proveedor", email="p@test.com", ruc="20123456789",
+            product_ids=product_ids + [uuid4()],  # un ID inexistente se ignora
+        )
+
+    assert _links(db_session, supplier.id) == {str(p) for p in product_ids}
+    product_lookups = [s for s in statements if "FROM products" in s and "supplier_product" not in s]
+    assert len(product_lookups) == 1
+
+
+def test_update_supplier_applies_only_the_diff(setup, db_session, count_statements):
+    service, product_ids = setup
+    supplier = service.create_supplier(
+        name="Proveedor", email="p@test.com", ruc="20123456789", product_ids=product_ids[:150]
+    )
+
+    with count_statements() as statements:
+        service.update_supplier(supplier.id, name="Proveedor 2", product_ids=product_ids[50:200])
+
+    assert _links(db_session, supplier.id) == {str(p) for p in product_ids[50:200]}
+    deletes = [s for s in statements if s.startswith("DELETE FROM supplier_product")]
+    inserts = [s for s in statements if s.startswith("INSERT INTO supplier_product")]
+    assert len(deletes) == 1 and len(inserts) == 1
+
+
+def test_link_product_to_supplier_is_idempotent(setup, db_session):
+    service, product_ids = setup
+    supplier = service.create_supplier(name="Proveedor", email="p@test.com", ruc="20123456789")
+
+    assert service.repo.link_product_to_supplier(supplier.id, product_ids[0]) is True
+    assert service.repo.link_product_to_supplier(supplier.id, product_ids[0]) is False
+    assert service.repo.link_product_to_supplier(supplier.id, uuid4()) is False
+    assert service.repo.link_product_to_supplier(uuid4(), product_ids[1]) is False
+    assert _links(db_session, supplier.id) == {str(product_ids[0])}
+
+
+def test_supplier_listing_aggregates_products_in_sql(setup, db_session, count_statements):
+    service, product_ids = setup
+    service.create_supplier(
+        name="Vinculado", email="v@test.com", ruc="20123456780", product_ids=product_ids[:3]
+    )
+    buyer = service.create_supplier(name="Comprador", email="c@test.com", ruc="20123456781")
+    # Muchas OC del mismo producto no deben multiplicar filas ni duplicar productos
+    for i in range(50):
+        db_session.add(PurchaseOrderModel(
+            id=str(uuid4()), supplier_id=str(buyer.id), product_id=str(product_ids[i % 2 + 2]),
+            quantity=1, unit_price=Decimal("1.00"), total_amount=Decimal("1.00")
+        ))
+    db_session.commit()
+    db_session.expunge_all()
+
+    with count_statements() as statements:
+        suppliers = service.list_suppliers()
+
+    by_name = {s.name: s for s in suppliers}
+    assert set(by_name["Vinculado"].product_ids) == set(product_ids[:3])
+    assert by_name["Vinculado"].products == ["Producto 0", "Producto 1", "Producto 2"]
+    assert set(by_name["Comprador"].product_ids) == set(product_ids[2:4])
+    assert by_name["Comprador"].products == ["Producto 2", "Producto 3"]
+    assert len(statements) == 2
@@ -0,0 +1,62 @@
+import io
+
+import pytest
+from fastapi import HTTPException, UploadFile
+
+from src.infrastructure.api import uploads
+from src.infrastructure.api.uploads import save_upload
+
+PNG_HEADER = b"\x89PNG\r\n\x1a\n"
+
+
+def _upload(filename: str, content: bytes, size=None) -> UploadFile:
+    return UploadFile(file=io.BytesIO(content), filename=filename, size=size)
+
+
+@pytest.fixture(autouse=True)
+def upload_dir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.delenv("VERCEL", raising=False)
+    return tmp_path / "uploads" / "documents"
+
+
+@pytest.mark.asyncio
+async def test_save_upload_streams_file_to_disk(upload_dir, monkeypatch):
+    monkeypatch.setattr(uploads, "UPLOAD_CHUNK_SIZE", 16)
+    content = PNG_HEADER + b"x" * 100
+
+    path = await save_upload(_upload("foto 1.png", content), "documents")
+
+    assert path.startswith("uploads/documents/")
+    assert path.endswith("_foto_1.png")
+    assert open(path, "rb").read() == content
+
+
+@pytest.mark.asyncio
+async def test_save_upload_rejects_content_not_matching_extension(upload_dir):
+    with pytest.raises(HTTPException) as exc:
+        await save_upload(_upload("factura.pdf", PNG_HEADER + b"data"), "documents")
+    assert exc.value.status_code == 400
+    assert not upload_dir.exists()
+
+
+@pytest.mark.asyncio
+async def test_save_upload_enforces_size_while_reading(upload_dir, monkeypatch):
+    monkeypatch.setattr(uploads, "UPLOAD_CHUNK_SIZE", 16)
+    monkeypatch.setattr(uploads, "MAX_FILE_SIZE", 64)
+
+    with pytest.raises(HTTPException) as exc:
+        await save_upload(_upload("guia.pdf", b"%PDF-1.4" + b"x" * 100), "documents")
+    assert exc.value.status_code == 413
+    assert list(upload_dir.iterdir()) == []
+
+
+@pytest.mark.asyncio
+async def test_save_upload_rejects_declared_size_before_reading(monkeypatch):
+    monkeypatch.setattr(uploads, "MAX_FILE_SIZE", 64)
+    file = _upload("guia.pdf", b"%PDF-1.4", size=1024)
+
+    with pytest.raises(HTTPException) as exc:
+        await save_upload(file, "documents")
+    assert exc.value.status_code == 413
+    assert file.file.tell() == 0
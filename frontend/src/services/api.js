@@ -8,6 +8,20 @@ const api = axios.create({
     },
 });
 
+// Listados con paginación por cursor: pide páginas hasta que no llegue `X-Next-Cursor`
+const PAGE_SIZE = 500;
+const getAllPages = async (url, params = {}) => {
+    const items = [];
+    let cursor;
+    let response;
+    do {
+        response = await api.get(url, { params: { ...params, limit: PAGE_SIZE, cursor } });
+        items.push(...response.data);
+        cursor = response.headers['x-next-cursor'];
+    } while (cursor);
+    return { ...response, data: items };
+};
+
 export const inventoryService = {
     getProducts: () => api.get('/products'),
     getProduct: (id) => api.get(`/products/${id}`),
@@ -69,7 +83,7 @@ export const inventoryService = {
 export const purchasingService = {
     getSuppliers: () => api.get('/purchasing/suppliers'),
     createSupplier: (data) => api.post('/purchasing/suppliers', data),
-    getOrders: () => api.get('/purchasing/orders'),
+    getOrders: (params) => getAllPages('/purchasing/orders', params),
     createOrder: (data) => api.post('/purchasing/orders', data),
     updateOrder: (id, data) => {
         const formData = data instanceof FormData ? data : new FormData();
@@ -92,7 +106,7 @@ export const purchasingService = {
 };
 
 export const salesService = {
-    getOrders: () => api.get('/sales/orders'),
+    getOrders: (params) => getAllPages('/sales/orders', params),
     getOrder: (id) => api.get(`/sales/orders/${id}`),
     createOrder: (data) => api.post('/sales/orders', data),
     updateOrder: (id, data) => api.patch(`/sales/orders/${id}`, data),
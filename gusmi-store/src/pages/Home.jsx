@@ -1,5 +1,5 @@
 import React, { useEffect, useState } from 'react';
-import { fetchProducts } from '../services/api';
+import { fetchProducts, fetchProductFacets } from '../services/api';
 import { ShoppingBag, SearchX, Clock, Timer, ShoppingCart, TrendingDown, FileText, X, Ship, Shield, CalendarClock } from 'lucide-react';
 import { useNavigate, useSearchParams } from 'react-router-dom';
 import { useCart } from '../context/CartContext';
@@ -10,8 +10,15 @@ import { isCurrentlyPreorder, getActivePrice } from '../utils/productUtils';
 import { Hero } from '../components/Hero';
 import Pagination from '../components/Pagination';
 
+const PAGE_SIZE = 12;
+// Pestaña "Disponibles": todo lo que no está en preventa
+const REGULAR_AVAILABILITY = ['in_stock', 'coming_soon'];
+const PREORDER_LIMIT = 100;
+
 const Home = () => {
-    const [products, setProducts] = useState([]);
+    const [regularProducts, setRegularProducts] = useState([]);
+    const [preorderProducts, setPreorderProducts] = useState([]);
+    const [facets, setFacets] = useState(null);
     const [loading, setLoading] = useState(true);
     const [error, setError] = useState(null);
     const [showNoSheetModal, setShowNoSheetModal] = useState(false);
@@ -21,48 +28,63 @@ const Home = () => {
 
     const searchQuery = searchParams.get('search')?.toLowerCase() || '';
     const pageParam = parseInt(searchParams.get('page') || '1', 10) || 1;
-    const PAGE_SIZE = 12;
     const tabParam = searchParams.get('tab') || null;
 
+    const [currentPage, setCurrentPage] = useState(pageParam);
+    useEffect(() => setCurrentPage(pageParam), [pageParam]);
+
+    // 'all' | 'available' | 'preorder'; por defecto 'available' en pantallas pequeñas
+    const [activeTab, setActiveTab] = useState(() => {
+        if (tabParam) return tabParam;
+        try {
+            return window.innerWidth < 768 ? 'available' : 'all';
+        } catch (e) {
+            return 'all';
+        }
+    });
+
+    // El catálogo se filtra y pagina en el servidor: solo se piden los productos que se muestran
     useEffect(() => {
+        let cancelled = false;
         const loadProducts = async () => {
+            setLoading(true);
             try {
-                const data = await fetchProducts();
-                setProducts(data);
+                const q = searchQuery || undefined;
+                const [facetData, regular, preorder] = await Promise.all([
+                    fetchProductFacets({ q }),
+                    activeTab !== 'preorder'
+                        ? fetchProducts({
+                            q,
+                            availability: REGULAR_AVAILABILITY,
+                            skip: (currentPage - 1) * PAGE_SIZE,
+                            limit: PAGE_SIZE,
+                        })
+                        : [],
+                    activeTab !== 'available'
+                        ? fetchProducts({ q, availability: 'preorder', limit: PREORDER_LIMIT })
+                        : [],
+                ]);
+                if (cancelled) return;
+                setFacets(facetData);
+                setRegularProducts(regular);
+                setPreorderProducts(preorder);
+                setError(null);
             } catch (err) {
-                setError('Failed to load products');
+                if (!cancelled) setError('Failed to load products');
             } finally {
-                setLoading(false);
+                if (!cancelled) setLoading(false);
             }
         };
 
         loadProducts();
-    }, []);
-
-    const filteredProducts = products.filter(product =>
-        product.name.toLowerCase().includes(searchQuery) ||
-        (product.description && product.description.toLowerCase().includes(searchQuery))
-    );
-
-    const regularProducts = filteredProducts.filter(p => !isCurrentlyPreorder(p));
-    const preorderProducts = filteredProducts.filter(p => isCurrentlyPreorder(p));
-
-    const totalRegularPages = Math.max(1, Math.ceil(regularProducts.length / PAGE_SIZE));
-    const [currentPage, setCurrentPage] = useState(pageParam);
-    useEffect(() => setCurrentPage(pageParam), [pageParam]);
-
-    const [activeTab, setActiveTab] = useState(tabParam || 'all'); // 'all' | 'available' | 'preorder'
-
-    // default to 'available' on small screens for better UX
-    useEffect(() => {
-        if (!tabParam) {
-            try {
-                if (window.innerWidth < 768) setActiveTab('available');
-            } catch (e) { }
-        }
-    }, []);
+        return () => { cancelled = true; };
+    }, [searchQuery, currentPage, activeTab]);
 
-    const paginatedRegular = regularProducts.slice((currentPage - 1) * PAGE_SIZE, currentPage * PAGE_SIZE);
+    const availabilityCounts = facets?.availability || {};
+    const totalCount = facets?.total || 0;
+    const regularCount = REGULAR_AVAILABILITY.reduce((sum, key) => sum + (availabilityCounts[key] || 0), 0);
+    const preorderCount = availabilityCounts.preorder || 0;
+    const totalRegularPages = Math.max(1, Math.ceil(regularCount / PAGE_SIZE));
 
     const getCountdown = (dateStr) => {
         if (!dateStr) return null;
@@ -280,7 +302,7 @@ const Home = () => {
                         </h2>
                         <p className="text-gray-500 mt-1">
                             {searchQuery
-                                ? `${filteredProducts.length} productos encontrados`
+                                ? `${totalCount} productos encontrados`
                                 : "Calidad garantizada en cada detalle"
                             }
                         </p>
@@ -300,7 +322,7 @@ const Home = () => {
                                 navigate(`/?${params.toString()}`);
                             }}
                             className={`px-4 py-2 rounded-full font-bold ${activeTab === 'all' ? 'bg-primary-600 text-white' : 'bg-white border border-gray-200 text-gray-700'}`}>
-                            Todos <span className="ml-2 text-xs bg-gray-100 px-2 py-0.5 rounded-full font-medium">{filteredProducts.length}</span>
+                            Todos <span className="ml-2 text-xs bg-gray-100 px-2 py-0.5 rounded-full font-medium">{totalCount}</span>
                         </button>
 
                         <button
@@ -312,7 +334,7 @@ const Home = () => {
                                 navigate(`/?${params.toString()}`);
                             }}
                             className={`px-4 py-2 rounded-full font-bold ${activeTab === 'available' ? 'bg-primary-600 text-white' : 'bg-white border border-gray-200 text-gray-700'}`}>
-                            Disponibles <span className="ml-2 text-xs bg-gray-100 px-2 py-0.5 rounded-full font-medium">{regularProducts.length}</span>
+                            Disponibles <span className="ml-2 text-xs bg-gray-100 px-2 py-0.5 rounded-full font-medium">{regularCount}</span>
                         </button>
 
                         <button
@@ -324,7 +346,7 @@ const Home = () => {
                                 navigate(`/?${params.toString()}`);
                             }}
                             className={`px-4 py-2 rounded-full font-bold ${activeTab === 'preorder' ? 'bg-accent-500 text-white' : 'bg-white border border-gray-200 text-gray-700'}`}>
-                            Pre-Venta <span className="ml-2 text-xs bg-gray-100 px-2 py-0.5 rounded-full font-medium">{preorderProducts.length}</span>
+                            Pre-Venta <span className="ml-2 text-xs bg-gray-100 px-2 py-0.5 rounded-full font-medium">{preorderCount}</span>
                         </button>
                     </div>
                 </div>
@@ -336,7 +358,7 @@ const Home = () => {
                     </div>
                 ) : error ? (
                     <div className="text-center text-red-500 py-12">{error}</div>
-                ) : filteredProducts.length === 0 ? (
+                ) : totalCount === 0 ? (
                     <div className="text-center py-20 bg-gray-50 rounded-3xl border border-dashed border-gray-200">
                         <SearchX className="w-16 h-16 text-gray-300 mx-auto mb-4" />
                         <h3 className="text-xl font-bold text-gray-800 font-['Outfit']">No encontramos lo que buscas</h3>
@@ -358,10 +380,10 @@ const Home = () => {
                                         <ShoppingBag className="w-5 h-5" />
                                     </div>
                                     <h3 className="text-xl font-bold text-gray-900 font-['Outfit']">Productos Disponibles</h3>
-                                    <span className="text-xs bg-green-100 text-green-700 px-2 py-0.5 rounded-full font-bold">{regularProducts.length}</span>
+                                    <span className="text-xs bg-green-100 text-green-700 px-2 py-0.5 rounded-full font-bold">{regularCount}</span>
                                 </div>
                                 <div className="grid grid-cols-1 sm:grid-cols-2 md:grid-cols-3 lg:grid-cols-4 gap-6">
-                                    {paginatedRegular.map(renderProductCard)}
+                                    {regularProducts.map(renderProductCard)}
                                 </div>
 
                                 <Pagination
@@ -380,7 +402,7 @@ const Home = () => {
                         )}
 
                         {/* Decorative Banner between sections */}
-                        {regularProducts.length > 0 && preorderProducts.length > 0 && (
+                        {regularCount > 0 && preorderCount > 0 && (
                             <div className="bg-primary-700 rounded-3xl p-8 md:p-12 text-white shadow-xl shadow-primary-200/50 relative overflow-hidden">
                                 <div className="absolute inset-0 opacity-10">
                                     <div className="absolute top-0 right-0 w-64 h-64 bg-white/20 rounded-full -translate-y-1/2 translate-x-1/2" />
@@ -438,7 +460,7 @@ const Home = () => {
                                             <h3 className="text-xl font-bold font-['Outfit']">Pre-Venta</h3>
                                             <p className="text-orange-100 text-sm">Reserva ahora a precio especial — entrega cuando llegue el producto</p>
                                         </div>
-                                        <span className="ml-auto text-xs bg-white/20 px-3 py-1 rounded-full font-bold">{preorderProducts.length} {preorderProducts.length === 1 ? 'producto' : 'productos'}</span>
+                                        <span className="ml-auto text-xs bg-white/20 px-3 py-1 rounded-full font-bold">{preorderCount} {preorderCount === 1 ? 'producto' : 'productos'}</span>
                                     </div>
                                 </div>
                                 <div className="grid grid-cols-1 sm:grid-cols-2 md:grid-cols-3 lg:grid-cols-4 gap-6">
@@ -474,7 +496,7 @@ const Home = () => {
             )}
 
             {/* Floating CTA for mobile to quickly jump to preorders */}
-            {preorderProducts.length > 0 && activeTab !== 'preorder' && (
+            {preorderCount > 0 && activeTab !== 'preorder' && (
                 <button
                     onClick={() => {
                         // jump to preorder section smoothly
@@ -486,7 +508,7 @@ const Home = () => {
                         navigate(`/?${params.toString()}`);
                     }}
                     className="fixed right-4 bottom-6 z-40 bg-accent-500 text-white px-4 py-3 rounded-full shadow-lg hover:shadow-2xl md:hidden">
-                    Ver Pre-Venta ({preorderProducts.length})
+                    Ver Pre-Venta ({preorderCount})
                 </button>
             )}
         </div>
@@ -1,8 +1,20 @@
 const API_URL = import.meta.env.VITE_API_URL || 'http://localhost:8000/api/v1/public';
 
-export const fetchProducts = async () => {
+// Query string del catálogo; los arreglos se envían como parámetro repetido (availability=a&availability=b)
+const catalogQuery = (params) => {
+    const query = new URLSearchParams();
+    Object.entries(params).forEach(([key, value]) => {
+        [].concat(value).forEach(item => {
+            if (item !== undefined && item !== null && item !== '') query.append(key, item);
+        });
+    });
+    const text = query.toString();
+    return text ? `?${text}` : '';
+};
+
+export const fetchProducts = async (params = {}) => {
     try {
-        const response = await fetch(`${API_URL}/products`);
+        const response = await fetch(`${API_URL}/products${catalogQuery(params)}`);
         if (!response.ok) {
             throw new Error('Network response was not ok');
         }
@@ -13,6 +25,19 @@ export const fetchProducts = async () => {
     }
 };
 
+export const fetchProductFacets = async (params = {}) => {
+    try {
+        const response = await fetch(`${API_URL}/products/facets${catalogQuery(params)}`);
+        if (!response.ok) {
+            throw new Error('Network response was not ok');
+        }
+        return await response.json();
+    } catch (error) {
+        console.error('Error fetching product facets:', error);
+        throw error;
+    }
+};
+
 export const fetchProductById = async (id) => {
     try {
         const response = await fetch(`${API_URL}/products/${id}`);